@@ -0,0 +1,66 @@
+"""
+检测/记牌热路径的基准测试
+
+    python -m benchmarks                         # 跑全部(缺依赖的阶段自动跳过)
+    python -m benchmarks --only parse,sort       # 只跑部分阶段
+    python -m benchmarks --frames images/        # 用录制的截图代替合成画面
+    python -m benchmarks --save base.json        # 保存结果
+    python -m benchmarks --compare base.json     # 与基线对比, p50 变慢超过 20% 时退出码为 1
+
+阶段: capture / parse / sort / run_game / yolo / e2e
+YOLO 和端到端默认在 CPU 上测, 方便不同机器之间比较。
+"""
+
+import argparse
+import contextlib
+import sys
+
+import config.settings as settings
+from benchmarks.harness import compare_results, print_table, save_results
+from benchmarks.stages import STAGES, SkipBench
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="检测/记牌热路径基准测试")
+    parser.add_argument("--only", default=",".join(STAGES), help="逗号分隔的阶段名 (默认全部)")
+    parser.add_argument("--frames", default=None, help="录制的截图目录 (默认使用合成画面)")
+    parser.add_argument("--device", default="cpu", choices=["cpu", "cuda", "onnx", "openvino"],
+                        help="YOLO / 端到端使用的推理设备 (默认 cpu)")
+    parser.add_argument("--repeat", type=int, default=50, help="每项计时次数 (默认 50)")
+    parser.add_argument("--save", default=None, help="把结果写入 JSON 文件")
+    parser.add_argument("--compare", default=None, help="与基线 JSON 对比")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的 p50 变慢比例 (默认 0.2)")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.only.split(",") if n.strip()]
+    unknown = [n for n in names if n not in STAGES]
+    if unknown:
+        parser.error(f"未知的阶段: {', '.join(unknown)}; 可选: {', '.join(STAGES)}")
+
+    settings.DEVICE_CHOICE = args.device
+    settings.DEBUG_MODE = False
+
+    results = []
+    for name in names:
+        try:
+            # 模型加载等日志不混进结果表格
+            with contextlib.redirect_stdout(sys.stderr):
+                results.extend(STAGES[name](args))
+        except SkipBench as e:
+            print(f"[skip] {name}: {e}", file=sys.stderr)
+
+    print_table(results)
+    if args.save:
+        save_results(results, args.save)
+    if args.compare:
+        regressions = compare_results(results, args.compare, args.tolerance)
+        if regressions:
+            print("\n性能回归:")
+            for line in regressions:
+                print("  " + line)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
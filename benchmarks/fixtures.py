@@ -0,0 +1,105 @@
+"""
+基准测试用的数据: 合成画面 / 合成检测结果 / 合成对局, 以及录制的截图
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import config.settings as settings
+from core.card_codes import NUM_CARDS
+from core.detections import REGION_NAMES, Detections, layout_to_pixel_regions
+from core.frame_source import ImageDirSource
+
+# 与训练好的模型一致: 类别 id -> yolo 标签名
+YOLO_NAMES: Dict[int, str] = dict(enumerate(settings.YOLO_TO_CARD_MAPPING.keys()))
+
+# 每个区域典型的牌数 (张数, 行数)
+REGION_CARD_COUNTS = {
+    "player_hand": (20, 1),
+    "player_played": (6, 1),
+    "opponent_left": (12, 2),
+    "opponent_right": (12, 2),
+    "landlord_cards": (3, 1),
+}
+
+
+def default_layout() -> Dict:
+    return settings.WINDOW_LAYOUTS[settings.CURRENT_LAYOUT]["layout"]
+
+
+def synthetic_frame(width: int = 1920, height: int = 1080, seed: int = 0) -> np.ndarray:
+    """
+    随机噪声画面 (BGR uint8); 只用来测截图后处理/拼图/推理的耗时, 识别不出牌
+    """
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+
+
+def synthetic_detections(width: int = 1920, height: int = 1080, seed: int = 0,
+                         layout: Optional[Dict] = None) -> Detections:
+    """
+    在每个区域里按行摆放卡牌框(带少量抖动), 打乱顺序后返回, 模拟 YOLO 按置信度输出的检测结果
+    """
+    rng = np.random.default_rng(seed)
+    regions = layout_to_pixel_regions(layout or default_layout(), width, height)
+    boxes = []
+    for name in REGION_NAMES:
+        x1, y1, x2, y2 = regions[name]
+        count, rows = REGION_CARD_COUNTS[name]
+        per_row = -(-count // rows)
+        card_w = (x2 - x1) / (per_row + 3)
+        card_h = (y2 - y1) / (rows + 0.5)
+        for k in range(count):
+            row, col = divmod(k, per_row)
+            bx = x1 + card_w * (col + 0.5) + rng.normal(0, 1.0)
+            by = y1 + card_h * (row + 0.2) + rng.normal(0, 1.5)
+            boxes.append((bx, by, bx + card_w * 1.6, by + card_h * 0.8))
+
+    boxes = np.asarray(boxes, dtype=np.float32)
+    cls = rng.integers(0, len(YOLO_NAMES), size=len(boxes))
+    order = rng.permutation(len(boxes))
+    return Detections(boxes[order], cls[order], YOLO_NAMES, (height, width))
+
+
+def synthetic_game(hold: int = 4, rounds: int = 18, seed: int = 0) -> List[Tuple[tuple, ...]]:
+    """
+    一局合成对局(每个区域的牌编码 tuple), 每个画面重复 hold 帧以满足"连续 N 帧相同"
+    顺序: player_hand, player_played, opponent_left, opponent_right, landlord_cards
+    """
+    rng = np.random.default_rng(seed)
+
+    def cards(n):
+        return tuple(sorted(rng.integers(0, NUM_CARDS, size=n).tolist()))
+
+    landlord = cards(3)
+    hand = cards(20)
+    frames = []
+    played, left, right = (), (), ()
+    for r in range(rounds):
+        turn = r % 3
+        if turn == 0:
+            played = cards(int(rng.integers(1, 6)))
+        elif turn == 1:
+            right = cards(int(rng.integers(1, 6)))
+        else:
+            left = cards(int(rng.integers(1, 6)))
+        for _ in range(hold):
+            frames.append((hand, played, left, right, landlord))
+    return frames
+
+
+def load_recorded_frames(dir_path: str, limit: int = 64) -> List[np.ndarray]:
+    """
+    读取截图目录里的图片 (最多 limit 张)
+    """
+    frames = []
+    with ImageDirSource(dir_path) as source:
+        while len(frames) < limit:
+            frame = source.read()
+            if frame is None:
+                if source.exhausted:
+                    break
+                continue  # 读取失败的图片跳过
+            frames.append(frame)
+    return frames
@@ -0,0 +1,132 @@
+"""
+计时工具: 多次运行取 p50 / p95 延迟、每秒帧数和进程峰值内存
+"""
+
+import json
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    进程启动以来的峰值常驻内存(MB), 取不到时返回 None
+    """
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        peak = getattr(info, "peak_wset", None)  # Windows
+        if peak is not None:
+            return peak / 1024 / 1024
+    except ImportError:
+        pass
+
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize / 1024 / 1024
+        return None
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位是 KB, macOS 是字节
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+class BenchResult:
+    def __init__(self, name: str, samples_ms: List[float], peak_rss: Optional[float]):
+        self.name = name
+        self.samples_ms = samples_ms
+        arr = np.asarray(samples_ms, dtype=np.float64)
+        self.p50 = float(np.percentile(arr, 50))
+        self.p95 = float(np.percentile(arr, 95))
+        self.mean = float(arr.mean())
+        self.fps = 1000.0 / self.mean if self.mean > 0 else float("inf")
+        self.peak_rss = peak_rss
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "runs": len(self.samples_ms),
+            "p50_ms": self.p50,
+            "p95_ms": self.p95,
+            "mean_ms": self.mean,
+            "fps": self.fps,
+            "peak_rss_mb": self.peak_rss,
+        }
+
+
+def run_bench(name: str, fn: Callable[[int], object], repeat: int = 200, warmup: int = 10,
+              max_seconds: float = 30.0) -> BenchResult:
+    """
+    fn(i): 第 i 次调用; 先预热 warmup 次(不计时), 再计时 repeat 次
+    总耗时超过 max_seconds 时提前结束(YOLO 在 CPU 上很慢)
+    """
+    for i in range(warmup):
+        fn(i)
+
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    for i in range(repeat):
+        t0 = time.perf_counter_ns()
+        fn(warmup + i)
+        samples.append((time.perf_counter_ns() - t0) / 1e6)
+        if time.perf_counter() > deadline and len(samples) >= 5:
+            break
+    return BenchResult(name, samples, peak_rss_mb())
+
+
+def print_table(results: List[BenchResult]):
+    header = f"{'benchmark':<36}{'runs':>6}{'p50 ms':>11}{'p95 ms':>11}{'fps':>10}{'peak MB':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        rss = f"{r.peak_rss:.0f}" if r.peak_rss is not None else "-"
+        print(f"{r.name:<36}{len(r.samples_ms):>6}{r.p50:>11.3f}{r.p95:>11.3f}{r.fps:>10.1f}{rss:>10}")
+
+
+def save_results(results: List[BenchResult], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([r.to_dict() for r in results], f, ensure_ascii=False, indent=2)
+
+
+def compare_results(results: List[BenchResult], baseline_path: str, tolerance: float) -> List[str]:
+    """
+    与基线对比 p50, 变慢超过 tolerance(比例)的记为回归, 返回回归说明
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {item["name"]: item for item in json.load(f)}
+
+    regressions = []
+    for r in results:
+        base = baseline.get(r.name)
+        if base is None or base["p50_ms"] <= 0:
+            continue
+        ratio = r.p50 / base["p50_ms"]
+        if ratio > 1.0 + tolerance:
+            regressions.append(f"{r.name}: p50 {base['p50_ms']:.3f}ms -> {r.p50:.3f}ms (x{ratio:.2f})")
+    return regressions
@@ -0,0 +1,190 @@
+"""
+各阶段的基准测试
+
+每个函数返回 BenchResult 列表; 依赖不满足(非 Windows、没装 torch、没有模型等)时
+抛出 SkipBench, 由入口打印跳过原因。
+"""
+
+from typing import List
+
+import numpy as np
+
+import config.settings as settings
+from benchmarks.fixtures import load_recorded_frames, synthetic_detections, synthetic_frame, synthetic_game
+from benchmarks.harness import BenchResult, run_bench
+from core.card_detector import CardDetector, sort_indices_topright_rowwise
+from core.card_tracker import CardTracker
+from core.frame_source import RingBufferSource
+from core.inference_backend import LetterboxBuffer, letterbox, letterbox_shape
+
+
+class SkipBench(Exception):
+    pass
+
+
+def _frames(options) -> List[np.ndarray]:
+    if options.frames:
+        frames = load_recorded_frames(options.frames)
+        if not frames:
+            raise SkipBench(f"目录中没有可读的图片: {options.frames}")
+        return frames
+    return [synthetic_frame(seed=i) for i in range(4)]
+
+
+def _offline_detector(frames=None) -> CardDetector:
+    """
+    不截图的 CardDetector: 从内存缓冲区循环取帧
+    """
+    source = RingBufferSource(frames or [synthetic_frame()], loop=True)
+    return CardDetector(settings.CURRENT_LAYOUT, frame_source=source)
+
+
+def _load_model(detector: CardDetector):
+    try:
+        detector.load_model()
+    except ImportError as e:
+        raise SkipBench(f"推理依赖未安装: {e}")
+    except Exception as e:
+        raise SkipBench(f"模型加载失败: {e}")
+
+
+# ================= 截图 =================
+def bench_capture(options) -> List[BenchResult]:
+    try:
+        from core.screen_capture import ScreenCapture
+        window_title = settings.WINDOW_LAYOUTS[settings.CURRENT_LAYOUT]["window_title"]
+        capture = ScreenCapture(window_title)
+    except Exception as e:
+        raise SkipBench(f"无法截图(仅 Windows): {e}")
+
+    if capture.capture_window_array() is None:
+        raise SkipBench(f"没有找到窗口: {window_title}")
+
+    try:
+        return [
+            run_bench("capture_window (PIL)", lambda i: capture.capture_window(), options.repeat),
+            run_bench("capture_window_array", lambda i: capture.capture_window_array(), options.repeat),
+        ]
+    finally:
+        capture.close()
+
+
+# ================= 解析 / 排序 =================
+def bench_parse_result(options) -> List[BenchResult]:
+    detector = _offline_detector()
+    dets = [synthetic_detections(seed=i) for i in range(16)]
+    return [
+        run_bench(f"parse_result ({len(dets[0])} boxes)",
+                  lambda i: detector.parse_result(dets[i % len(dets)]), options.repeat * 10),
+    ]
+
+
+def bench_sort(options) -> List[BenchResult]:
+    detector = _offline_detector()
+    results = []
+    for n in (3, 20, 40):
+        rng = np.random.default_rng(n)
+        sets = []
+        for _ in range(16):
+            row = rng.integers(0, 2, size=n)
+            x1 = rng.uniform(0, 800, size=n)
+            y1 = row * 60 + rng.normal(0, 2, size=n)
+            sets.append(np.stack([x1, y1, x1 + 40, y1 + 55], axis=1))
+        dict_sets = [[{"bbox": tuple(b)} for b in boxes] for boxes in sets]
+        results.append(run_bench(f"sort_indices_topright_rowwise n={n}",
+                                 lambda i: sort_indices_topright_rowwise(sets[i % 16]), options.repeat * 10))
+        results.append(run_bench(f"sort_cards_by_topright_rowwise n={n}",
+                                 lambda i: detector.sort_cards_by_topright_rowwise(dict_sets[i % 16]),
+                                 options.repeat * 10))
+    return results
+
+
+# ================= 记牌状态机 =================
+def bench_run_game(options) -> List[BenchResult]:
+    tracker = CardTracker(settings.CURRENT_LAYOUT, frame_source=RingBufferSource([synthetic_frame()]))
+    game = synthetic_game(hold=settings.FRAME_LENGTH + 1)
+
+    def step(i):
+        if i % len(game) == 0:
+            tracker.reset()
+        tracker.run_game(game[i % len(game)])
+
+    return [run_bench("CardTracker.run_game", step, max(options.repeat * 10, len(game)))]
+
+
+# ================= 前处理 =================
+def bench_preprocess(options) -> List[BenchResult]:
+    frames = _frames(options)
+    imgsz = settings.INFER_IMGSZ or 960
+    hw = letterbox_shape(frames[0].shape[:2], imgsz)
+    buffer = LetterboxBuffer(hw)
+
+    def allocating(i):
+        im, _, _ = letterbox(frames[i % len(frames)], (imgsz, imgsz), auto=True)
+        blob = np.ascontiguousarray(im[:, :, ::-1].transpose(2, 0, 1), dtype=np.float32)
+        blob *= 1.0 / 255.0
+
+    return [
+        run_bench(f"letterbox + convert (allocating, {hw[1]}x{hw[0]})", allocating, options.repeat),
+        run_bench(f"LetterboxBuffer.load (preallocated, {hw[1]}x{hw[0]})",
+                  lambda i: buffer.load(frames[i % len(frames)]), options.repeat),
+    ]
+
+
+# ================= YOLO =================
+def bench_yolo(options) -> List[BenchResult]:
+    frames = _frames(options)
+    detector = _offline_detector(frames)
+    _load_model(detector)
+    model = detector.model
+    conf, iou = detector.yolo_conf, detector.yolo_iou
+
+    results = [run_bench(f"predict full frame ({detector.device})",
+                         lambda i: model.predict(frames[i % len(frames)], conf=conf, iou=iou),
+                         options.repeat, warmup=3)]
+
+    mosaic = detector.roi_mosaic
+
+    def predict_mosaic(i):
+        frame = frames[i % len(frames)]
+        buf, plan = mosaic.compose(frame)
+        dets = model.predict(buf, conf=conf, iou=iou,
+                             imgsz=mosaic.infer_imgsz(plan, frame.shape[:2], model.base_imgsz))
+        mosaic.map_back(dets, plan, frame.shape[:2])
+
+    results.append(run_bench(f"predict roi mosaic ({detector.device})", predict_mosaic, options.repeat, warmup=3))
+    return results
+
+
+# ================= 端到端 =================
+def bench_end_to_end(options) -> List[BenchResult]:
+    frames = _frames(options)
+    tracker = CardTracker(settings.CURRENT_LAYOUT, frame_source=RingBufferSource(frames, loop=True))
+    detector = tracker.card_detector
+    _load_model(detector)
+
+    results = []
+    # 帧差门控关闭: 每一帧都完整推理
+    gate = detector.change_detector
+    detector.change_detector = None
+    results.append(run_bench(f"end-to-end run() ungated ({detector.device})", lambda i: tracker.run(),
+                             options.repeat, warmup=3))
+    detector.change_detector = gate
+    if gate is not None:
+        # 帧差门控打开, 同一帧重复送入: 稳态下大部分帧都跳过推理
+        same = RingBufferSource([frames[0]], loop=True)
+        detector.frame_source = same
+        results.append(run_bench("end-to-end run() static frame (gated)", lambda i: tracker.run(),
+                                 options.repeat, warmup=3))
+    return results
+
+
+STAGES = {
+    "capture": bench_capture,
+    "parse": bench_parse_result,
+    "sort": bench_sort,
+    "run_game": bench_run_game,
+    "preprocess": bench_preprocess,
+    "yolo": bench_yolo,
+    "e2e": bench_end_to_end,
+}
@@ -0,0 +1,77 @@
+"""
+半精度推理的正确性检查: 同一批截图分别用 fp32 和 fp16 识别, 比较每个区域识别出的牌
+
+    python -m benchmarks.verify_precision --frames <截图目录>
+
+有 GPU 时直接对比 GPU fp32 和 GPU fp16; 没有 GPU 时在 CPU 上模拟 fp16:
+把权重转成 half 再转回 float(权重精度和 fp16 一致, 激活仍是 fp32), 只能说明权重量化误差不影响结果。
+有不一致的帧时返回码为 1。
+"""
+
+import argparse
+import sys
+
+import config.settings as settings
+from benchmarks.fixtures import load_recorded_frames
+from core.card_codes import codes_to_names
+from core.card_detector import CardDetector
+from core.detections import REGION_NAMES
+from core.frame_source import RingBufferSource
+from core.inference_backend import UltralyticsBackend
+
+
+def _build_backends(weight_path: str, imgsz: int):
+    import torch
+
+    if torch.cuda.is_available():
+        fp32 = UltralyticsBackend(weight_path, "cuda", half=False, imgsz=imgsz)
+        fp16 = UltralyticsBackend(weight_path, "cuda", half=True, imgsz=imgsz)
+        return fp32, fp16, "GPU fp16"
+
+    fp32 = UltralyticsBackend(weight_path, "cpu", imgsz=imgsz)
+    fp16 = UltralyticsBackend(weight_path, "cpu", imgsz=imgsz)
+    fp16.model.model.half().float()
+    return fp32, fp16, "CPU 模拟 fp16 (权重舍入到 half)"
+
+
+def _detect_all(backend, frames, layout_name):
+    detector = CardDetector(layout_name, frame_source=RingBufferSource(frames))
+    detector.use_backend(backend)
+    return [detector.detect_frame(frame) for frame in frames]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.verify_precision",
+                                     description="比较 fp32 / fp16 推理的识别结果")
+    parser.add_argument("--frames", required=True, help="截图目录")
+    parser.add_argument("--limit", type=int, default=64, help="最多读取多少张截图 (默认: 64)")
+    parser.add_argument("--layout", default=settings.CURRENT_LAYOUT,
+                        help=f"布局配置名 (默认: {settings.CURRENT_LAYOUT})")
+    parser.add_argument("--imgsz", type=int, default=settings.INFER_IMGSZ,
+                        help="推理尺寸, 0 表示使用训练时的尺寸")
+    args = parser.parse_args(argv)
+
+    frames = load_recorded_frames(args.frames, limit=args.limit)
+    if not frames:
+        print(f"目录中没有可读的图片: {args.frames}", file=sys.stderr)
+        return 2
+
+    fp32, fp16, mode = _build_backends(settings.YOLO_MODEL_PATH, args.imgsz)
+    print(f"[精度检查] {len(frames)} 帧, {mode}")
+    results32 = _detect_all(fp32, frames, args.layout)
+    results16 = _detect_all(fp16, frames, args.layout)
+
+    mismatches = 0
+    for i, (r32, r16) in enumerate(zip(results32, results16)):
+        for name, cards32, cards16 in zip(REGION_NAMES, r32, r16):
+            if cards32 != cards16:
+                mismatches += 1
+                print(f"  帧 {i} {name}: fp32={codes_to_names(cards32)} fp16={codes_to_names(cards16)}")
+
+    total = len(frames) * len(REGION_NAMES)
+    print(f"[精度检查] 不一致的区域: {mismatches}/{total}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
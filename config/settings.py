@@ -1,340 +1,151 @@
 import os
-import yaml
+import sys
+import types
+
+from config.settings_store import SettingsStore
 
 # ==================== 路径配置 ====================
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CONFIG_PATH = os.path.join(BASE_DIR, 'config', 'config.yaml')
 YOLO_MODEL_PATH = os.path.join(BASE_DIR, 'yolo', 'weights', 'best.pt')
-
-# 加载配置文件
-def load_config():
-    try:
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-        return config
-    except Exception as e:
-        print(f"加载配置文件失败: {e}")
-        # 返回默认配置作为 fallback
-        return {
-            'reset_time': 3.5,
-            'detect_interval_sec': 0.2,
-            'little_joker_shown': "🃟",
-            'big_joker_shown': "🃏",
-            'yolo_confidence_threshold': 0.6,
-            'yolo_iou_threshold': 0.45,
-            'yolo_to_card_mapping': {
-                'two': '2',
-                'three': '3',
-                'four': '4',
-                'five': '5',
-                'six': '6',
-                'seven': '7',
-                'eight': '8',
-                'nine': '9',
-                'ten': '10',
-                'J': 'J',
-                'Q': 'Q',
-                'K': 'K',
-                'A': 'A',
-                'joker': 'jok',
-                'JOKER': 'JOK'
-            },
-            'window_layouts': {
-                "JJ斗地主": {
-                    "window_title": "JJ斗地主",
-                    "layout": {
-                        'player_hand': (0.04, 0.70, 0.96, 0.85),
-                        "player_played": (0.04, 0.50, 0.96, 0.6),
-                        'opponent_left': (0.20, 0.32, 0.455, 0.49),
-                        'opponent_right': (0.46, 0.32, 0.80, 0.49),
-                        'landlord_cards': (0.35, 0.08, 0.45, 0.15),
-                    }
-                }
-            },
-            'frame_length': 3,
-            'device_choice': 'cuda',
-            'debug_mode': True
-        }
-
-# 加载配置
-config = load_config()
-
-# ==================== 基本配置 ====================
-RESET_TIME = config.get('reset_time', 3.5)    # 几秒识别不到扑克牌重置
-DETECT_INTERVAL_SEC = config.get('detect_interval_sec', 0.2)  # 检测间隔秒数
-
-# 大小王玩家出牌显示字符
-LITTLE_JOKER_SHOWN = config.get('little_joker_shown', "🃟")
-BIG_JOKER_SHOWN = config.get('big_joker_shown', "🃏")
-
-# ==================== YOLO模型配置 ====================
-YOLO_CONFIDENCE_THRESHOLD = config.get('yolo_confidence_threshold', 0.6)
-YOLO_IOU_THRESHOLD = config.get('yolo_iou_threshold', 0.45)
-
-# ==================== YOLO类别映射配置 ====================
-YOLO_TO_CARD_MAPPING = config.get('yolo_to_card_mapping', {
-    'two': '2',
-    'three': '3',
-    'four': '4',
-    'five': '5',
-    'six': '6',
-    'seven': '7',
-    'eight': '8',
-    'nine': '9',
-    'ten': '10',
-    'J': 'J',
-    'Q': 'Q',
-    'K': 'K',
-    'A': 'A',
-    'joker': 'jok',
-    'JOKER': 'JOK'
-})
-
-# ==================== 窗口和布局配置 ====================
-# 预设的不同软件窗口和布局配置
-# 结构: {配置名称: {"window_title": "窗口标题", "layout": {区域配置}}}
-WINDOW_LAYOUTS = config.get('window_layouts', {
-    "JJ斗地主": {
-        "window_title": "JJ斗地主",
-        "layout": {
-            'player_hand': (0.04, 0.70, 0.96, 0.85),
-            "player_played": (0.04, 0.50, 0.96, 0.6),
-            'opponent_left': (0.20, 0.32, 0.455, 0.49),
-            'opponent_right': (0.46, 0.32, 0.80, 0.49),
-            'landlord_cards': (0.35, 0.08, 0.45, 0.15),
+YOLO_ONNX_MODEL_PATH = os.path.join(BASE_DIR, 'yolo', 'weights', 'best.onnx')  # device_choice 为 onnx / openvino 时使用
+
+# ==================== 配置项 ====================
+# {配置键: (类型, 默认值)}; 模块属性名是配置键的大写形式 (frame_length -> settings.FRAME_LENGTH)
+# 读取 settings.XXX 总是得到当前值(界面里改过的值立刻生效), 不要用 from config.settings import XXX
+SCHEMA = {
+    # ---------- 基本配置 ----------
+    'reset_time': (float, 3.5),             # 几秒识别不到扑克牌重置
+    'detect_interval_sec': (float, 0.2),    # 检测间隔秒数
+    'frame_length': (int, 3),               # 连续多少帧检测相同内容算作正确截取
+    'debug_mode': (bool, True),
+
+    # 大小王玩家出牌显示字符
+    'little_joker_shown': (str, "🃟"),
+    'big_joker_shown': (str, "🃏"),
+
+    # ---------- YOLO模型配置 ----------
+    'yolo_confidence_threshold': (float, 0.6),
+    'yolo_iou_threshold': (float, 0.45),
+    # 区域裁剪模式: 只对布局中的五个区域拼成的小图做推理, CPU 上明显更快
+    'roi_mode': (bool, False),
+    # 帧差门控阈值: 区域缩略图每个小块的平均绝对差(0~255)都不超过它就复用上一次的识别结果, <= 0 关闭
+    'frame_diff_threshold': (float, 1.0),
+    # 区域结果缓存: 记住最近 region_cache_size 个区域画面的识别结果, 画面重复出现时不再推理; 0 表示关闭
+    'region_cache_size': (int, 64),
+
+    # ---------- YOLO类别映射配置 ----------
+    'yolo_to_card_mapping': (dict, {
+        'two': '2',
+        'three': '3',
+        'four': '4',
+        'five': '5',
+        'six': '6',
+        'seven': '7',
+        'eight': '8',
+        'nine': '9',
+        'ten': '10',
+        'J': 'J',
+        'Q': 'Q',
+        'K': 'K',
+        'A': 'A',
+        'joker': 'jok',
+        'JOKER': 'JOK'
+    }),
+
+    # ---------- 窗口和布局配置 ----------
+    # 预设的不同软件窗口和布局配置
+    # 结构: {配置名称: {"window_title": "窗口标题", "layout": {区域配置}}}
+    'window_layouts': (dict, {
+        "JJ斗地主": {
+            "window_title": "JJ斗地主",
+            "layout": {
+                'player_hand': (0.04, 0.70, 0.96, 0.85),
+                "player_played": (0.04, 0.50, 0.96, 0.6),
+                'opponent_left': (0.20, 0.32, 0.455, 0.49),
+                'opponent_right': (0.46, 0.32, 0.80, 0.49),
+                'landlord_cards': (0.35, 0.08, 0.45, 0.15),
+            }
         }
-    }
-})
-
-# 当前选择的布局名称，优先从配置文件读取，如不存在则取WINDOW_LAYOUTS的第一个key
-try:
-    _available = list(WINDOW_LAYOUTS.keys())
-    if _available:
-        CURRENT_LAYOUT = config.get('current_layout', _available[0])
-    else:
-        CURRENT_LAYOUT = None
-except Exception:
-    CURRENT_LAYOUT = None
-
-# 连续多少帧检测相同内容算作正确截取
-FRAME_LENGTH = config.get('frame_length', 3)
-
-
-DEBUG_MODE = config.get('debug_mode', True)
-
-# ==================== 设备选择配置 ====================
-# 设备选择选项: "cpu" (使用CPU), "cuda" (使用GPU)
-DEVICE_CHOICE = config.get('device_choice', 'cuda')
-
-# ==================== 窗口显示配置 ====================
-# 是否显示在最上层
-ALWAYS_ON_TOP = config.get('always_on_top', False)
-
-# 是否显示玩家所出的牌
-SHOW_PLAYED_CARDS = config.get('show_played_cards', True)
-
-def save_device_choice(device_choice):
-    """
-    保存设备选择到config.yaml文件
-    device_choice: "cpu" 或 "cuda"
-    """
-    try:
-        cfg = {}
-        try:
-            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                loaded = yaml.safe_load(f)
-                if isinstance(loaded, dict):
-                    cfg = loaded
-        except Exception:
-            cfg = {}
-
-        cfg['device_choice'] = device_choice
-
-        # 原子写入：先写临时文件再替换
-        tmp_path = CONFIG_PATH + '.tmp'
-        with open(tmp_path, 'w', encoding='utf-8') as f:
-            yaml.dump(cfg, f, allow_unicode=True, default_flow_style=False)
-        os.replace(tmp_path, CONFIG_PATH)
-
-        print(f"设备选择已保存到文件: {device_choice}")
-        print(f"请重启程序以应用更改")
-    except Exception as e:
-        print(f"保存设备选择失败: {e}")
-
-def save_reset_time(reset_time):
-    """
-    保存重置时间到config.yaml文件
-    reset_time: 重置时间（秒）
-    """
-    try:
-        cfg = {}
-        try:
-            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                loaded = yaml.safe_load(f)
-                if isinstance(loaded, dict):
-                    cfg = loaded
-        except Exception:
-            cfg = {}
-
-        cfg['reset_time'] = reset_time
-        tmp_path = CONFIG_PATH + '.tmp'
-        with open(tmp_path, 'w', encoding='utf-8') as f:
-            yaml.dump(cfg, f, allow_unicode=True, default_flow_style=False)
-        os.replace(tmp_path, CONFIG_PATH)
-
-        print(f"重置时间已保存到文件: {reset_time}秒")
-    except Exception as e:
-        print(f"保存重置时间失败: {e}")
-
-def save_frame_length(frame_length):
-    """
-    保存帧长度到config.yaml文件
-    frame_length: 帧长度
-    """
-    try:
-        cfg = {}
-        try:
-            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                loaded = yaml.safe_load(f)
-                if isinstance(loaded, dict):
-                    cfg = loaded
-        except Exception:
-            cfg = {}
-
-        cfg['frame_length'] = frame_length
-        tmp_path = CONFIG_PATH + '.tmp'
-        with open(tmp_path, 'w', encoding='utf-8') as f:
-            yaml.dump(cfg, f, allow_unicode=True, default_flow_style=False)
-        os.replace(tmp_path, CONFIG_PATH)
-
-        print(f"帧长度已保存到文件: {frame_length}")
-    except Exception as e:
-        print(f"保存帧长度失败: {e}")
-
-def save_detect_interval(detect_interval):
-    """
-    保存检测间隔到config.yaml文件
-    detect_interval: 检测间隔（秒）
-    """
-    try:
-        cfg = {}
-        try:
-            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                loaded = yaml.safe_load(f)
-                if isinstance(loaded, dict):
-                    cfg = loaded
-        except Exception:
-            cfg = {}
+    }),
+    # 当前选择的布局名称, 不存在时取 window_layouts 的第一个
+    'current_layout': (str, None),
+    # 多桌模式 (见 core/multi_session.py): 不为空时一个窗口同时记多桌, 推理合并成一次批量推理
+    # 每项 {"layout": 布局名, "window_title": 窗口标题(可选, 几桌窗口标题相同时必须填), "name": 显示名(可选)}
+    'multi_sessions': (list, []),
+
+    # ---------- 运行方式 ----------
+    # 流水线模式: 截图、识别、记牌分别在三个线程中并行执行
+    'pipeline_mode': (bool, False),
+    # 自适应检测间隔 (见 core/scheduler.py):
+    # 对局中牌在变化时缩短到 min_detect_interval_sec, 没有地主牌时指数退避到 max_detect_interval_sec,
+    # 识别耗时占比不超过 cpu_budget; 关闭时按 detect_interval_sec 固定间隔检测
+    'adaptive_interval': (bool, True),
+    'min_detect_interval_sec': (float, 0.08),
+    'max_detect_interval_sec': (float, 2.0),
+    'cpu_budget': (float, 0.5),
+    # 录制对局: 每一帧的截图和识别结果写入 sessions/<时间>/, 用 python -m ddz_tracker replay 回放
+    'record_session': (bool, False),
+    # 在主窗口底部显示各阶段耗时 (p50/p95)
+    'latency_overlay': (bool, False),
+
+    # ---------- 设备选择配置 ----------
+    # 设备选择选项: "cpu" (使用CPU), "cuda" (使用GPU),
+    #              "onnx" (ONNX Runtime CPU), "openvino" (ONNX Runtime + OpenVINO)
+    'device_choice': (str, 'cuda'),
+
+    # ---------- 推理优化配置 (重启生效) ----------
+    # GPU 上使用 fp16 推理, CPU / ONNX 后端自动使用 fp32
+    'half_precision': (bool, False),
+    # 融合 Conv + BN 层 (只对 PyTorch 后端有效)
+    'fuse_model': (bool, True),
+    # 加载模型后先用黑图推理几次, 避免开局前几帧变慢
+    'warmup': (bool, True),
+    # 固定推理尺寸, 0 表示使用训练/导出时的尺寸
+    'infer_imgsz': (int, 0),
+    # CPU 多进程推理 (见 core/process_pool.py): 开几个进程各加载一份模型, 0 / 1 表示单进程
+    # 多桌模式下各桌同时推理, 命令行回放/处理录像时多帧同时推理; GPU 上不生效
+    'inference_workers': (int, 0),
+
+    # ---------- 窗口显示配置 ----------
+    'always_on_top': (bool, False),         # 是否显示在最上层
+    'show_played_cards': (bool, True),      # 是否显示玩家所出的牌
+}
 
-        cfg['detect_interval_sec'] = detect_interval
-        tmp_path = CONFIG_PATH + '.tmp'
-        with open(tmp_path, 'w', encoding='utf-8') as f:
-            yaml.dump(cfg, f, allow_unicode=True, default_flow_style=False)
-        os.replace(tmp_path, CONFIG_PATH)
+# 所有配置项的当前值 (见 config/settings_store.py)
+STORE = SettingsStore(CONFIG_PATH, SCHEMA)
 
-        print(f"检测间隔已保存到文件: {detect_interval}秒")
-    except Exception as e:
-        print(f"保存检测间隔失败: {e}")
+if STORE.get('current_layout') is None and STORE.get('window_layouts'):
+    STORE.set('current_layout', next(iter(STORE.get('window_layouts'))), persist=False)
 
-def save_always_on_top(always_on_top):
-    """
-    保存是否显示在最上层到config.yaml文件
-    always_on_top: 是否显示在最上层（True/False）
-    """
-    try:
-        cfg = {}
-        try:
-            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                loaded = yaml.safe_load(f)
-                if isinstance(loaded, dict):
-                    cfg = loaded
-        except Exception:
-            cfg = {}
+SESSION_DIR = os.path.join(BASE_DIR, 'sessions')
 
-        cfg['always_on_top'] = always_on_top
-        tmp_path = CONFIG_PATH + '.tmp'
-        with open(tmp_path, 'w', encoding='utf-8') as f:
-            yaml.dump(cfg, f, allow_unicode=True, default_flow_style=False)
-        os.replace(tmp_path, CONFIG_PATH)
+# 调试模式下每隔几秒打印一次各阶段耗时, 并写入这个文件
+STAGE_TIMING_PATH = os.path.join(BASE_DIR, 'logs', 'stage_timing.json')
 
-        print(f"是否显示在最上层已保存到文件: {always_on_top}")
-    except Exception as e:
-        print(f"保存是否显示在最上层失败: {e}")
 
-def save_show_played_cards(show_played_cards):
+class _SettingsModule(types.ModuleType):
     """
-    保存是否显示玩家所出的牌到config.yaml文件
-    show_played_cards: 是否显示玩家所出的牌（True/False）
+    settings.FRAME_LENGTH 读取 STORE 中的当前值;
+    settings.FRAME_LENGTH = 4 只修改本次运行中的值, 不写文件(命令行参数、回放时的临时覆盖)。
+    需要保存到 config.yaml 时用 settings.STORE.set('frame_length', 4)
     """
-    try:
-        cfg = {}
-        try:
-            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                loaded = yaml.safe_load(f)
-                if isinstance(loaded, dict):
-                    cfg = loaded
-        except Exception:
-            cfg = {}
 
-        cfg['show_played_cards'] = show_played_cards
-        tmp_path = CONFIG_PATH + '.tmp'
-        with open(tmp_path, 'w', encoding='utf-8') as f:
-            yaml.dump(cfg, f, allow_unicode=True, default_flow_style=False)
-        os.replace(tmp_path, CONFIG_PATH)
+    def __getattr__(self, name):
+        key = name.lower()
+        if name.isupper() and key in SCHEMA:
+            return STORE.get(key)
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-        print(f"是否显示玩家所出的牌已保存到文件: {show_played_cards}")
-    except Exception as e:
-        print(f"保存是否显示玩家所出的牌失败: {e}")
-
-def save_debug_mode(debug_mode):
-    """
-    保存调试模式到config.yaml文件
-    debug_mode: 是否开启调试模式（True/False）
-    """
-    try:
-        cfg = {}
-        try:
-            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                loaded = yaml.safe_load(f)
-                if isinstance(loaded, dict):
-                    cfg = loaded
-        except Exception:
-            cfg = {}
-
-        cfg['debug_mode'] = debug_mode
-        tmp_path = CONFIG_PATH + '.tmp'
-        with open(tmp_path, 'w', encoding='utf-8') as f:
-            yaml.dump(cfg, f, allow_unicode=True, default_flow_style=False)
-        os.replace(tmp_path, CONFIG_PATH)
-
-        print(f"调试模式已保存到文件: {debug_mode}")
-    except Exception as e:
-        print(f"保存调试模式失败: {e}")
-
-def save_current_layout(layout_name):
-    """
-    保存当前布局名称到config.yaml
-    layout_name: str
-    """
-    try:
-        cfg = {}
-        try:
-            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                loaded = yaml.safe_load(f)
-                if isinstance(loaded, dict):
-                    cfg = loaded
-        except Exception:
-            cfg = {}
+    def __setattr__(self, name, value):
+        key = name.lower()
+        if name.isupper() and key in SCHEMA:
+            STORE.set(key, value, persist=False)
+        else:
+            super().__setattr__(name, value)
 
-        cfg['current_layout'] = layout_name
-        tmp_path = CONFIG_PATH + '.tmp'
-        with open(tmp_path, 'w', encoding='utf-8') as f:
-            yaml.dump(cfg, f, allow_unicode=True, default_flow_style=False)
-        os.replace(tmp_path, CONFIG_PATH)
 
-        print(f"当前布局已保存到文件: {layout_name}")
-    except Exception as e:
-        print(f"保存当前布局失败: {e}")
+sys.modules[__name__].__class__ = _SettingsModule
 
 
 # ==================== 路径配置 ====================
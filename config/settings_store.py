@@ -0,0 +1,152 @@
+"""
+配置存储
+
+所有配置项的当前值都在内存里, 读取不碰磁盘; 修改后通知订阅者, 并在 debounce 秒后由后台线程
+一次性写回 config.yaml (先写临时文件再替换)。连续修改多个配置(比如在设置对话框里来回切换)只写一次文件,
+界面线程不会被文件读写阻塞。
+
+    store = SettingsStore(CONFIG_PATH, SCHEMA)
+    store.get("frame_length")
+    store.set("frame_length", 4)                    # 持久化
+    store.set("debug_mode", False, persist=False)   # 只在本次运行中生效(命令行/回放的临时覆盖)
+    unsubscribe = store.subscribe(callback, keys=("frame_length",))   # callback(key, value)
+"""
+
+import atexit
+import os
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import yaml
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+# 类型转换: yaml 里手写的值类型可能不对(例如 frame_length: "3"), 统一在这里转换
+_CONVERTERS = {bool: _to_bool}
+
+
+class SettingsStore:
+    """
+    schema: {配置键: (类型, 默认值)}; 不在 schema 里的键(手动添加的内容)原样保留在文件中
+    """
+
+    def __init__(self, path: str, schema: Dict[str, Tuple[type, object]], debounce: float = 0.5):
+        self.path = path
+        self.schema = schema
+        self.debounce = debounce
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()  # 定时器线程和退出时的 flush 可能同时写文件
+        self._listeners = []
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+        self._newline = None  # 文件原来的换行符, 写回时保持不变(None: 新文件用系统默认)
+
+        self._persisted = self._load()  # 与文件内容一致(加上 set 过的值)
+        self._values = {key: default for key, (_, default) in schema.items()}
+        for key, value in self._persisted.items():
+            if key in schema:
+                self._values[key] = self._convert(key, value)
+        # 退出前把还没写的修改写完
+        atexit.register(self.flush)
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            if b'\n' in raw:
+                self._newline = '\r\n' if b'\r\n' in raw else '\n'
+            loaded = yaml.safe_load(raw.decode('utf-8'))
+            return loaded if isinstance(loaded, dict) else {}
+        except Exception as e:
+            print(f"加载配置文件失败: {e}")
+            return {}
+
+    def _convert(self, key, value):
+        kind, default = self.schema[key]
+        if value is None or kind is object or isinstance(value, kind) and not (kind is int and isinstance(value, bool)):
+            return value
+        try:
+            return _CONVERTERS.get(kind, kind)(value)
+        except (TypeError, ValueError):
+            print(f"配置项 {key} 的值无效: {value!r}，使用默认值 {default!r}")
+            return default
+
+    # ================= 读取 =================
+    def get(self, key: str):
+        return self._values[key]
+
+    def __contains__(self, key):
+        return key in self._values
+
+    # ================= 修改 =================
+    def set(self, key: str, value, persist: bool = True):
+        """
+        修改配置并通知订阅者; persist=True 时稍后写回文件
+        值没有变化时什么都不做
+        """
+        if key not in self.schema:
+            raise KeyError(f"未知的配置项: {key}")
+        value = self._convert(key, value)
+        with self._lock:
+            changed = self._values.get(key) != value
+            self._values[key] = value
+            if persist and self._persisted.get(key) != value:
+                self._persisted[key] = value
+                self._schedule_write()
+            listeners = list(self._listeners) if changed else []
+        for callback, keys in listeners:
+            if keys is None or key in keys:
+                try:
+                    callback(key, value)
+                except Exception as e:  # 一个订阅者出错不影响其他订阅者
+                    print(f"配置变更回调失败 ({key}): {e}")
+
+    def subscribe(self, callback: Callable[[str, object], None], keys: Optional[Iterable[str]] = None):
+        """
+        订阅配置变化, callback(key, value) 在调用 set() 的线程中执行
+        返回取消订阅的函数
+        """
+        entry = (callback, None if keys is None else frozenset(keys))
+        with self._lock:
+            self._listeners.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._listeners:
+                    self._listeners.remove(entry)
+        return unsubscribe
+
+    # ================= 写回文件 =================
+    def _schedule_write(self):
+        self._dirty = True
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.debounce, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """
+        立即写回所有待写的修改(原子写入: 先写临时文件再替换)
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                data = dict(self._persisted)
+                self._dirty = False
+            try:
+                tmp_path = self.path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8', newline=self._newline) as f:
+                    yaml.dump(data, f, allow_unicode=True, default_flow_style=False)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"保存配置失败: {e}")
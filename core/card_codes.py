@@ -0,0 +1,54 @@
+"""
+牌的整数编码
+
+识别 -> 记牌的整条流水线里, 一张牌就是一个 0~14 的整数:
+    3 4 5 6 7 8 9 10 J Q K A 2 jok JOK
+    0 1 2 3 4 5 6 7  8 9 10 11 12 13 14
+- 每个区域的一帧识别结果是 tuple[int], 比较/哈希都很便宜
+- 剩余牌数是固定 15 格的计数向量 list[int], 下标就是牌的编码
+字符串只在 UI 显示时才转换(见 utils/trans_yolo_names_to_string.py)
+"""
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+import config.settings as settings
+from config.settings import TOTAL_CARDS
+
+CARD_NAMES = tuple(TOTAL_CARDS.keys())                      # 编码 -> 牌名
+CARD_CODE = {name: code for code, name in enumerate(CARD_NAMES)}  # 牌名 -> 编码
+NUM_CARDS = len(CARD_NAMES)
+TOTAL_COUNTS = tuple(TOTAL_CARDS[name] for name in CARD_NAMES)   # 一副牌每种牌的张数
+UNKNOWN_CODE = -1                                                # 不是牌的类别(查找表里的占位值)
+
+
+def build_class_to_code(names: Dict[int, str]) -> np.ndarray:
+    """
+    根据模型的类别名生成查找表: YOLO 类别 id -> 牌的编码
+    yolo_to_card_mapping 在调用时读取(改了配置后重新加载模型即可生效)
+    映射里没有的类别(模型多出来的类别)对应 UNKNOWN_CODE, 识别时忽略这些框
+    """
+    mapping = settings.YOLO_TO_CARD_MAPPING
+    lut = np.full(max(names) + 1 if names else 0, UNKNOWN_CODE, dtype=np.int64)
+    unknown = []
+    for cls_id, yolo_name in names.items():
+        card = mapping.get(yolo_name)
+        if card in CARD_CODE:
+            lut[cls_id] = CARD_CODE[card]
+        else:
+            unknown.append(yolo_name)
+    if unknown:
+        print(f"[CardDetector] 模型类别 {unknown} 没有对应的牌(见 yolo_to_card_mapping), 识别时忽略")
+    return lut
+
+
+def codes_to_names(codes: Iterable[int]) -> List[str]:
+    return [CARD_NAMES[c] for c in codes]
+
+
+def new_count_vector() -> List[int]:
+    """
+    一副完整牌的计数向量(重置记牌器时使用)
+    """
+    return list(TOTAL_COUNTS)
@@ -1,16 +1,100 @@
-import torch
-from ultralytics import YOLO
+import threading
+from concurrent.futures import Future
 import config.settings as settings
-from core.screen_capture import ScreenCapture
-from typing import List, Dict, Tuple
-from config.settings import YOLO_TO_CARD_MAPPING
+from core.frame_source import FrameSource, GdiFrameSource
+from core.detections import Detections, REGION_NAMES, assign_regions, layout_to_pixel_regions
+from core.roi_mosaic import RoiMosaic
+from core.frame_diff import RegionChangeDetector
+from core.region_cache import RegionResultCache
+from core.session_archive import start_recording, stop_recording
+from core.model_registry import MODEL_REGISTRY
+import numpy as np
+from typing import List, Dict, Optional
+from core.card_codes import UNKNOWN_CODE, build_class_to_code
+from core.stage_timer import STAGE_TIMER
+
+def sort_indices_topright_rowwise(boxes: np.ndarray, max_rows: Optional[int] = 3) -> np.ndarray:
+    """
+    输入:
+        boxes: (N, 4) xyxy
+
+    输出:
+        排序后的下标数组：
+        - 先按“行”从上到下
+        - 同一行内按“从左到右”
+        - 排序使用右上角 (x2, y1)
+
+    核心算法(解释):
+        1) 取每个框的“右上角”特征：
+            top_y = y1
+            right_x = x2
+        2) 先按 top_y 从小到大排序（稳定排序, O(n log n)）
+        3) 用“行容差阈值”把框聚成若干行：
+            - 同一行的 y1 会有抖动，所以不能用完全相等
+            - 阈值用中位高度的比例来定：tol = median_height * 0.55
+              （高度越大，允许的y误差越大；这样更自适应）
+            - 行锚点是该行 top_y 的平均值
+            - 按 top_y 升序扫描时, 一旦开了新行, 之后的框都比前面各行的锚点大出 tol 以上,
+              所以只需要和“最后一行”比较, 一次线性扫描即可(不用每个框扫描所有行)
+        4) 行数 > max_rows 时, 多出来的行并入离它最近的保留行, 即最后一个保留行
+        5) 每行内部再按 right_x 从小到大排序（即从左到右, 相同时保持 top_y 顺序）
+        6) 行与行按行锚点 y 从小到大拼接（上行在前，下行在后）
+
+    参数:
+        max_rows: 期望的最大行数。对手一般 1~2 行；默认 3。
+    """
+    n = len(boxes)
+    if n == 0:
+        return np.zeros((0,), dtype=int)
+
+    boxes = np.asarray(boxes, dtype=np.float64)
+    top_y = boxes[:, 1]
+    right_x = boxes[:, 2]
+
+    # 用中位高度来确定“同一行y误差容忍度”
+    heights = np.sort(np.maximum(1, boxes[:, 3] - boxes[:, 1]))
+    mid = n // 2
+    median_h = heights[mid] if n % 2 == 1 else (heights[mid - 1] + heights[mid]) / 2.0
+    tol = float(median_h) * 0.55  # 差距小于这个值认为再同一行
+
+    # 先按 top_y 排，便于做行聚类
+    by_y = np.argsort(top_y, kind="stable")
+    ys = top_y[by_y].tolist()
+
+    # 线性扫描: 和最后一行的锚点足够近就并入, 否则开新行
+    row_of_sorted = [0] * n
+    row = 0
+    anchor = ys[0]
+    count = 1
+    for k in range(1, n):
+        y = ys[k]
+        if abs(y - anchor) <= tol:
+            count += 1
+            # 更新锚点：用简单平均让锚点更稳定
+            anchor = (anchor * (count - 1) + y) / count
+        else:
+            row += 1
+            anchor = y
+            count = 1
+        row_of_sorted[k] = row
+
+    rows = np.array(row_of_sorted, dtype=int)
+    # 如果聚出来行数 > max_rows，多出来的行并入最后一个保留行
+    if max_rows is not None and max_rows >= 1:
+        np.minimum(rows, max_rows - 1, out=rows)
+
+    # 主键: 行号; 次键: right_x; 再次: 在 top_y 排序中的位置(稳定)
+    order_in_sorted = np.lexsort((np.arange(n), right_x[by_y], rows))
+    return by_y[order_in_sorted]
+
 
 class CardDetector:
 
-    def __init__(self,  layout_name):
+    def __init__(self,  layout_name, frame_source: Optional[FrameSource] = None):
         self.yolo_iou = settings.YOLO_IOU_THRESHOLD
         self.yolo_conf = settings.YOLO_CONFIDENCE_THRESHOLD
         self.weight_path = settings.YOLO_MODEL_PATH
+        self.onnx_path = settings.YOLO_ONNX_MODEL_PATH
         
         # 如果没有提供布局名称或配置不存在，使用字典中第一个配置
         if layout_name is None or layout_name not in settings.WINDOW_LAYOUTS:
@@ -21,35 +105,166 @@ class CardDetector:
             else:
                 raise ValueError("WINDOW_LAYOUTS 字典为空，没有可用的配置")
         
+        self.__apply_layout(layout_name)
+        # 帧来源: 默认截取游戏窗口; 也可以传入图片目录/视频/内存缓冲区做回放和压测
+        self.frame_source = frame_source if frame_source is not None else GdiFrameSource(self.window_title)
+        # 区域裁剪模式: 只把 layout 的五个区域拼成一张小图送进 YOLO
+        self.roi_mode = settings.ROI_MODE
+        # 运行中切换布局 / 设备: 任意线程调用 set_layout / set_device 只记下请求, 在识别线程下一帧开始前生效,
+        # 不用重建 CardDetector(模型不重新加载), 也不会和正在进行的推理冲突
+        self._pending_layout = None
+        self._pending_device = None
+        self._pending_lock = threading.Lock()  # 请求在界面线程写, 在识别线程取
+        # 对局录制(见 core/session_archive.py): 不为 None 时每一帧的画面和识别结果都写进会话目录
+        self.recorder = None
+
+        # 模型延迟加载: 构造时不加载(导入 torch + 读取权重要好几秒, 会拖慢窗口显示)
+        # 可以在后台线程提前调用 load_model(), 第一次 detect() 会等待加载完成
+        self.model = None
+        self.device = None
+        self._model_future = Future()
+        self._load_lock = threading.Lock()
+        self._class_to_code = None  # YOLO 类别 id -> 牌编码 的查找表, 模型加载后生成
+
+    def __apply_layout(self, layout_name):
         self.layout_name = layout_name
         self.layout_config = settings.WINDOW_LAYOUTS[layout_name]
         self.window_title = self.layout_config["window_title"]
-        self.screen_capture = ScreenCapture(self.window_title)
-        self.model, self.device = self.__load_model() # 自动加载模型
+        layout = self.layout_config["layout"]
+        self.roi_mosaic = RoiMosaic(layout)
+        # 帧差门控: 区域画面没变就复用上一次的识别结果; 阈值 <= 0 时关闭
+        if settings.FRAME_DIFF_THRESHOLD > 0:
+            self.change_detector = RegionChangeDetector(layout, settings.FRAME_DIFF_THRESHOLD)
+        else:
+            self.change_detector = None
+        # 区域结果缓存: 画面回到之前见过的样子时直接用缓存的牌; 容量 <= 0 时关闭
+        if settings.REGION_CACHE_SIZE > 0:
+            self.region_cache = RegionResultCache(layout, settings.REGION_CACHE_SIZE)
+        else:
+            self.region_cache = None
+        self.last_cards = {name: () for name in REGION_NAMES}  # 每个区域最近一次识别出的牌(编码)
+
+    # ================= 运行中切换 =================
+    def set_layout(self, layout_name):
+        """
+        切换布局(区域 / 窗口标题), 下一帧生效; 已加载的模型继续使用
+        """
+        if layout_name not in settings.WINDOW_LAYOUTS:
+            raise ValueError(f"未知的布局配置: {layout_name}")
+        with self._pending_lock:
+            self._pending_layout = layout_name
+
+    def set_device(self, device_choice):
+        """
+        切换推理设备, 下一帧生效:
+        cpu <-> cuda 只把已加载的权重搬到新设备; 换成另一种后端(PyTorch <-> ONNX)时才重新加载模型
+        """
+        with self._pending_lock:
+            self._pending_device = device_choice
+
+    def __apply_pending(self):
+        # 一次取走所有请求; 模型还没加载时保留设备请求, 加载完的第一帧再切换
+        with self._pending_lock:
+            layout_name, self._pending_layout = self._pending_layout, None
+            device_choice = None
+            if self._pending_device is not None and self.model is not None:
+                device_choice, self._pending_device = self._pending_device, None
+
+        if layout_name is not None and layout_name != self.layout_name:
+            self.__apply_layout(layout_name)
+            retarget = getattr(self.frame_source, "retarget", None)
+            if retarget is not None:
+                retarget(self.window_title)
+            if self.recorder is not None:
+                # 会话的 meta.json 记录的是开始录制时的布局, 换布局后结束当前会话, 从这一帧起另开一个
+                frame_format = self.recorder.frame_format
+                stop_recording(self)
+                start_recording(self, frame_format=frame_format)
+            print(f"[CardDetector] 已切换布局: {layout_name}")
+
+        if device_choice is not None:
+            if self.model.to_device(device_choice):
+                self.device = self.model.device
+                print(f"[CardDetector] 模型已移动到: {self.device}")
+            else:
+                try:
+                    model = self.__acquire_model(device_choice)
+                except Exception as e:
+                    # 新后端加载失败时继续用原来的模型
+                    print(f"[CardDetector] 切换到 {device_choice} 失败，继续使用 {self.device}: {e}")
+                    return
+                old = self.model
+                self._class_to_code = build_class_to_code(model.names)
+                self.model, self.device = model, model.device
+                self.__release_model(old)
+                self._model_future = Future()
+                self._model_future.set_result(model)
+            # 换设备后识别结果可能有细微差别, 不复用旧结果
+            if self.region_cache is not None:
+                self.region_cache.clear()
+
+    # ================= 加载模型 =================
+    @property
+    def model_ready(self):
+        return self._model_future.done() and self._model_future.exception() is None
+
+    def load_model(self):
+        """
+        加载模型(阻塞), 多个线程同时调用时只加载一次, 其余线程等待同一个结果
+        加载失败时异常保存在 future 中, 之后每次调用都会抛出
+        """
+        with self._load_lock:
+            if not self._model_future.done():
+                try:
+                    self.__use_backend(self.__load_model())
+                except Exception as e:
+                    self._model_future.set_exception(e)
+        return self._model_future.result()
+
+    def use_backend(self, model):
+        """
+        直接使用已经创建好的推理后端(不读取 device_choice 等配置), 例如精度对比脚本
+        """
+        with self._load_lock:
+            if self._model_future.done():
+                raise RuntimeError("模型已经加载")
+            self.__use_backend(model)
+
+    def __use_backend(self, model):
+        self._class_to_code = build_class_to_code(model.names)
+        # 最后才赋值 self.model: detect() 看到它不为 None 就直接使用
+        self.model, self.device = model, model.device
+        self._model_future.set_result(self.model)
 
     # ================= 选择设备 =================
     def __load_model(self):
-        model = YOLO(self.weight_path)
-        
-        # 根据用户设置选择设备
+        # 根据用户设置选择设备 / 推理后端 (cpu / cuda / onnx / openvino)
         device_choice = settings.DEVICE_CHOICE
         print(f"[CardDetector] 当前设备选择: {device_choice}")
-        
-        if device_choice == "cuda":
-            # 使用GPU
-            if torch.cuda.is_available():
-                model.to("cuda")
-                print("[CardDetector] 使用GPU (CUDA)")
-                return model, "cuda"
-            else:
-                print("[CardDetector] 警告: 用户选择了GPU，但CUDA不可用，使用CPU")
-                model.to("cpu")
-                return model, "cpu"
-        else:
-            # 使用CPU
-            model.to("cpu")
-            print("[CardDetector] 使用CPU")
-            return model, "cpu"
+        return self.__acquire_model(device_choice)
+
+    def __acquire_model(self, device_choice):
+        # 同样的权重 + 设备 + 推理选项在进程内只加载一次 (见 core/model_registry.py)
+        return MODEL_REGISTRY.acquire(self.weight_path, self.onnx_path, device_choice,
+                                      half=settings.HALF_PRECISION, fuse=settings.FUSE_MODEL,
+                                      imgsz=settings.INFER_IMGSZ, warmup=settings.WARMUP,
+                                      workers=settings.INFERENCE_WORKERS)
+
+    @staticmethod
+    def __release_model(model):
+        # use_backend 传进来的后端不归注册表管, 没有 release
+        release = getattr(model, "release", None)
+        if release is not None:
+            release()
+
+    def close(self):
+        """
+        释放共享模型的引用和帧来源; 之后不能再识别
+        """
+        model, self.model = self.model, None
+        if model is not None:
+            self.__release_model(model)
+        self.frame_source.close()
 
 
 
@@ -60,213 +275,200 @@ class CardDetector:
                   det["bbox"] = (x1, y1, x2, y2)
 
         输出:
-            排好序的 dets：
-            - 先按“行”从上到下
-            - 同一行内按“从左到右”
-            - 排序使用右上角 (x2, y1)
-
-        核心算法(解释):
-            1) 取每个框的“右上角”特征：
-                top_y = y1
-                right_x = x2
-            2) 先按 top_y 从小到大粗排序（越小越靠上）
-            3) 用“行容差阈值”把框聚成若干行：
-                - 同一行的 y1 会有抖动，所以不能用完全相等
-                - 阈值用中位高度的比例来定：tol = median_height * 0.6
-                  （高度越大，允许的y误差越大；这样更自适应）
-            4) 每行内部再按 right_x 从小到大排序（即从左到右）
-            5) 行与行按行锚点 y 从小到大拼接（上行在前，下行在后）
-
-        参数:
-            max_rows: 期望的最大行数。对手一般 1~2 行；默认 3。
+            排好序的 dets (排序规则见 sort_indices_topright_rowwise)
         """
-
         if not dets:
             return []
-
-        # 为每个 det 预计算特征
-        feats: List[Tuple[float, float, int]] = []  # (top_y, right_x, idx)
-        heights = []
-        for i, d in enumerate(dets):
-            x1, y1, x2, y2 = d["bbox"]
-            feats.append((float(y1), float(x2), i))
-            heights.append(max(1, (y2 - y1)))
-
-        # 用中位高度来确定“同一行y误差容忍度”
-        heights_sorted = sorted(heights)
-        mid = len(heights_sorted) // 2
-        median_h = heights_sorted[mid] if len(heights_sorted) % 2 == 1 else (heights_sorted[mid - 1] + heights_sorted[
-            mid]) / 2.0
-        tol = median_h * 0.55  # 差距小于这个值认为再同一行
-
-        # 先按 top_y 排，便于做行聚类
-        feats.sort(key=lambda t: t[0])  # top_y 升序
-
-        rows: List[Dict] = []
-        # rows 结构：[{ "anchor_y": float, "items": [(top_y,right_x,idx), ...] }, ...]
-
-        for top_y, right_x, idx in feats:
-            placed = False
-
-            # 尝试放入已有行（和行锚点y足够近则认为同一行）
-            for row in rows:
-                if abs(top_y - row["anchor_y"]) <= tol:
-                    row["items"].append((top_y, right_x, idx))
-                    # 更新锚点：用简单平均让锚点更稳定
-                    n = len(row["items"])
-                    row["anchor_y"] = (row["anchor_y"] * (n - 1) + top_y) / n
-                    placed = True
-                    break
-
-            # 放不进去就新开一行
-            if not placed:
-                rows.append({"anchor_y": top_y, "items": [(top_y, right_x, idx)]})
-
-        # 行按 anchor_y 从上到下
-        rows.sort(key=lambda r: r["anchor_y"])
-
-        # 如果聚出来行数 > max_rows，可做一个“合并策略”
-        # 这里采用：保留最上面的 max_rows 行，其余按y接近合并进最近的行
-        if max_rows is not None and len(rows) > max_rows:
-            kept = rows[:max_rows]
-            extra = rows[max_rows:]
-            for er in extra:
-                # 找与该行 anchor_y 最近的保留行
-                target = min(kept, key=lambda r: abs(er["anchor_y"] - r["anchor_y"]))
-                target["items"].extend(er["items"])
-                # 重新计算 target anchor_y（简单平均）
-                ys = [it[0] for it in target["items"]]
-                target["anchor_y"] = sum(ys) / len(ys)
-            rows = kept
-            rows.sort(key=lambda r: r["anchor_y"])
-
-        # 每行内部按 right_x 从小到大 = 从左到右
-        sorted_indices: List[int] = []
-        for row in rows:
-            row["items"].sort(key=lambda t: t[1])  # right_x 升序
-            sorted_indices.extend([idx for _, _, idx in row["items"]])
-
-        return [dets[i] for i in sorted_indices]
+        boxes = np.array([d["bbox"] for d in dets], dtype=np.float64)
+        return [dets[i] for i in sort_indices_topright_rowwise(boxes, max_rows)]
 
     # ================= 解析结果 =================
     def parse_result(self, r):
         """
-        解析 YOLO 单帧检测结果
+        解析 YOLO 单帧检测结果 (ultralytics 的 Results 或 Detections)
         返回：
         player_hand, player_played, opponent_left, opponent_right, landlord_cards
+        每个区域是一个 Detections(紧凑的 numpy 数组), 已按从上到下、从左到右排好序
+
+        区域划分是向量化的:
+            1) 一次算出所有框的中心
+            2) 与五个区域做广播比较, 得到 (框数 x 区域数) 的包含矩阵
+            3) 每行取第一个 True 的区域(argmax), 与原来逐个区域 in_region 再 break 的语义一致
         """
 
-        # 取得布局
-        layout = self.layout_config["layout"]
-        # print(layout)
+        if not isinstance(r, Detections):
+            r = Detections.from_ultralytics(r)
+
+        # 模型里有、映射里没有的类别不是牌, 直接丢掉
+        if self._class_to_code is not None and len(r):
+            known = self._class_to_code[r.cls] != UNKNOWN_CODE
+            if not known.all():
+                r = r.select(known)
 
         img_h, img_w = r.orig_shape[:2]
 
-        # 将归一化区域转为像素区域
-        def norm_to_pixel(box):
-            x1, y1, x2, y2 = box
-            return (
-                int(x1 * img_w),
-                int(y1 * img_h),
-                int(x2 * img_w),
-                int(y2 * img_h)
-            )
-
-        # 判断点是否在区域内
-        def in_region(cx, cy, region):
-            rx1, ry1, rx2, ry2 = region
-            return rx1 <= cx <= rx2 and ry1 <= cy <= ry2
-
-        regions = {
-            "player_hand": norm_to_pixel(layout["player_hand"]),
-            "player_played": norm_to_pixel(layout["player_played"]),  # ✅ 新增
-            "opponent_left": norm_to_pixel(layout["opponent_left"]),
-            "opponent_right": norm_to_pixel(layout["opponent_right"]),
-            "landlord_cards": norm_to_pixel(layout["landlord_cards"]),
-        }
-
-        # 初始化结果
-        results = {
-            "player_hand": [],
-            "player_played": [],
-            "opponent_left": [],
-            "opponent_right": [],
-            "landlord_cards": []
-        }
-
-        if r.boxes is None:
-            return (
-                results["player_hand"],
-                results["player_played"],
-                results["opponent_left"],
-                results["opponent_right"],
-                results["landlord_cards"]
-            )
-
-        boxes = r.boxes.xyxy.cpu().numpy()
-        clses = r.boxes.cls.cpu().numpy().astype(int)
-        names = [r.names[c] for c in clses]
-
-
-
-        for box, yolo_name in zip(boxes, names):
-            x1, y1, x2, y2 = box
-            cx = (x1 + x2) / 2
-            cy = (y1 + y2) / 2
-
-            det = {
-                "bbox": (float(x1), float(y1), float(x2), float(y2)),
-                "name": yolo_name
-            }
-
-            for name, region in regions.items():
-                if in_region(cx, cy, region):
-                    results[name].append(det)
-                    break
-
-        # 必须排序, 不然乱序, yolo检测的好像按照置信度排的
-        results["opponent_left"] = self.sort_cards_by_topright_rowwise(results["opponent_left"])
-        results["opponent_right"] = self.sort_cards_by_topright_rowwise(results["opponent_right"])
-        results["landlord_cards"] = self.sort_cards_by_topright_rowwise(results["landlord_cards"])
-        results["player_hand"] = self.sort_cards_by_topright_rowwise(results["player_hand"])
-        results["player_played"] = self.sort_cards_by_topright_rowwise(results["player_played"])
-
-        return (
-            results["player_hand"],
-            results["player_played"],
-            results["opponent_left"],
-            results["opponent_right"],
-            results["landlord_cards"]
-        )
+        # 取得布局, 将归一化区域转为像素区域
+        regions = layout_to_pixel_regions(self.layout_config["layout"], img_w, img_h)
+
+        region_idx = assign_regions(r.boxes, regions)
+
+        results = []
+        for i in range(len(REGION_NAMES)):
+            region_dets = r.select(region_idx == i)
+            # 必须排序, 不然乱序, yolo检测的好像按照置信度排的
+            results.append(self.__sort_region(region_dets))
+
+        # 顺序: player_hand, player_played, opponent_left, opponent_right, landlord_cards
+        return tuple(results)
+
+    def __sort_region(self, dets: Detections) -> Detections:
+        if len(dets) <= 1:
+            return dets
+        return dets.select(sort_indices_topright_rowwise(dets.boxes))
 
     # ================= 执行一次识别 =================
-    def __perform_yolo_recognition(self):
-        img = self.screen_capture.capture_window()
-        results = self.model(
-            img,
-            conf=self.yolo_conf,
-            iou=self.yolo_iou,
-            device=self.device,
-            verbose=False,
-        )
-        return results
-
-    def __trans_yolo_to_card(self, r): # yolo 标签转为扑克牌点数
-        res = []
-        for dic in r:
-            name = dic["name"]
-            name = YOLO_TO_CARD_MAPPING[name]
-            res.append(name)
-        return res
+    def __plan_inference(self, img, region_names=REGION_NAMES):
+        """
+        返回 (推理输入, 推理尺寸, 拼图方案); 推理尺寸为 None 时使用模型的默认尺寸, 方案为 None 表示整帧推理
+        """
+        # 只有区域裁剪模式才走拼图推理; 否则哪怕只有一个区域变了也整帧推理,
+        # 同一个区域的框不会时而来自整帧、时而来自拼图(边缘的牌可能一会儿识别到一会儿没有, 拖慢 frame_length 判稳)
+        if self.roi_mode:
+            mosaic, plan = self.roi_mosaic.compose(img, region_names)
+            return mosaic, self.roi_mosaic.infer_imgsz(plan, img.shape[:2], self.model.base_imgsz), plan
+        return img, None, None
+
+    def __trans_yolo_to_card(self, r: Detections): # yolo 类别转为牌的编码 (见 core/card_codes.py)
+        return tuple(self._class_to_code[r.cls].tolist())
 
     def detect(self):
-        r = self.__perform_yolo_recognition()
-        r1, r2, r3, r4, r5 = self.parse_result(r[0])
-        player_hand = self.__trans_yolo_to_card(r1)
-        player_played = self.__trans_yolo_to_card(r2)
-        opponent_left = self.__trans_yolo_to_card(r3)
-        opponent_right = self.__trans_yolo_to_card(r4)
-        landlord_cards = self.__trans_yolo_to_card(r5)
-        return player_hand, player_played, opponent_left, opponent_right, landlord_cards
+        """
+        从帧来源读取一帧并识别
+        """
+        self.__apply_pending()  # 先切换窗口, 再截图
+        with STAGE_TIMER.span("capture"):
+            img = self.frame_source.read()
+        return self.detect_frame(img)
 
+    def detect_frame(self, img):
+        """
+        识别给定的一帧(BGR ndarray), 流水线模式下截图和识别在不同线程, 直接调用这个
+        返回: player_hand, player_played, opponent_left, opponent_right, landlord_cards (牌编码的 tuple)
+        """
+        if self.model is None:
+            self.load_model()  # 还没加载(或正在后台加载)时在这里等待
+
+        with STAGE_TIMER.span("detect"):
+            job = self.begin_frame(img)
+            dets = None
+            if job.needs_inference:
+                with STAGE_TIMER.span("inference"):
+                    dets = self.model.predict(job.infer_img, conf=self.yolo_conf, iou=self.yolo_iou, imgsz=job.imgsz)
+            result = self.finish_frame(job, dets)
+        self.record_frame(img, result)
+        return result
+
+    # 多桌同时识别时(见 core/multi_session.py), 几个 CardDetector 的推理合成一次批量推理:
+    # 各自 begin_frame -> 一起 predict_batch -> 各自 finish_frame
+    def begin_frame(self, img, pipelined: bool = False) -> "FrameJob":
+        """
+        识别的前半段: 帧差门控 + 区域结果缓存, 决定这一帧要推理什么
+        job.needs_inference 为 False 时不用推理, 直接 finish_frame(job)
 
+        pipelined: 前面的帧还没 finish_frame 就开始下一帧(见 core/process_pool.py 的 OrderedDetections)。
+            此时帧差门控的参考立即更新为这一帧, 下一帧和这一帧比较; 各帧按顺序 finish_frame,
+            没变化的区域复用的就是这一帧的结果
+        """
+        if self.model is None:
+            self.load_model()
+        self.__apply_pending()
+
+        job = FrameJob(img, self.layout_name)
+        if img is None: # 没找到窗口 / 回放结束
+            return job
+
+        # 所有区域都没变化时直接复用上一次的结果(区域裁剪模式下只重新识别有变化的区域)
+        if self.change_detector is not None:
+            with STAGE_TIMER.span("frame_diff"):
+                dirty = self.change_detector.dirty_regions(img)
+                if pipelined:
+                    self.change_detector.commit()
+                    job.committed = True
+        else:
+            dirty = list(REGION_NAMES)
+
+        # 之前见过的区域画面直接用缓存的结果, 只有没见过的区域才推理
+        if dirty and self.region_cache is not None:
+            with STAGE_TIMER.span("region_cache"):
+                misses = []
+                for name in dirty:
+                    key = job.keys[name] = self.region_cache.region_key(img, name)
+                    cards = self.region_cache.get(key)
+                    if cards is None:
+                        misses.append(name)
+                    else:
+                        job.cached[name] = cards
+                dirty = misses
+
+        job.dirty = dirty
+        if dirty:
+            job.infer_img, job.imgsz, job.plan = self.__plan_inference(img, dirty)
+        return job
+
+    def finish_frame(self, job: "FrameJob", dets: Optional[Detections] = None):
+        """
+        识别的后半段: 把推理结果(推理输入坐标系下的 Detections)分到各区域, 更新缓存
+        返回值与 detect_frame 相同
+        """
+        img = job.img
+        if img is None:
+            return (), (), (), (), ()
+        if job.layout_name != self.layout_name:
+            # 这一帧开始后布局切换了(多帧在途时后面的帧先 begin_frame): 它的区域划分已经作废, 结果丢弃
+            return tuple(self.last_cards[name] for name in REGION_NAMES)
+        self.last_cards.update(job.cached)
+        if job.needs_inference:
+            if job.plan is not None:
+                dets = self.roi_mosaic.map_back(dets, job.plan, img.shape[:2])
+            # 整帧推理时所有区域都用这次的结果, 拼图推理时只有拼进去的区域
+            updated = REGION_NAMES if job.plan is None else job.dirty
+            with STAGE_TIMER.span("parse"):
+                parsed = self.parse_result(dets)
+                for name, region_dets in zip(REGION_NAMES, parsed):
+                    if name in updated:
+                        cards = self.__trans_yolo_to_card(region_dets)
+                        self.last_cards[name] = cards
+                        if name in job.keys:
+                            self.region_cache.put(job.keys[name], cards)
+        if self.change_detector is not None and not job.committed:
+            self.change_detector.commit()
+        # 顺序: player_hand, player_played, opponent_left, opponent_right, landlord_cards
+        return tuple(self.last_cards[name] for name in REGION_NAMES)
+
+    def record_frame(self, img, result):
+        # 对局录制(见 core/session_archive.py)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(img, result)
+
+
+class FrameJob:
+    """
+    一帧识别的中间状态 (CardDetector.begin_frame 生成, finish_frame 消费)
+    """
+    __slots__ = ("img", "layout_name", "dirty", "keys", "cached", "committed", "infer_img", "imgsz", "plan")
+
+    def __init__(self, img, layout_name=None):
+        self.img = img
+        self.layout_name = layout_name  # 开始这一帧时的布局
+        self.dirty = ()         # 需要推理的区域
+        self.keys = {}          # 区域 -> 结果缓存的键
+        self.cached = {}        # 区域 -> 缓存命中的牌(finish_frame 时才写入 last_cards)
+        self.committed = False  # 帧差门控的参考是否已经更新
+        self.infer_img = None   # 推理输入(整帧或拼图)
+        self.imgsz = None       # 推理尺寸, None 表示模型默认尺寸
+        self.plan = None        # 拼图方案, None 表示整帧推理
+
+    @property
+    def needs_inference(self) -> bool:
+        return self.infer_img is not None
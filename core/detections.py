@@ -0,0 +1,98 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 布局中的五个区域, 顺序即区域匹配的优先级(框的中心落在多个区域时取第一个)
+REGION_NAMES = ("player_hand", "player_played", "opponent_left", "opponent_right", "landlord_cards")
+
+
+def layout_to_pixel_regions(layout: Dict, img_w: int, img_h: int) -> Dict[str, Tuple[int, int, int, int]]:
+    """
+    把 layout 的归一化区域转换为像素区域, 按 REGION_NAMES 的顺序返回
+    """
+    regions = {}
+    for name in REGION_NAMES:
+        x1, y1, x2, y2 = layout[name]
+        regions[name] = (
+            int(x1 * img_w),
+            int(y1 * img_h),
+            int(x2 * img_w),
+            int(y2 * img_h)
+        )
+    return regions
+
+
+class Detections:
+    """
+    单帧检测结果, 与推理后端无关
+
+    boxes:      (N, 4) float32, xyxy, 原图像素坐标
+    cls:        (N,) int, 类别 id
+    names:      {类别 id: yolo 标签名}
+    orig_shape: 原图 (h, w)
+    """
+
+    __slots__ = ("boxes", "cls", "names", "orig_shape")
+
+    def __init__(self, boxes: np.ndarray, cls: np.ndarray, names: Dict[int, str], orig_shape: Tuple[int, int]):
+        self.boxes = boxes
+        self.cls = cls
+        self.names = names
+        self.orig_shape = orig_shape
+
+    def __len__(self):
+        return len(self.cls)
+
+    @classmethod
+    def empty(cls, names: Dict[int, str], orig_shape: Tuple[int, int]) -> "Detections":
+        return cls(np.zeros((0, 4), dtype=np.float32), np.zeros((0,), dtype=int), names, orig_shape)
+
+    @classmethod
+    def from_ultralytics(cls, r) -> "Detections":
+        """
+        ultralytics.engine.results.Results -> Detections
+        """
+        orig_shape = tuple(r.orig_shape[:2])
+        if r.boxes is None:
+            return cls.empty(r.names, orig_shape)
+        boxes = r.boxes.xyxy.cpu().numpy().astype(np.float32, copy=False)
+        clses = r.boxes.cls.cpu().numpy().astype(int)
+        return cls(boxes, clses, r.names, orig_shape)
+
+    @classmethod
+    def concat(cls, parts: List["Detections"], names: Dict[int, str], orig_shape: Tuple[int, int]) -> "Detections":
+        parts = [p for p in parts if len(p) > 0]
+        if not parts:
+            return cls.empty(names, orig_shape)
+        boxes = np.concatenate([p.boxes for p in parts], axis=0)
+        clses = np.concatenate([p.cls for p in parts], axis=0)
+        return cls(boxes, clses, names, orig_shape)
+
+    def select(self, mask: np.ndarray, orig_shape: Optional[Tuple[int, int]] = None) -> "Detections":
+        return Detections(self.boxes[mask], self.cls[mask], self.names,
+                          self.orig_shape if orig_shape is None else orig_shape)
+
+
+def assign_regions(boxes: np.ndarray, regions: Dict[str, Tuple[int, int, int, int]]) -> np.ndarray:
+    """
+    按框中心所在区域给每个框分配区域下标(REGION_NAMES 中的顺序), 不在任何区域内为 -1
+    框中心同时落在多个区域时取第一个区域(与逐个区域判断 in_region 再 break 的语义一致)
+    """
+    n = len(boxes)
+    if n == 0:
+        return np.zeros((0,), dtype=int)
+
+    cx = (boxes[:, 0] + boxes[:, 2]) / 2
+    cy = (boxes[:, 1] + boxes[:, 3]) / 2
+
+    # (区域数, 4) -> 广播成 (框数, 区域数) 的包含矩阵
+    rects = np.array([regions[name] for name in REGION_NAMES], dtype=np.float64)
+    inside = (
+        (rects[None, :, 0] <= cx[:, None]) & (cx[:, None] <= rects[None, :, 2]) &
+        (rects[None, :, 1] <= cy[:, None]) & (cy[:, None] <= rects[None, :, 3])
+    )
+
+    # argmax 返回第一个 True 的下标; 全 False 的行置 -1
+    idx = inside.argmax(axis=1)
+    idx[~inside.any(axis=1)] = -1
+    return idx
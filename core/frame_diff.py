@@ -0,0 +1,110 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.detections import REGION_NAMES, layout_to_pixel_regions
+
+
+class RegionChangeDetector:
+    """
+    区域变化检测 (推理前的廉价门控)
+
+    大部分时间画面和上一次推理时完全一样, 没必要再跑一次 YOLO。
+    对每个区域按 step 隔点采样得到缩略图, 和"该区域上一次推理时"的缩略图比较:
+    缩略图切成 block x block 的小块, 任一小块的平均绝对差超过阈值才认为该区域变了(脏区域),
+    只有脏区域需要重新推理。按小块而不是整个区域求平均, 大区域里只变了一小块(比如多出一张牌)
+    也不会被摊薄到阈值以下。
+
+    注意: 参考缩略图只在区域被重新推理后才更新(见 commit), 缓慢的渐变也会累积到阈值。
+    """
+
+    def __init__(self, layout: Dict, threshold: float = 1.0, step: int = 4, block: int = 8):
+        """
+        threshold: 小块平均绝对差(0~255)的阈值
+        step: 采样间隔(像素)
+        block: 小块边长(采样点), 对应原图 step * block 像素
+        """
+        self.layout = layout
+        self.threshold = threshold
+        self.step = max(1, int(step))
+        self.block = max(1, int(block))
+        self._shape: Optional[Tuple[int, int]] = None
+        self._slices: Dict[str, Tuple[slice, slice]] = {}
+        self._refs: Dict[str, Optional[np.ndarray]] = {}
+        self._pending: Dict[str, np.ndarray] = {}
+
+    def reset(self):
+        """
+        丢弃所有参考缩略图, 下一帧所有区域都视为脏区域
+        """
+        self._shape = None
+
+    def _prepare(self, img_h: int, img_w: int):
+        regions = layout_to_pixel_regions(self.layout, img_w, img_h)
+        self._slices = {}
+        for name in REGION_NAMES:
+            x1, y1, x2, y2 = regions[name]
+            self._slices[name] = (
+                slice(max(0, y1), min(img_h, y2 + 1), self.step),
+                slice(max(0, x1), min(img_w, x2 + 1), self.step),
+            )
+        self._refs = {name: None for name in REGION_NAMES}
+        self._pending = {}
+        self._shape = (img_h, img_w)
+
+    def dirty_regions(self, frame: np.ndarray) -> List[str]:
+        """
+        返回需要重新推理的区域名(按 REGION_NAMES 顺序)
+        """
+        img_h, img_w = frame.shape[:2]
+        if self._shape != (img_h, img_w):
+            # 第一帧或窗口尺寸变化: 全部重新推理
+            self._prepare(img_h, img_w)
+
+        dirty = []
+        self._pending = {}
+        for name in REGION_NAMES:
+            ys, xs = self._slices[name]
+            thumb = frame[ys, xs]
+            ref = self._refs[name]
+            if ref is None or ref.shape != thumb.shape:
+                changed = True
+            else:
+                changed = self._max_block_diff(thumb, ref) > self.threshold
+            if changed:
+                dirty.append(name)
+                self._pending[name] = thumb
+        return dirty
+
+    def _max_block_diff(self, thumb: np.ndarray, ref: np.ndarray) -> float:
+        """
+        各小块平均绝对差的最大值(边缘不满一块的按实际点数平均)
+        """
+        if thumb.size == 0:
+            return 0.0
+        # uint8 相减会回绕, 转 int16 后再取绝对值
+        diff = np.abs(thumb.astype(np.int16) - ref)
+        if diff.ndim == 3:
+            channels = diff.shape[2]
+            diff = diff.sum(axis=2, dtype=np.int32)
+        else:
+            channels = 1
+        h, w = diff.shape
+        rows = np.arange(0, h, self.block)
+        cols = np.arange(0, w, self.block)
+        sums = np.add.reduceat(np.add.reduceat(diff, rows, axis=0, dtype=np.int64), cols, axis=1)
+        counts = np.outer(np.diff(np.append(rows, h)), np.diff(np.append(cols, w))) * channels
+        return float((sums / counts).max())
+
+    def commit(self):
+        """
+        脏区域推理完成后调用, 把它们的缩略图记为新的参考
+        (推理失败时不调用, 下一帧这些区域仍然是脏的)
+        """
+        for name, thumb in self._pending.items():
+            ref = self._refs.get(name)
+            if ref is not None and ref.shape == thumb.shape:
+                np.copyto(ref, thumb)
+            else:
+                self._refs[name] = thumb.astype(np.int16)
+        self._pending = {}
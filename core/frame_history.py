@@ -0,0 +1,36 @@
+class FrameHistory:
+    """
+    单个区域的帧历史
+
+    - 只记住最近一帧的牌序列(整数编码的 tuple)和它的哈希, 稳态下不分配内存
+    - 维护"最近连续相同的帧数", 判断是否连续 N 帧相同是 O(1), 与 frame_length 无关,
+      运行中修改 frame_length 也不用重建
+    """
+
+    __slots__ = ("last", "last_hash", "stable_count")
+
+    def __init__(self):
+        self.last = ()                # 最近一帧的牌序列
+        self.last_hash = 0
+        self.stable_count = 0         # 最近连续相同的帧数(还没有帧时为 0)
+
+    def reset(self):
+        self.last = ()
+        self.last_hash = 0
+        self.stable_count = 0
+
+    def push(self, cards: tuple):
+        h = hash(cards)
+        # 先比哈希, 哈希相同再确认内容, 避免哈希碰撞误判
+        if self.stable_count > 0 and h == self.last_hash and cards == self.last:
+            self.stable_count += 1
+        else:
+            self.stable_count = 1
+        self.last = cards
+        self.last_hash = h
+
+    def is_stable(self, frame_length: int) -> bool:
+        """
+        最近 frame_length 帧内容都一样, 且不是空的
+        """
+        return self.stable_count >= frame_length and len(self.last) > 0
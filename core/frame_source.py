@@ -0,0 +1,224 @@
+import os
+from collections import deque
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+
+class FrameSource:
+    """
+    帧来源基类
+
+    CardDetector 只通过 read() 拿到一帧图片, 不关心图片来自哪里:
+    - GdiFrameSource:    win32 实时截取游戏窗口(原 ScreenCapture 逻辑)
+    - ImageDirSource:    读取目录下的 png/jpg 截图(回放/回归测试)
+    - VideoFileSource:   读取录屏视频(OpenCV)
+    - RingBufferSource:  内存中的环形缓冲区(压测用, 没有 IO 开销)
+
+    约定:
+    - read() 返回 BGR 格式的 np.ndarray (H, W, 3), uint8, 与 OpenCV / YOLO 的 numpy 输入一致
+    - 没有可用帧时返回 None (窗口没找到 / 回放结束)
+    - 有限的来源读完后 exhausted 置为 True, 方便脚本判断何时停止
+    """
+
+    def __init__(self):
+        self.exhausted = False
+
+    def read(self) -> Optional[np.ndarray]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def to_bgr_array(img) -> Optional[np.ndarray]:
+    """
+    把 PIL.Image(RGB) 或 np.ndarray(BGR) 统一成 BGR ndarray
+    """
+    if img is None:
+        return None
+    if isinstance(img, np.ndarray):
+        return img
+    # PIL.Image: RGB -> BGR
+    arr = np.asarray(img.convert("RGB"))
+    return np.ascontiguousarray(arr[:, :, ::-1])
+
+
+class GdiFrameSource(FrameSource):
+    """
+    win32 窗口截图 (仅 Windows)
+    """
+
+    def __init__(self, window_title: str):
+        super().__init__()
+        # 延迟导入: 非 Windows 环境下只要不用这个来源, 就不需要 win32gui
+        from core.screen_capture import ScreenCapture
+        self.window_title = window_title
+        self.screen_capture = ScreenCapture(window_title)
+        self._new_title = None
+
+    def retarget(self, window_title: str):
+        """
+        改为截取另一个窗口; 可以在任意线程调用, 下一次 read() 时在截图线程里生效
+        """
+        self._new_title = window_title
+
+    def read(self) -> Optional[np.ndarray]:
+        new_title = self._new_title
+        if new_title is not None:
+            self._new_title = None
+            if new_title != self.window_title:
+                # 旧窗口的截图会话(DC / 位图)在截图线程里释放, 下一帧按新标题重新创建
+                self.screen_capture.close()
+                self.screen_capture.window_title = self.window_title = new_title
+        # 注意: 返回的是截图会话的复用缓冲区, 下一次 read() 会被覆盖
+        return self.screen_capture.capture_window_array()
+
+    def close(self):
+        self.screen_capture.close()
+
+
+class ImageDirSource(FrameSource):
+    """
+    按文件名顺序读取目录中的截图
+
+    loop: 读到最后一张后是否从头开始
+    """
+
+    IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(self, dir_path: str, loop: bool = False):
+        super().__init__()
+        import cv2
+        self._cv2 = cv2
+        self.dir_path = dir_path
+        self.loop = loop
+        self.files: List[str] = sorted(
+            os.path.join(dir_path, f) for f in os.listdir(dir_path)
+            if f.lower().endswith(self.IMAGE_EXTS)
+        )
+        if not self.files:
+            raise ValueError(f"目录中没有图片: {dir_path}")
+        self.index = 0
+
+    def read(self) -> Optional[np.ndarray]:
+        if self.index >= len(self.files):
+            if not self.loop:
+                self.exhausted = True
+                return None
+            self.index = 0
+
+        path = self.files[self.index]
+        self.index += 1
+        # cv2.imread 不支持中文路径, 用 imdecode 读
+        data = np.fromfile(path, dtype=np.uint8)
+        img = self._cv2.imdecode(data, self._cv2.IMREAD_COLOR)
+        if img is None:
+            print(f"[ImageDirSource] 读取图片失败: {path}")
+        return img
+
+
+class VideoFileSource(FrameSource):
+    """
+    使用 OpenCV 逐帧读取录屏视频
+
+    frame_step: 每次 read() 前进几帧 (录屏帧率远高于检测频率时可以跳帧)
+    """
+
+    def __init__(self, video_path: str, loop: bool = False, frame_step: int = 1):
+        super().__init__()
+        import cv2
+        self._cv2 = cv2
+        self.video_path = video_path
+        self.loop = loop
+        self.frame_step = max(1, int(frame_step))
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise ValueError(f"无法打开视频: {video_path}")
+
+    def read(self) -> Optional[np.ndarray]:
+        if self.cap is None:
+            return None
+
+        # 跳过 frame_step - 1 帧, grab() 不解码, 比 read() 便宜
+        for _ in range(self.frame_step - 1):
+            self.cap.grab()
+
+        ok, frame = self.cap.read()
+        if not ok:
+            if not self.loop:
+                self.exhausted = True
+                return None
+            self.cap.set(self._cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+            if not ok:
+                self.exhausted = True
+                return None
+        return frame
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class RingBufferSource(FrameSource):
+    """
+    内存环形缓冲区
+
+    - push() 追加帧, 超过 capacity 时丢弃最旧的帧
+    - read() 按顺序取帧; loop=True 时循环播放(压测时不受磁盘/解码影响)
+    """
+
+    def __init__(self, frames: Iterable = (), capacity: int = 256, loop: bool = True):
+        super().__init__()
+        self.loop = loop
+        self.frames = deque(maxlen=capacity)
+        self.index = 0
+        for f in frames:
+            self.push(f)
+
+    def push(self, frame):
+        arr = to_bgr_array(frame)
+        if arr is frame:
+            # 截图会话的缓冲区会被下一帧覆盖, 必须复制一份
+            arr = arr.copy()
+        self.frames.append(arr)
+
+    def read(self) -> Optional[np.ndarray]:
+        if not self.frames:
+            return None
+
+        if self.index >= len(self.frames):
+            if not self.loop:
+                self.exhausted = True
+                return None
+            self.index = 0
+
+        frame = self.frames[self.index]
+        self.index += 1
+        return frame
+
+
+def create_frame_source(source: Optional[str], window_title: Optional[str] = None, loop: bool = False,
+                        frame_step: int = 1) -> FrameSource:
+    """
+    根据参数创建帧来源
+    source:
+        None       -> 截取 window_title 对应的游戏窗口
+        目录路径    -> ImageDirSource
+        文件路径    -> VideoFileSource (frame_step: 每次跳过的帧数)
+    """
+    if source is None:
+        return GdiFrameSource(window_title)
+    if os.path.isdir(source):
+        return ImageDirSource(source, loop=loop)
+    if os.path.isfile(source):
+        return VideoFileSource(source, loop=loop, frame_step=frame_step)
+    raise ValueError(f"无效的帧来源: {source}")
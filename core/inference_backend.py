@@ -0,0 +1,514 @@
+import ast
+import os
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.detections import Detections
+
+
+def letterbox(img: np.ndarray, new_shape, stride: int = 32, auto: bool = False, pad_value: int = 114):
+    """
+    等比缩放 + 填充 (与 ultralytics 的 LetterBox 一致, 居中填充)
+    new_shape: (h, w)
+    auto: True 时只填充到 stride 的整数倍(动态输入尺寸的模型用)
+    返回 (图像, 缩放比例, (左填充, 上填充))
+    """
+    import cv2
+
+    h, w = img.shape[:2]
+    r = min(new_shape[0] / h, new_shape[1] / w)
+    new_unpad_w, new_unpad_h = int(round(w * r)), int(round(h * r))
+    dw, dh = new_shape[1] - new_unpad_w, new_shape[0] - new_unpad_h
+    if auto:
+        dw, dh = dw % stride, dh % stride
+    dw /= 2
+    dh /= 2
+
+    if (w, h) != (new_unpad_w, new_unpad_h):
+        img = cv2.resize(img, (new_unpad_w, new_unpad_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    img = cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(pad_value,) * 3)
+    return img, r, (left, top)
+
+
+def letterbox_shape(img_hw, imgsz: int, stride: int = 32):
+    """
+    动态输入尺寸时 letterbox 的输出尺寸 (h, w): 长边缩放到 imgsz, 短边只填充到 stride 的倍数
+    """
+    h, w = img_hw
+    r = min(imgsz / h, imgsz / w)
+    new_unpad_w, new_unpad_h = int(round(w * r)), int(round(h * r))
+    return new_unpad_h + (imgsz - new_unpad_h) % stride, new_unpad_w + (imgsz - new_unpad_w) % stride
+
+
+class LetterboxBuffer:
+    """
+    预分配的模型输入 (1, 3, h, w) float32
+
+    letterbox() + 转置 + 归一化 每帧要分配好几个整帧大小的数组(缩放结果、填充后的图、RGB 转置、float32)。
+    这里缩放结果和输入张量都复用: 画面缩放进 _resized, 再按通道直接写进 blob 中对应的位置,
+    填充区域只在画面位置变化时重新填一次。结果与 letterbox() + 转换完全一致。
+
+    tensor / host: 推理后端在 blob 之外需要的输入张量(例如显存中的 torch.Tensor 和它对应的锁页内存), 由后端创建
+    """
+
+    def __init__(self, hw, blob: Optional[np.ndarray] = None, pad_value: int = 114, batch: int = 1):
+        """
+        batch > 1 时只作为批量推理的整体输入(由 InferenceBackend._preprocess_batch 按图切分), 不直接 load
+        """
+        import cv2
+        self._cv2 = cv2
+        self.hw = tuple(hw)
+        self.blob = np.empty((batch, 3) + self.hw, dtype=np.float32) if blob is None else blob
+        self.pad = np.float32(pad_value / 255.0)
+        self.tensor = None
+        self.host = None
+        self._resized: Optional[np.ndarray] = None
+        self._placement = None  # 上一帧画面在 blob 中的位置 (h, w, top, left)
+
+    def load(self, img: np.ndarray):
+        """
+        img: BGR uint8
+        返回 (blob, 缩放比例, (左填充, 上填充))
+        """
+        h, w = self.hw
+        img_h, img_w = img.shape[:2]
+        r = min(h / img_h, w / img_w)
+        new_unpad_w, new_unpad_h = int(round(img_w * r)), int(round(img_h * r))
+        top = int(round((h - new_unpad_h) / 2 - 0.1))
+        left = int(round((w - new_unpad_w) / 2 - 0.1))
+
+        placement = (new_unpad_h, new_unpad_w, top, left)
+        if placement != self._placement:
+            self.blob.fill(self.pad)
+            self._placement = placement
+
+        if (img_w, img_h) != (new_unpad_w, new_unpad_h):
+            if self._resized is None or self._resized.shape[:2] != (new_unpad_h, new_unpad_w):
+                self._resized = np.empty((new_unpad_h, new_unpad_w, 3), dtype=np.uint8)
+            self._cv2.resize(img, (new_unpad_w, new_unpad_h), dst=self._resized, interpolation=self._cv2.INTER_LINEAR)
+            img = self._resized
+
+        # HWC BGR uint8 -> CHW RGB float32 0~1, 直接写进 blob
+        dst = self.blob[0, :, top:top + new_unpad_h, left:left + new_unpad_w]
+        np.multiply(img.transpose(2, 0, 1)[::-1], np.float32(1.0 / 255.0), out=dst)
+        return self.blob, r, (left, top)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """
+    贪心 NMS, 返回保留的下标(按分数降序)
+    """
+    order = scores.argsort()[::-1]
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        if order.size == 1:
+            break
+        rest = order[1:]
+        xx1 = np.maximum(x1[i], x1[rest])
+        yy1 = np.maximum(y1[i], y1[rest])
+        xx2 = np.minimum(x2[i], x2[rest])
+        yy2 = np.minimum(y2[i], y2[rest])
+        inter = (xx2 - xx1).clip(0) * (yy2 - yy1).clip(0)
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-7)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=int)
+
+
+class InferenceBackend:
+    """
+    推理后端基类
+
+    CardDetector 只调用 predict(), 不关心背后是 PyTorch 还是 ONNX Runtime:
+    - UltralyticsBackend: PyTorch (cpu / cuda), 直接调用网络, 不经过 ultralytics 的预测器
+    - OnnxBackend:        导出的 ONNX 模型 + ONNX Runtime (CPU / OpenVINO), 不需要加载 torch
+
+    两个后端共用 numpy 的前处理(预分配的 LetterboxBuffer)和后处理(解码 + 按类别 NMS)。
+
+    属性:
+        names:      {类别 id: yolo 标签名}
+        device:     实际使用的设备描述
+        base_imgsz: 整图推理时的输入尺寸(训练尺寸)
+        stride:     模型最大下采样倍数, 动态尺寸时输入填充到它的倍数
+        dynamic:    是否支持任意(stride 倍数的)输入尺寸; False 时输入固定为 input_hw
+    """
+
+    names: Dict[int, str] = {}
+    device: str = "cpu"
+    base_imgsz: int = 640
+    stride: int = 32
+    dynamic: bool = True
+    input_hw = None
+    supports_batch: bool = True  # 输入的 batch 维是否可变(不可变时 predict_batch 逐张推理)
+    thread_safe: bool = False    # 能否在多个线程中同时推理(预分配的输入缓冲区不能并发写)
+
+    MAX_WH = 7680  # 按类别 NMS 时给不同类别的框加的偏移
+    MAX_BUFFERS = 8  # 最多缓存几种输入尺寸的缓冲区(拼图尺寸随脏区域组合变化)
+
+    def __init__(self):
+        self._buffers: Dict = {}
+
+    def predict(self, img: np.ndarray, conf: float, iou: float, imgsz: Optional[int] = None) -> Detections:
+        """
+        img: BGR ndarray
+        imgsz: 推理尺寸, None 时使用 base_imgsz
+        返回原图坐标系下的 Detections
+        """
+        buffer, ratio, pad = self._preprocess(img, self.base_imgsz if imgsz is None else imgsz)
+        output = self._forward(buffer)
+        return self._postprocess(output, conf, iou, ratio, pad, tuple(img.shape[:2]))
+
+    def predict_batch(self, imgs: List[np.ndarray], conf: float, iou: float,
+                      imgszs: Optional[List[Optional[int]]] = None) -> List[Detections]:
+        """
+        一次前向推理多张图(多桌同时识别), 返回与 imgs 一一对应的 Detections
+        每张图按自己的推理尺寸 letterbox, 再左上对齐放进同一个批量输入(其余部分是填充色),
+        所以每张图的识别结果与单独 predict 时等价(在数值误差范围内: 批量大小和填充不同,
+        卷积的计算顺序可能不同, 框坐标/置信度会有浮点误差, 置信度贴近阈值的框可能一边保留一边被过滤)
+        """
+        imgszs = list(imgszs) if imgszs is not None else [None] * len(imgs)
+        if len(imgs) <= 1 or not self.supports_batch:
+            return [self.predict(img, conf, iou, imgsz=imgsz) for img, imgsz in zip(imgs, imgszs)]
+        buffer, placements = self._preprocess_batch(imgs, imgszs)
+        output = self._forward(buffer)
+        return [self._postprocess(output[i:i + 1], conf, iou, ratio, pad, tuple(img.shape[:2]))
+                for i, (img, (ratio, pad)) in enumerate(zip(imgs, placements))]
+
+    def submit(self, img: np.ndarray, conf: float, iou: float, imgsz: Optional[int] = None) -> Future:
+        """
+        异步推理, 返回结果为 Detections 的 Future
+        单进程的后端直接在当前线程推理, 返回已经完成的 Future; 多进程后端见 core/process_pool.py
+        """
+        future = Future()
+        try:
+            future.set_result(self.predict(img, conf, iou, imgsz=imgsz))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _forward(self, buffer: LetterboxBuffer) -> np.ndarray:
+        """
+        对填好的输入做一次前向推理, 返回 (batch, 4 + nc, anchors) 的 numpy 数组
+        """
+        raise NotImplementedError
+
+    def to_device(self, device_choice: str) -> bool:
+        """
+        把已加载的模型切换到 device_choice; 不支持原地切换(需要换一种后端)时返回 False
+        """
+        return False
+
+    def warmup(self, runs: int = 2):
+        """
+        启动预热: 用黑图推理几次, 让 CUDA 上下文初始化 / cuDNN 选好算法 / 内存池分配好,
+        否则开局前几帧会明显变慢
+        """
+        img = np.zeros((self.base_imgsz * 9 // 16, self.base_imgsz, 3), dtype=np.uint8)
+        for _ in range(runs):
+            self.predict(img, conf=0.25, iou=0.45)
+
+    # ================= 前处理 =================
+    def _new_buffer(self, hw, batch: int = 1) -> LetterboxBuffer:
+        return LetterboxBuffer(hw, batch=batch)
+
+    def _input_hw(self, img, imgsz):
+        if self.dynamic:
+            # 与 ultralytics rect 推理一致: 长边缩放到 imgsz, 短边只填充到 stride 的倍数
+            return letterbox_shape(img.shape[:2], imgsz or self.base_imgsz, self.stride)
+        return self.input_hw
+
+    def _cached_buffer(self, key, create):
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            if len(self._buffers) >= self.MAX_BUFFERS:
+                self._buffers.clear()
+            buffer = self._buffers[key] = create()
+        return buffer
+
+    def _preprocess(self, img, imgsz):
+        """
+        把图像 letterbox 进对应尺寸的预分配缓冲区, 返回 (缓冲区, 缩放比例, 填充)
+        """
+        hw = self._input_hw(img, imgsz)
+        buffer = self._cached_buffer(hw, lambda: self._new_buffer(hw))
+        _, ratio, pad = buffer.load(img)
+        return buffer, ratio, pad
+
+    def _preprocess_batch(self, imgs, imgszs):
+        """
+        批量输入 (n, 3, H, W), H / W 取各图 letterbox 尺寸的最大值; 每张图占一个切片
+        返回 (整体缓冲区, [(缩放比例, 填充), ...])
+        """
+        hws = tuple(self._input_hw(img, imgsz) for img, imgsz in zip(imgs, imgszs))
+
+        def create():
+            canvas = (max(h for h, _ in hws), max(w for _, w in hws))
+            batch = self._new_buffer(canvas, batch=len(hws))
+            batch.blob.fill(batch.pad)  # 各图切片以外的部分一直是填充色
+            slots = [LetterboxBuffer(hw, blob=batch.blob[i:i + 1, :, :hw[0], :hw[1]]) for i, hw in enumerate(hws)]
+            return batch, slots
+
+        batch, slots = self._cached_buffer(("batch",) + hws, create)
+        placements = []
+        for slot, img in zip(slots, imgs):
+            _, ratio, pad = slot.load(img)
+            placements.append((ratio, pad))
+        return batch, placements
+
+    # ================= 后处理 =================
+    def _postprocess(self, output, conf, iou, ratio, pad, orig_shape):
+        # (1, 4 + nc, anchors) -> (anchors, 4 + nc)
+        pred = output[0].T
+        scores_all = pred[:, 4:]
+        cls = scores_all.argmax(axis=1)
+        scores = scores_all[np.arange(len(cls)), cls]
+
+        mask = scores > conf
+        if not mask.any():
+            return Detections.empty(self.names, orig_shape)
+        pred, cls, scores = pred[mask], cls[mask], scores[mask]
+
+        # cx, cy, w, h -> x1, y1, x2, y2
+        boxes = np.empty((len(pred), 4), dtype=np.float32)
+        boxes[:, 0] = pred[:, 0] - pred[:, 2] / 2
+        boxes[:, 1] = pred[:, 1] - pred[:, 3] / 2
+        boxes[:, 2] = pred[:, 0] + pred[:, 2] / 2
+        boxes[:, 3] = pred[:, 1] + pred[:, 3] / 2
+
+        # 按类别 NMS: 不同类别的框加上不同偏移, 互不抑制
+        keep = nms(boxes + (cls * self.MAX_WH)[:, None], scores, iou)
+        boxes, cls = boxes[keep], cls[keep]
+
+        # 还原到原图坐标
+        boxes[:, [0, 2]] -= pad[0]
+        boxes[:, [1, 3]] -= pad[1]
+        boxes /= ratio
+        h, w = orig_shape
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h)
+        return Detections(boxes, cls.astype(int), self.names, orig_shape)
+
+
+class UltralyticsBackend(InferenceBackend):
+    """
+    ultralytics.YOLO 权重 (PyTorch)
+
+    ultralytics 只用来加载权重和融合层; 推理时把预分配的输入张量直接送进网络,
+    不经过它的预测器(每帧都会重新分配 letterbox / 转置 / 归一化的数组, 还要把张量转回 numpy 存进 Results)。
+    GPU 上输入张量常驻显存, 每帧只从锁页内存拷贝一次。
+    """
+
+    def __init__(self, weight_path: str, device_choice: str = "cuda", half: bool = False, fuse: bool = True,
+                 imgsz: int = 0, threads: int = 0):
+        """
+        half:  GPU 上使用 fp16 推理(CPU 不支持, 自动退回 fp32)
+        fuse:  融合 Conv + BN 层, 减少推理时的算子数量
+        imgsz: 固定推理尺寸, 0 表示使用训练时的尺寸
+        threads: CPU 推理的线程数, 0 表示 torch 默认(多进程推理时每个进程分几个核)
+        """
+        # torch / ultralytics 导入很慢且占内存, 只有用到这个后端时才导入
+        import torch
+        from ultralytics import YOLO
+
+        if threads > 0:
+            torch.set_num_threads(threads)
+
+        super().__init__()
+        self._torch = torch
+        self.model = YOLO(weight_path)
+        self.device = self._select_device(device_choice)
+        self.model.to(self.device)
+
+        self.half_requested = bool(half)
+        self.half = self.half_requested and self.device == "cuda"
+        if half and not self.half:
+            print("[CardDetector] 半精度只在GPU上可用，使用fp32")
+        elif self.half:
+            print("[CardDetector] 使用半精度(fp16)推理")
+
+        if fuse:
+            try:
+                self.model.fuse()
+            except Exception as e:  # 部分导出/自定义模型不支持融合, 不影响推理
+                print(f"[CardDetector] 警告: 层融合失败，使用未融合的模型: {e}")
+
+        self.names = self.model.names
+        self.net = self.model.model.eval()
+        if self.half:
+            self.net.half()
+        self.stride = max(int(self.net.stride.max()), 32)
+        if imgsz and imgsz > 0:
+            self.base_imgsz = int(imgsz)
+        else:
+            # 训练时的输入尺寸保存在权重里, 整图推理默认使用它
+            train_imgsz = self.model.overrides.get("imgsz", 640)
+            if isinstance(train_imgsz, (list, tuple)):
+                train_imgsz = max(train_imgsz)
+            self.base_imgsz = int(train_imgsz)
+
+    def _select_device(self, device_choice):
+        if device_choice == "cuda":
+            # 使用GPU
+            if self._torch.cuda.is_available():
+                print("[CardDetector] 使用GPU (CUDA)")
+                return "cuda"
+            print("[CardDetector] 警告: 用户选择了GPU，但CUDA不可用，使用CPU")
+            return "cpu"
+        # 使用CPU
+        print("[CardDetector] 使用CPU")
+        return "cpu"
+
+    def to_device(self, device_choice):
+        if device_choice not in ("cpu", "cuda"):
+            return False
+        device = self._select_device(device_choice)
+        if device != device_choice:
+            # 选了 cuda 但 CUDA 不可用: 没有切换成功, 不能让注册表把这份 CPU 模型记成 cuda 的
+            return False
+        if device == self.device:
+            return True
+        # 同一个网络对象直接搬到新设备, 不重新读取权重; CPU 上不支持 fp16, 先转回 fp32
+        half = self.half_requested and device == "cuda"
+        if not half:
+            self.net.float()
+        self.net.to(device)
+        if half:
+            self.net.half()
+        self.device, self.half = device, half
+        self._buffers.clear()  # 输入张量和设备绑定, 按新设备重新分配
+        return True
+
+    def _new_buffer(self, hw, batch=1):
+        torch = self._torch
+        if self.device == "cpu":
+            # CPU: 网络直接读 blob 的内存
+            buffer = LetterboxBuffer(hw, batch=batch)
+            buffer.tensor = torch.from_numpy(buffer.blob)
+            return buffer
+        # GPU: blob 放在锁页内存里, 显存中的输入张量(fp16 时为半精度)复用
+        host = torch.empty((batch, 3) + tuple(hw), dtype=torch.float32, pin_memory=True)
+        buffer = LetterboxBuffer(hw, blob=host.numpy())
+        buffer.tensor = torch.empty(host.shape, dtype=torch.float16 if self.half else torch.float32,
+                                    device=self.device)
+        buffer.host = host
+        return buffer
+
+    def _forward(self, buffer):
+        if self.device != "cpu":
+            buffer.tensor.copy_(buffer.host, non_blocking=True)
+        with self._torch.inference_mode():
+            output = self.net(buffer.tensor)
+        if isinstance(output, (list, tuple)):
+            output = output[0]
+        return output.float().cpu().numpy()
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    ONNX Runtime 推理 (可选 OpenVINO Execution Provider)
+
+    模型需要先用 ultralytics 导出:
+        yolo export model=yolo/weights/best.pt format=onnx imgsz=960 dynamic=True
+    dynamic=True 时区域裁剪拼图可以按更小的尺寸推理; 固定尺寸的模型也能用, 只是拼图会被填充到固定尺寸。
+
+    前处理(letterbox)、后处理(解码 + 按类别 NMS)用基类的 numpy 实现。
+    """
+
+    def __init__(self, onnx_path: str, use_openvino: bool = False, imgsz: int = 0, threads: int = 0):
+        """
+        imgsz: 固定推理尺寸(只对动态输入尺寸的模型有效), 0 表示使用导出时的尺寸
+        threads: 算子内并行的线程数, 0 表示 ONNX Runtime 默认(所有核)
+        """
+        import onnxruntime as ort
+
+        super().__init__()
+        available = ort.get_available_providers()
+        providers = ["CPUExecutionProvider"]
+        self.device = "onnx-cpu"
+        if use_openvino:
+            if "OpenVINOExecutionProvider" in available:
+                providers = [("OpenVINOExecutionProvider", {"device_type": "CPU"}), "CPUExecutionProvider"]
+                self.device = "openvino"
+            else:
+                print("[CardDetector] 警告: 未安装 onnxruntime-openvino，使用 ONNX Runtime CPU")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=providers)
+        self.input_name = self.session.get_inputs()[0].name
+        print(f"[CardDetector] 使用ONNX Runtime ({self.device})")
+
+        # ultralytics 导出时把类别名和训练尺寸写进了元数据
+        meta = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(meta["names"]) if "names" in meta else {}
+        self.stride = int(meta.get("stride", 32))
+
+        # 输入形状 (1, 3, h, w); 动态维度是字符串
+        shape = self.session.get_inputs()[0].shape
+        self.supports_batch = not isinstance(shape[0], int)
+        self.dynamic = not (isinstance(shape[2], int) and isinstance(shape[3], int))
+        if not self.dynamic:
+            self.input_hw = (shape[2], shape[3])
+            self.base_imgsz = max(self.input_hw)
+        else:
+            self.input_hw = None
+            export_imgsz = ast.literal_eval(meta["imgsz"]) if "imgsz" in meta else 640
+            if imgsz and imgsz > 0:
+                self.base_imgsz = int(imgsz)
+            else:
+                self.base_imgsz = int(max(export_imgsz) if isinstance(export_imgsz, (list, tuple)) else export_imgsz)
+
+    def _forward(self, buffer):
+        return self.session.run(None, {self.input_name: buffer.blob})[0]
+
+
+def load_backend(weight_path: str, onnx_path: str, device_choice: str, half: bool = False, fuse: bool = True,
+                 imgsz: int = 0, threads: int = 0, workers: int = 0, warmup: bool = False) -> InferenceBackend:
+    """
+    根据 device_choice 创建推理后端
+        "cpu" / "cuda"      -> UltralyticsBackend
+        "onnx" / "openvino" -> OnnxBackend (模型不存在或缺少 onnxruntime 时退回 PyTorch CPU)
+    half / fuse 只对 PyTorch 后端有效
+    workers > 1 时(只对 cpu / onnx / openvino 有效)开 workers 个进程各加载一份模型, 见 core/process_pool.py;
+    每个进程的推理线程数默认是 CPU 核数 / workers
+    warmup: 加载后预热(多进程时每个进程各自预热)
+    """
+    if workers > 1:
+        if device_choice == "cuda":
+            print("[CardDetector] 多进程推理只用于CPU，GPU 上使用单进程")
+        else:
+            from core.process_pool import ProcessPoolBackend
+
+            threads = threads or max(1, (os.cpu_count() or 1) // workers)
+            kwargs = dict(weight_path=weight_path, onnx_path=onnx_path, device_choice=device_choice,
+                          half=half, fuse=fuse, imgsz=imgsz, threads=threads)
+            return ProcessPoolBackend(load_backend, kwargs, workers, warmup=warmup)
+
+    backend = _load_single_backend(weight_path, onnx_path, device_choice, half, fuse, imgsz, threads)
+    if warmup:
+        backend.warmup()
+    return backend
+
+
+def _load_single_backend(weight_path, onnx_path, device_choice, half, fuse, imgsz, threads):
+    if device_choice in ("onnx", "openvino"):
+        if not os.path.exists(onnx_path):
+            print(f"[CardDetector] 警告: 找不到ONNX模型 {onnx_path}，使用PyTorch CPU")
+            print("[CardDetector] 导出命令: yolo export model=yolo/weights/best.pt format=onnx imgsz=960 dynamic=True")
+            return UltralyticsBackend(weight_path, "cpu", fuse=fuse, imgsz=imgsz, threads=threads)
+        try:
+            return OnnxBackend(onnx_path, use_openvino=(device_choice == "openvino"), imgsz=imgsz, threads=threads)
+        except ImportError:
+            print("[CardDetector] 警告: 未安装 onnxruntime，使用PyTorch CPU")
+            return UltralyticsBackend(weight_path, "cpu", fuse=fuse, imgsz=imgsz, threads=threads)
+    return UltralyticsBackend(weight_path, device_choice, half=half, fuse=fuse, imgsz=imgsz, threads=threads)
@@ -0,0 +1,200 @@
+"""
+进程内共用的模型注册表
+
+每个 CardDetector 各自加载一份权重的话, 多开窗口 / 切换布局 / 基准测试里创建多个 CardDetector 时,
+同样的几百 MB 权重会在内存(显存)里存好几份。这里按 (权重, 设备, 推理选项) 只加载一次:
+
+    handle = MODEL_REGISTRY.acquire(weight_path, onnx_path, "cuda", half=True)
+    dets = handle.predict(img, conf=0.6, iou=0.45)
+    handle.release()
+
+- 引用计数: 最后一个使用者 release() 后模型进入空闲列表, 空闲列表超过 max_idle 时最早空闲的被淘汰
+  (切换布局等"先释放再获取"的场景不用重新加载)
+- 同一个模型的推理在一把锁里串行执行(后端的预分配输入缓冲区不能并发写), 多个线程可以共用一个句柄;
+  多进程后端(thread_safe)自己排队, 不加锁
+- 同一个键被多个线程同时获取时只加载一次, 其余线程等待同一个结果
+"""
+
+import contextlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from core.inference_backend import InferenceBackend, load_backend
+
+
+_NO_LOCK = contextlib.nullcontext()
+
+
+def _close_backend(entry):
+    # 多进程后端要停掉工作进程; 单进程后端没有 close, 交给垃圾回收
+    close = getattr(entry.future.result(), "close", None)
+    if close is not None:
+        close()
+
+
+class _Entry:
+    __slots__ = ("key", "future", "refs", "lock")
+
+    def __init__(self, key):
+        self.key = key
+        self.future = Future()  # 加载结果 (InferenceBackend)
+        self.refs = 0
+        self.lock = threading.Lock()  # 推理锁
+
+
+class ModelHandle:
+    """
+    共享模型的使用句柄, 接口与 InferenceBackend 相同(CardDetector 不区分两者)
+    """
+
+    def __init__(self, registry: "ModelRegistry", entry: _Entry):
+        self._registry = registry
+        self._entry = entry
+        self.backend: InferenceBackend = entry.future.result()
+
+    @property
+    def names(self):
+        return self.backend.names
+
+    @property
+    def device(self):
+        return self.backend.device
+
+    @property
+    def base_imgsz(self):
+        return self.backend.base_imgsz
+
+    @property
+    def released(self) -> bool:
+        return self._entry is None
+
+    def _locked(self):
+        return _NO_LOCK if self.backend.thread_safe else self._entry.lock
+
+    def predict(self, img, conf, iou, imgsz=None):
+        with self._locked():
+            return self.backend.predict(img, conf, iou, imgsz=imgsz)
+
+    def predict_batch(self, imgs, conf, iou, imgszs=None):
+        with self._locked():
+            return self.backend.predict_batch(imgs, conf, iou, imgszs=imgszs)
+
+    def submit(self, img, conf, iou, imgsz=None):
+        with self._locked():
+            return self.backend.submit(img, conf, iou, imgsz=imgsz)
+
+    def warmup(self, runs: int = 2):
+        with self._locked():
+            self.backend.warmup(runs)
+
+    def to_device(self, device_choice: str) -> bool:
+        """
+        只有自己在用这个模型时才原地搬到新设备; 否则返回 False, 由调用方重新 acquire
+        """
+        return self._registry._move(self, device_choice)
+
+    def release(self):
+        if self._entry is not None:
+            self._registry._release(self._entry)
+            self._entry = None
+
+
+class ModelRegistry:
+    def __init__(self, max_idle: int = 1):
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._entries = {}             # 键 -> _Entry (正在使用 / 正在加载)
+        self._idle = OrderedDict()     # 键 -> _Entry (没人使用, 等待淘汰)
+
+    @staticmethod
+    def make_key(weight_path, onnx_path, device_choice, half=False, fuse=True, imgsz=0, workers=0):
+        # ONNX 后端只用 onnx_path, PyTorch 后端只用 weight_path
+        path = onnx_path if device_choice in ("onnx", "openvino") else weight_path
+        workers = int(workers) if workers and workers > 1 and device_choice != "cuda" else 0
+        return path, device_choice, bool(half), bool(fuse), int(imgsz or 0), workers
+
+    def acquire(self, weight_path: str, onnx_path: str, device_choice: str, half: bool = False, fuse: bool = True,
+                imgsz: int = 0, warmup: bool = False, workers: int = 0) -> ModelHandle:
+        """
+        获取(必要时加载)模型, 用完调用 handle.release()
+        workers > 1 时是多进程后端(见 core/process_pool.py)
+        加载失败时抛出异常, 不占用引用
+        """
+        key = self.make_key(weight_path, onnx_path, device_choice, half, fuse, imgsz, workers)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._idle.pop(key, None)
+            loader = entry is None
+            if loader:
+                entry = _Entry(key)
+            self._entries[key] = entry
+            entry.refs += 1
+
+        if loader:
+            try:
+                backend = load_backend(weight_path, onnx_path, device_choice, half=half, fuse=fuse, imgsz=imgsz,
+                                       workers=key[-1], warmup=warmup)
+                entry.future.set_result(backend)
+            except Exception as e:
+                entry.future.set_exception(e)
+
+        try:
+            return ModelHandle(self, entry)
+        except Exception:
+            self._release(entry, keep=False)
+            raise
+
+    def _release(self, entry: _Entry, keep: bool = True):
+        evicted = []
+        with self._lock:
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            if self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]
+            if entry.future.exception() is not None:
+                return
+            if keep and self.max_idle > 0:
+                self._idle[entry.key] = entry
+                while len(self._idle) > self.max_idle:
+                    evicted.append(self._idle.popitem(last=False)[1])
+            else:
+                evicted.append(entry)
+        for old in evicted:
+            _close_backend(old)
+
+    def _move(self, handle: ModelHandle, device_choice: str) -> bool:
+        entry = handle._entry
+        path, _, half, fuse, imgsz, workers = entry.key
+        new_key = (path, device_choice, half, fuse, imgsz, workers)
+        with self._lock:
+            # 别人也在用, 或者目标设备上已经有一份: 不能/不必搬
+            if entry.refs != 1 or new_key in self._entries or new_key in self._idle:
+                return False
+            with entry.lock:
+                if not handle.backend.to_device(device_choice):
+                    return False
+            del self._entries[entry.key]
+            entry.key = new_key
+            self._entries[new_key] = entry
+            return True
+
+    def clear_idle(self):
+        with self._lock:
+            evicted = list(self._idle.values())
+            self._idle.clear()
+        for old in evicted:
+            _close_backend(old)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "active": {key: entry.refs for key, entry in self._entries.items()},
+                "idle": list(self._idle),
+            }
+
+
+# 进程内共用一个
+MODEL_REGISTRY = ModelRegistry()
@@ -0,0 +1,128 @@
+"""
+多桌同时记牌: 一个进程跟踪多个游戏窗口, 每一轮所有桌的推理合成一次批量推理
+
+    tables = MultiSessionTracker.from_config(settings.MULTI_SESSIONS)
+    results = tables.run()   # 与 tables.trackers 一一对应, 每个元素同 CardTracker.run() 的返回值
+
+每桌一个 CardTracker (各自的布局、窗口、帧差门控/结果缓存、记牌状态), 模型通过 MODEL_REGISTRY 只加载一份。
+每一轮:
+    1) 依次截取各桌画面, begin_frame 算出各自要推理的输入(画面没变的桌不推理)
+    2) 共用同一个模型的桌一起 predict_batch, 一次前向推理
+    3) 各桌 finish_frame 解析结果, 交给各自的 CardTracker
+多开几桌只是批量变大, 不用每桌开一个进程、各加载一份模型。
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+from core.card_detector import CardDetector
+from core.card_tracker import CardTracker
+from core.frame_source import FrameSource, GdiFrameSource
+from core.stage_timer import STAGE_TIMER
+
+
+def detect_batch(detectors: Sequence[CardDetector], frames: Sequence) -> List[tuple]:
+    """
+    多个 CardDetector 各识别一帧, 推理合并成批量推理
+    返回值与 frames 一一对应, 每个元素同 CardDetector.detect_frame 的返回值
+    """
+    for detector in detectors:
+        if detector.model is None:
+            detector.load_model()
+
+    with STAGE_TIMER.span("detect"):
+        jobs = [detector.begin_frame(frame) for detector, frame in zip(detectors, frames)]
+
+        # 按实际使用的模型分组: 共用注册表里同一份模型的句柄归到一组; 阈值不同的不能合并
+        groups: Dict[tuple, List[int]] = {}
+        for i, (detector, job) in enumerate(zip(detectors, jobs)):
+            if job.needs_inference:
+                model = detector.model
+                key = (id(getattr(model, "backend", model)), detector.yolo_conf, detector.yolo_iou)
+                groups.setdefault(key, []).append(i)
+
+        dets = [None] * len(jobs)
+        for members in groups.values():
+            first = detectors[members[0]]
+            with STAGE_TIMER.span("inference"):
+                batch = first.model.predict_batch([jobs[i].infer_img for i in members],
+                                                  conf=first.yolo_conf, iou=first.yolo_iou,
+                                                  imgszs=[jobs[i].imgsz for i in members])
+            for i, r in zip(members, batch):
+                dets[i] = r
+
+        results = [detector.finish_frame(job, r) for detector, job, r in zip(detectors, jobs, dets)]
+
+    for detector, frame, result in zip(detectors, frames, results):
+        detector.record_frame(frame, result)
+    return results
+
+
+class MultiSessionTracker:
+    """
+    多桌记牌器: names[i] 是第 i 桌的显示名, trackers[i] 是它的 CardTracker
+    """
+
+    def __init__(self, trackers: Sequence[CardTracker], names: Optional[Sequence[str]] = None):
+        if not trackers:
+            raise ValueError("至少需要一桌")
+        self.trackers = list(trackers)
+        self.detectors = [tracker.card_detector for tracker in self.trackers]
+        self.names = list(names) if names is not None else [tracker.card_detector.window_title
+                                                            for tracker in self.trackers]
+        self.last_detections = [None] * len(self.trackers)
+
+    @classmethod
+    def from_config(cls, entries: Sequence[Dict], frame_sources: Optional[Sequence[FrameSource]] = None,
+                    clock=None) -> "MultiSessionTracker":
+        """
+        entries: settings.MULTI_SESSIONS 格式的列表, 每项 {"layout": 布局名, "window_title": 窗口标题, "name": 显示名}
+            window_title 不填时用布局里的窗口标题(几桌窗口标题相同时必须填), name 不填时用 "序号. 窗口标题"
+        frame_sources: 直接给每桌指定帧来源(回放/压测), 优先于 window_title
+        """
+        trackers, names = [], []
+        for i, entry in enumerate(entries):
+            title = entry.get("window_title")
+            frame_source = frame_sources[i] if frame_sources is not None else None
+            if frame_source is None and title:
+                frame_source = GdiFrameSource(title)
+            kwargs = {} if clock is None else {"clock": clock}
+            tracker = CardTracker(entry.get("layout"), frame_source=frame_source, **kwargs)
+            trackers.append(tracker)
+            names.append(entry.get("name") or f"{i + 1}. {title or tracker.card_detector.window_title}")
+        return cls(trackers, names)
+
+    def __len__(self):
+        return len(self.trackers)
+
+    def load_model(self):
+        """
+        加载模型(阻塞); 各桌的模型选项相同时只加载一次
+        """
+        for detector in self.detectors:
+            detector.load_model()
+        return self.detectors[0].device
+
+    def read_frames(self) -> list:
+        with STAGE_TIMER.span("capture"):
+            return [detector.frame_source.read() for detector in self.detectors]
+
+    def run(self, frames: Optional[Sequence] = None) -> list:
+        """
+        截图(frames 为 None 时) -> 批量识别 -> 各桌记牌
+        返回各桌 CardTracker.run() 的结果
+        """
+        if frames is None:
+            frames = self.read_frames()
+        self.last_detections = detect_batch(self.detectors, frames)
+        return [tracker.run(detections) for tracker, detections in zip(self.trackers, self.last_detections)]
+
+    def reset(self, index: Optional[int] = None):
+        """
+        重置一桌(index)或所有桌的记牌状态
+        """
+        for tracker in (self.trackers if index is None else [self.trackers[index]]):
+            tracker.reset()
+
+    def close(self):
+        for detector in self.detectors:
+            detector.close()
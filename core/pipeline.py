@@ -0,0 +1,245 @@
+import threading
+import time
+import traceback
+from typing import Callable, Optional
+
+import numpy as np
+
+import config.settings as settings
+from core.stage_timer import STAGE_TIMER
+
+
+class LatestSlot:
+    """
+    容量为 1 的队列, 新值覆盖旧值 (latest-frame-wins)
+
+    下游处理不过来时直接丢弃旧帧, 永远只处理最新的画面, 不会越积越多。
+    put() 返回被覆盖掉的旧值(没有则返回 EMPTY), 方便调用方回收缓冲区。
+    """
+
+    EMPTY = object()
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = self.EMPTY
+        self._closed = False
+        self.dropped = 0  # 被覆盖(丢弃)的次数
+
+    def put(self, item):
+        with self._cond:
+            old = self._item
+            if old is not self.EMPTY:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify()
+            return old
+
+    def get(self, timeout: Optional[float] = None):
+        """
+        取出最新值; 超时或已关闭时返回 EMPTY
+        """
+        with self._cond:
+            if self._item is self.EMPTY and not self._closed:
+                self._cond.wait(timeout)
+            item = self._item
+            self._item = self.EMPTY
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class FramePool:
+    """
+    截图缓冲区池
+
+    截图会话的缓冲区下一帧就会被覆盖, 跨线程传递前必须复制一份。
+    同时在途的帧最多 3 张(正在截图 / 槽里等待 / 正在识别), 复用这几块缓冲区, 稳态下不再分配内存。
+    """
+
+    def __init__(self, size: int = 3):
+        self.size = size
+        self._free = []
+        self._lock = threading.Lock()
+
+    def copy_in(self, frame: np.ndarray) -> np.ndarray:
+        buf = None
+        with self._lock:
+            while self._free:
+                candidate = self._free.pop()
+                if candidate.shape == frame.shape:
+                    buf = candidate
+                    break
+        if buf is None:  # 池子空了或窗口尺寸变了
+            buf = np.empty_like(frame)
+        np.copyto(buf, frame)
+        return buf
+
+    def release(self, buf):
+        if not isinstance(buf, np.ndarray):
+            return
+        with self._lock:
+            if len(self._free) < self.size:
+                self._free.append(buf)
+
+
+class TrackerPipeline:
+    """
+    三段流水线: 截图线程 -> 识别线程 -> 记牌线程
+
+    串行执行时每一轮耗时 = 截图 + 识别 + 记牌; 流水线模式下截第 N+1 帧和识别第 N 帧同时进行,
+    各段之间用 LatestSlot 连接(只保留最新一帧), 实际帧率接近识别本身的速度。
+
+    回调都在后台线程中调用:
+        on_result(remain_cards, show_left, show_right, show_self)
+        on_error(错误文本)
+        on_model_ready(设备) / on_model_error(错误文本)
+
+    传入 scheduler(AdaptiveScheduler) 时, 截图间隔由记牌线程根据对局状态和识别耗时动态调整。
+    """
+
+    def __init__(self, card_tracker, on_result: Callable, on_error: Optional[Callable] = None,
+                 on_model_ready: Optional[Callable] = None, on_model_error: Optional[Callable] = None,
+                 scheduler=None):
+        self.card_tracker = card_tracker
+        self.scheduler = scheduler
+        self._interval = settings.DETECT_INTERVAL_SEC  # 截图间隔, 有 scheduler 时由记牌线程更新
+        self._work_sec = 0.0                           # 最近一帧的识别耗时
+        self.on_result = on_result
+        self.on_error = on_error
+        self.on_model_ready = on_model_ready
+        self.on_model_error = on_model_error
+
+        self.frame_slot = LatestSlot()      # 截图 -> 识别
+        self.detection_slot = LatestSlot()  # 识别 -> 记牌
+        self.frame_pool = FramePool()
+
+        self._stop = threading.Event()
+        self._running = threading.Event()   # 未暂停
+        self._running.set()
+        self._reset_requested = threading.Event()
+        self._threads = []
+
+    # ================= 控制 =================
+    def start(self):
+        self._stop.clear()
+        for target, name in ((self._capture_loop, "capture"),
+                             (self._inference_loop, "inference"),
+                             (self._tracker_loop, "tracker")):
+            t = threading.Thread(target=target, name=f"pipeline-{name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float = 1.5):
+        self._stop.set()
+        self._running.set()  # 暂停中也要能退出
+        self.frame_slot.close()
+        self.detection_slot.close()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def request_reset(self):
+        """
+        重置记牌器(在记牌线程中执行, 避免和 run() 并发修改状态)
+        """
+        self._reset_requested.set()
+
+    def _report_error(self):
+        if self.on_error is not None:
+            self.on_error(traceback.format_exc())
+
+    # ================= 截图线程 =================
+    def _capture_loop(self):
+        source = self.card_tracker.card_detector.frame_source
+        while not self._stop.is_set():
+            if not self._running.wait(0.1):
+                continue
+
+            t0 = time.perf_counter()
+            try:
+                with STAGE_TIMER.span("capture"):
+                    frame = source.read()
+            except Exception:
+                self._report_error()
+                frame = None
+
+            if frame is None and source.exhausted:  # 回放结束
+                self.frame_slot.close()
+                return
+
+            # 没找到窗口时也往下传 None: 记牌线程需要据此计时自动重置
+            item = None if frame is None else self.frame_pool.copy_in(frame)
+            self.frame_pool.release(self.frame_slot.put(item))
+
+            # 按检测间隔截图(识别跟不上时, 旧帧会被新帧覆盖)
+            interval = self._interval if self.scheduler is not None else settings.DETECT_INTERVAL_SEC
+            wait = interval - (time.perf_counter() - t0)
+            if wait > 0:
+                self._stop.wait(wait)
+
+    # ================= 识别线程 =================
+    def _inference_loop(self):
+        detector = self.card_tracker.card_detector
+        try:
+            detector.load_model()
+            if self.on_model_ready is not None:
+                self.on_model_ready(str(detector.device))
+        except Exception:
+            if self.on_model_error is not None:
+                self.on_model_error(traceback.format_exc())
+            return
+
+        while not self._stop.is_set():
+            frame = self.frame_slot.get(timeout=0.1)
+            if frame is LatestSlot.EMPTY:
+                if self.frame_slot.closed:
+                    self.detection_slot.close()
+                    return
+                continue
+
+            t0 = time.perf_counter()
+            try:
+                detections = detector.detect_frame(frame)
+                self._work_sec = time.perf_counter() - t0
+            except Exception:
+                self._report_error()
+                continue
+            finally:
+                self.frame_pool.release(frame)
+            self.detection_slot.put(detections)
+
+    # ================= 记牌线程 =================
+    def _tracker_loop(self):
+        while not self._stop.is_set():
+            detections = self.detection_slot.get(timeout=0.1)
+
+            if self._reset_requested.is_set():
+                self._reset_requested.clear()
+                self.card_tracker.reset()
+
+            if detections is LatestSlot.EMPTY:
+                if self.detection_slot.closed:
+                    return
+                continue
+
+            try:
+                remain_cards, show_left, show_right, show_self = self.card_tracker.run(detections)
+                if self.scheduler is not None:
+                    self._interval = self.scheduler.update(self.card_tracker, self._work_sec)
+                # 复制一份再发: 这些列表之后还会在记牌线程里被修改
+                self.on_result(list(remain_cards), list(show_left), list(show_right), list(show_self))
+            except Exception:
+                self._report_error()
@@ -0,0 +1,346 @@
+"""
+多进程推理 (CPU 多核)
+
+CPU 上一次 YOLO 推理只能用满几个线程, 其余核心空闲。这里开 K 个工作进程, 每个进程各加载一份模型:
+
+    pool = load_backend(weight_path, onnx_path, "onnx", workers=4)   # -> ProcessPoolBackend
+    future = pool.submit(img, conf=0.6, iou=0.45)     # 不阻塞
+    dets = future.result()
+    dets_list = pool.predict_batch(imgs, 0.6, 0.45)  # 多张图分给多个进程同时推理
+
+- 帧通过共享内存传给工作进程(每个在途任务一块, 用完回收), 不 pickle 图像; 返回的只是框和类别的小数组
+- 空闲的进程从同一个任务队列里取任务, 先做完的先返回; 结果按任务编号(seq)交给对应的 Future
+- OrderedDetections 让一个 CardDetector 同时有多帧在推理, 结果按帧的顺序取出后再交给 CardTracker
+
+GPU 上多个进程抢同一块显卡没有好处, load_backend 只在 cpu / onnx / openvino 时使用这个后端。
+"""
+
+import atexit
+import queue
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from core.detections import Detections
+from core.inference_backend import InferenceBackend
+from core.stage_timer import STAGE_TIMER
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # 共享内存由主进程创建和删除, 工作进程不登记到 resource_tracker
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    # 更早的版本附加时也会登记; spawn 的子进程和主进程共用一个 resource_tracker,
+    # 事后 unregister 会把主进程的登记一起删掉(主进程 unlink 时 tracker 报 KeyError), 所以附加期间跳过登记
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _worker_main(worker_id: int, loader: Callable, loader_kwargs: Dict, warmup: bool, tasks, results):
+    """
+    工作进程: 加载模型, 然后循环处理任务
+    任务: (seq, 共享内存块编号, 共享内存名, 图像形状, conf, iou, imgsz); None 表示退出
+    结果: (seq, worker_id, boxes, cls, 错误文本)
+    """
+    try:
+        backend = loader(**loader_kwargs)
+        if warmup:
+            backend.warmup()
+    except Exception:
+        results.put(("error", worker_id, traceback.format_exc()))
+        return
+    results.put(("ready", worker_id, (backend.names, backend.device, backend.base_imgsz)))
+
+    attached = {}  # 共享内存块编号 -> SharedMemory; 主进程给某一块换了更大的共享内存时名字会变
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        seq, slot_id, name, shape, conf, iou, imgsz = task
+        try:
+            shm = attached.get(slot_id)
+            if shm is None or shm.name != name:
+                if shm is not None:
+                    # 旧的那块已经被主进程删除, 关掉映射才会真正释放
+                    del attached[slot_id]
+                    shm.close()
+                shm = attached[slot_id] = _attach(name)
+            img = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+            dets = backend.predict(img, conf, iou, imgsz=imgsz)
+            del img
+            results.put((seq, worker_id, dets.boxes, dets.cls, None))
+        except Exception:
+            results.put((seq, worker_id, None, None, traceback.format_exc()))
+
+    for shm in attached.values():
+        shm.close()
+
+
+class _FrameSlot:
+    """
+    一块共享内存, 帧比它大时换一块更大的
+    """
+    __slots__ = ("index", "shm")
+
+    def __init__(self, index: int):
+        self.index = index  # 工作进程按编号缓存附加的共享内存
+        self.shm: Optional[shared_memory.SharedMemory] = None
+
+    def write(self, img: np.ndarray) -> str:
+        if self.shm is None or self.shm.size < img.nbytes:
+            self.release()
+            self.shm = shared_memory.SharedMemory(create=True, size=max(img.nbytes, 1))
+        np.copyto(np.ndarray(img.shape, dtype=np.uint8, buffer=self.shm.buf), img)
+        return self.shm.name
+
+    def release(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+class ProcessPoolBackend(InferenceBackend):
+    """
+    K 个工作进程的推理后端, 接口与其他 InferenceBackend 相同(另有 submit)
+    submit / predict / predict_batch 可以在多个线程中同时调用
+    """
+
+    thread_safe = True
+
+    def __init__(self, loader: Callable, loader_kwargs: Dict, workers: int, warmup: bool = False,
+                 max_inflight: int = 0):
+        """
+        loader: 在工作进程里创建后端的函数(必须是可以 pickle 的模块级函数), 通常是 load_backend
+        loader_kwargs: loader 的参数
+        max_inflight: 同时在途的任务数(共享内存块数), 0 表示 workers * 2; 再提交时等待
+        """
+        import multiprocessing as mp
+
+        super().__init__()
+        self.workers = max(1, int(workers))
+        # spawn: 工作进程不继承主进程的线程/Qt 状态, Windows 上也只有这种方式
+        ctx = mp.get_context("spawn")
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        self._processes = [
+            ctx.Process(target=_worker_main, name=f"infer-worker-{i}", daemon=True,
+                        args=(i, loader, loader_kwargs, warmup, self._tasks, self._results))
+            for i in range(self.workers)
+        ]
+        for p in self._processes:
+            p.start()
+
+        slots = max_inflight if max_inflight > 0 else self.workers * 2
+        self._free_slots = [_FrameSlot(i) for i in range(slots)]
+        self._all_slots = list(self._free_slots)
+        self._slot_sem = threading.Semaphore(slots)
+        self._lock = threading.Lock()
+        self._pending: Dict[int, tuple] = {}  # seq -> (Future, 共享内存块, 原图尺寸)
+        self._seq = 0
+        self._closed = False
+        self._error: Optional[Exception] = None  # 工作进程意外退出后, 之后的提交都抛出这个异常
+
+        try:
+            self._wait_ready()
+        except Exception:
+            self.close()
+            raise
+        self._collector = threading.Thread(target=self._collect_loop, name="infer-pool-results", daemon=True)
+        self._collector.start()
+        # 退出前停掉工作进程、删除共享内存(注册表里空闲的模型不会被显式关闭)
+        atexit.register(self.close)
+        print(f"[CardDetector] 多进程推理: {self.workers} 个进程 ({self.device})")
+
+    def _wait_ready(self):
+        ready = 0
+        while ready < self.workers:
+            try:
+                msg = self._results.get(timeout=1.0)
+            except queue.Empty:
+                if not all(p.is_alive() for p in self._processes):
+                    raise RuntimeError("推理进程启动失败")
+                continue
+            kind, worker_id, payload = msg
+            if kind == "error":
+                raise RuntimeError(f"推理进程 {worker_id} 加载模型失败:\n{payload}")
+            self.names, device, self.base_imgsz = payload
+            self.device = f"{device} x{self.workers}"
+            ready += 1
+
+    # ================= 提交 / 收集 =================
+    def submit(self, img: np.ndarray, conf: float, iou: float, imgsz: Optional[int] = None) -> Future:
+        """
+        把一帧交给空闲的工作进程, 返回 Future (结果为原图坐标系下的 Detections)
+        图像在返回前已经复制进共享内存, 调用方可以立即复用 img 的缓冲区
+        """
+        if self._closed:
+            raise RuntimeError("推理进程池已关闭")
+        if self._error is not None:
+            raise self._error
+        img = np.ascontiguousarray(img, dtype=np.uint8)
+        self._slot_sem.acquire()
+        with self._lock:
+            slot = self._free_slots.pop()
+            seq = self._seq
+            self._seq += 1
+        future = Future()
+        try:
+            name = slot.write(img)
+        except Exception:
+            self._return_slot(slot)
+            raise
+        with self._lock:
+            self._pending[seq] = (future, slot, tuple(img.shape[:2]))
+        self._tasks.put((seq, slot.index, name, img.shape, conf, iou, imgsz))
+        return future
+
+    def _return_slot(self, slot):
+        with self._lock:
+            self._free_slots.append(slot)
+        self._slot_sem.release()
+
+    def _collect_loop(self):
+        while not self._closed:
+            try:
+                seq, worker_id, boxes, cls, error = self._results.get(timeout=0.5)
+            except queue.Empty:
+                if not all(p.is_alive() for p in self._processes):
+                    self._error = RuntimeError("推理进程意外退出")
+                    self._fail_pending(self._error)
+                    return
+                continue
+            except (EOFError, OSError):  # close() 时队列被关闭
+                return
+            with self._lock:
+                entry = self._pending.pop(seq, None)
+            if entry is None:
+                continue
+            future, slot, orig_shape = entry
+            self._return_slot(slot)
+            if error is not None:
+                future.set_exception(RuntimeError(f"推理进程 {worker_id} 出错:\n{error}"))
+            else:
+                future.set_result(Detections(boxes, cls, self.names, orig_shape))
+
+    def _fail_pending(self, exc: Exception):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future, slot, _ in pending.values():
+            self._return_slot(slot)
+            if not future.done():
+                future.set_exception(exc)
+
+    # ================= InferenceBackend 接口 =================
+    def predict(self, img, conf, iou, imgsz=None):
+        return self.submit(img, conf, iou, imgsz).result()
+
+    def predict_batch(self, imgs, conf, iou, imgszs=None):
+        # 多张图分给不同的进程同时推理
+        imgszs = list(imgszs) if imgszs is not None else [None] * len(imgs)
+        futures = [self.submit(img, conf, iou, imgsz) for img, imgsz in zip(imgs, imgszs)]
+        return [future.result() for future in futures]
+
+    def warmup(self, runs: int = 2):
+        # 每个进程在加载后已经各自预热(构造时 warmup=True), 这里只把任务分给所有进程跑一遍
+        img = np.zeros((self.base_imgsz * 9 // 16, self.base_imgsz, 3), dtype=np.uint8)
+        self.predict_batch([img] * (runs * self.workers), conf=0.25, iou=0.45)
+
+    def close(self, timeout: float = 2.0):
+        """
+        停止工作进程并删除共享内存; 还没完成的任务以异常结束
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._processes:
+            self._tasks.put(None)
+        for p in self._processes:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        self._fail_pending(RuntimeError("推理进程池已关闭"))
+        for slot in self._all_slots:
+            slot.release()
+        self._tasks.close()
+        self._results.close()
+
+    def __del__(self):
+        try:
+            self.close(timeout=0.5)
+        except Exception:
+            pass
+
+
+class OrderedDetections:
+    """
+    让一个 CardDetector 同时有多帧在推理, 结果按提交顺序取出 (回放 / 录像这种帧可以预先读取的场景)
+
+        stream = OrderedDetections(detector, depth=8)
+        stream.submit(frame, tag)          # 帧差门控和结果缓存在这里按顺序执行, 需要推理的交给模型的 submit
+        tag, detections = stream.next()    # 最早提交的那一帧; 后提交的帧先推理完时在这里等待/排队
+
+    CardDetector 的帧差门控以"上一个提交的帧"为参考(见 begin_frame 的 pipelined), 没有变化的区域
+    复用上一帧的结果; 因为 finish_frame 严格按顺序执行, 复用到的总是前一帧的识别结果。
+    """
+
+    def __init__(self, detector, depth: int):
+        self.detector = detector
+        self.depth = max(1, int(depth))
+        self._inflight = deque()  # (帧, job, Future 或 None, tag), 按提交顺序
+
+    def __len__(self):
+        return len(self._inflight)
+
+    @property
+    def full(self) -> bool:
+        return len(self._inflight) >= self.depth
+
+    def submit(self, frame, tag=None):
+        detector = self.detector
+        if detector.recorder is not None and frame is not None:
+            frame = frame.copy()  # 录制时要保存这一帧, 帧来源的缓冲区可能被下一帧覆盖
+        job = detector.begin_frame(frame, pipelined=True)
+        future = None
+        if job.needs_inference:
+            future = detector.model.submit(job.infer_img, conf=detector.yolo_conf, iou=detector.yolo_iou,
+                                           imgsz=job.imgsz)
+        self._inflight.append((frame, job, future, tag))
+
+    def next(self):
+        """
+        取出最早提交的那一帧的结果: (tag, detections); 推理出错时抛出异常(该帧丢弃)
+        """
+        frame, job, future, tag = self._inflight.popleft()
+        detector = self.detector
+        try:
+            dets = None
+            if future is not None:
+                with STAGE_TIMER.span("inference"):  # 等待结果的时间
+                    dets = future.result()
+        except Exception:
+            # 之后的帧以这一帧为参考做了帧差门控, 全部作废
+            self.discard()
+            raise
+        result = detector.finish_frame(job, dets)
+        detector.record_frame(frame, result)
+        return tag, result
+
+    def discard(self):
+        """
+        丢弃所有在途的帧; 下一帧所有区域重新识别
+        """
+        self._inflight.clear()  # 已经交给工作进程的任务照常完成, 结果不再使用
+        if self.detector.change_detector is not None:
+            self.detector.change_detector.reset()
@@ -0,0 +1,70 @@
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from core.detections import REGION_NAMES, layout_to_pixel_regions
+
+
+class RegionResultCache:
+    """
+    区域识别结果缓存 (LRU)
+
+    出牌区在两轮出牌之间、手牌在对手思考时, 画面会反复回到之前出现过的样子(比如出牌区清空)。
+    帧差门控只和"上一次推理时"比较, 这些区域仍会被判为脏区域; 这里按区域画面的哈希记住识别结果,
+    见过的画面直接返回缓存的牌, 不再送进 YOLO。
+
+    哈希: 区域按 step 隔点采样, 像素值右移 shift 位(抹掉 JPEG/缩放带来的 ±几级抖动)后取 blake2b。
+    每个条目只有 16 字节的键和一个牌编码 tuple, 内存由 capacity 限定。
+    """
+
+    def __init__(self, layout: Dict, capacity: int = 64, step: int = 2, shift: int = 2):
+        self.layout = layout
+        self.capacity = capacity
+        self.step = max(1, int(step))
+        self.shift = shift
+        self._entries: "OrderedDict[Tuple[str, bytes], tuple]" = OrderedDict()
+        self._shape: Optional[Tuple[int, int]] = None
+        self._slices: Dict[str, Tuple[slice, slice]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self._entries.clear()
+
+    def _prepare(self, img_h: int, img_w: int):
+        regions = layout_to_pixel_regions(self.layout, img_w, img_h)
+        self._slices = {}
+        for name in REGION_NAMES:
+            x1, y1, x2, y2 = regions[name]
+            self._slices[name] = (
+                slice(max(0, y1), min(img_h, y2 + 1), self.step),
+                slice(max(0, x1), min(img_w, x2 + 1), self.step),
+            )
+        self._shape = (img_h, img_w)
+        # 窗口尺寸变了, 旧画面的哈希都不会再命中
+        self._entries.clear()
+
+    def region_key(self, frame: np.ndarray, name: str) -> Tuple[str, bytes]:
+        img_h, img_w = frame.shape[:2]
+        if self._shape != (img_h, img_w):
+            self._prepare(img_h, img_w)
+        ys, xs = self._slices[name]
+        thumb = np.ascontiguousarray(frame[ys, xs]) >> self.shift
+        return name, hashlib.blake2b(thumb.data, digest_size=16).digest()
+
+    def get(self, key) -> Optional[tuple]:
+        cards = self._entries.get(key)
+        if cards is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return cards
+
+    def put(self, key, cards: tuple):
+        self._entries[key] = cards
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
@@ -0,0 +1,145 @@
+import math
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from core.detections import REGION_NAMES, Detections, assign_regions, layout_to_pixel_regions
+
+
+class _MosaicPlan:
+    """
+    某个(窗口尺寸, 区域集合)下的拼图方案, 连同预分配的拼图缓冲区一起缓存
+    tiles: [(区域名, 裁剪区域 (x1, y1, x2, y2), 拼图中的位置 (tx, ty)), ...]
+    """
+
+    __slots__ = ("tiles", "buffer", "regions")
+
+    def __init__(self, tiles, buffer, regions):
+        self.tiles = tiles
+        self.buffer = buffer
+        self.regions = regions
+
+
+class RoiMosaic:
+    """
+    区域裁剪 + 拼图
+
+    整张窗口截图里真正有用的只有 layout 的五个区域, 其余像素送进 YOLO 纯属浪费。
+    这里把五个区域裁剪出来, 用"首次适应、按高度降序"的货架算法拼成一张紧凑的拼图,
+    只对拼图做一次推理, 再把框映射回窗口坐标。
+
+    为了让牌在拼图里和整图推理时保持同样的像素尺度(模型是按整图尺度训练的),
+    推理尺寸按拼图长边与整图长边的比例缩小, 这样 CPU 耗时大致随裁掉的面积等比下降。
+    """
+
+    PAD = 16           # 区块之间的间隔, 避免一个框横跨两个区块
+    PAD_VALUE = 114    # 与 YOLO letterbox 的填充色一致
+    STRIDE = 32        # 推理尺寸需要是模型步长的整数倍
+
+    def __init__(self, layout: Dict):
+        self.layout = layout
+        self._plans: Dict[Tuple, _MosaicPlan] = {}
+
+    # ================= 拼图方案 =================
+    def _get_plan(self, img_h: int, img_w: int, region_names: Sequence[str]) -> _MosaicPlan:
+        key = (img_h, img_w, tuple(region_names))
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+
+        regions = layout_to_pixel_regions(self.layout, img_w, img_h)
+
+        # 裁剪区域与 in_region 一致: 两端都包含, 所以右/下边界 +1
+        crops = []
+        for name in region_names:
+            x1, y1, x2, y2 = regions[name]
+            x1, x2 = max(0, x1), min(img_w, x2 + 1)
+            y1, y2 = max(0, y1), min(img_h, y2 + 1)
+            if x2 > x1 and y2 > y1:
+                crops.append((name, (x1, y1, x2, y2)))
+
+        tiles = []
+        if crops:
+            shelf_w = max(c[2] - c[0] for _, c in crops)
+            # shelves: [[y, 高度, 已用宽度], ...]
+            shelves: List[List[int]] = []
+            next_y = 0
+            for name, c in sorted(crops, key=lambda t: t[1][3] - t[1][1], reverse=True):
+                cw, ch = c[2] - c[0], c[3] - c[1]
+                for shelf in shelves:
+                    if shelf[2] + cw <= shelf_w:
+                        tiles.append((name, c, (shelf[2], shelf[0])))
+                        shelf[2] += cw + self.PAD
+                        break
+                else:
+                    shelves.append([next_y, ch, cw + self.PAD])
+                    tiles.append((name, c, (0, next_y)))
+                    next_y += ch + self.PAD
+            mosaic_h, mosaic_w = next_y - self.PAD, shelf_w
+        else:
+            mosaic_h, mosaic_w = self.STRIDE, self.STRIDE
+
+        buffer = np.full((mosaic_h, mosaic_w, 3), self.PAD_VALUE, dtype=np.uint8)
+        plan = _MosaicPlan(tiles, buffer, regions)
+        self._plans[key] = plan
+        return plan
+
+    # ================= 拼图 =================
+    def compose(self, frame: np.ndarray, region_names: Sequence[str] = REGION_NAMES) -> Tuple[np.ndarray, _MosaicPlan]:
+        """
+        把 frame 中的区域拷进复用的拼图缓冲区
+        返回 (拼图, 方案), 方案用于 map_back
+        """
+        img_h, img_w = frame.shape[:2]
+        plan = self._get_plan(img_h, img_w, region_names)
+        buf = plan.buffer
+        for _, (x1, y1, x2, y2), (tx, ty) in plan.tiles:
+            buf[ty:ty + (y2 - y1), tx:tx + (x2 - x1)] = frame[y1:y2, x1:x2]
+        return buf, plan
+
+    def infer_imgsz(self, plan: _MosaicPlan, frame_shape: Tuple[int, int], base_imgsz: int) -> int:
+        """
+        整图按 base_imgsz 推理时的缩放比例, 套用到拼图上得到拼图的推理尺寸
+        """
+        mosaic_h, mosaic_w = plan.buffer.shape[:2]
+        scale = base_imgsz / max(frame_shape[0], frame_shape[1])
+        size = math.ceil(max(mosaic_h, mosaic_w) * scale / self.STRIDE) * self.STRIDE
+        return int(min(max(size, self.STRIDE), base_imgsz))
+
+    # ================= 坐标映射 =================
+    def map_back(self, dets: Detections, plan: _MosaicPlan, frame_shape: Tuple[int, int]) -> Detections:
+        """
+        拼图坐标 -> 窗口坐标
+
+        - 框中心落在哪个区块, 就属于哪个区块(落在间隔里的框丢弃)
+        - 映射回窗口后再按区域优先级判断一次归属, 只保留属于该区块区域的框,
+          这样两个区域有重叠时, 重叠处的牌不会被两个区块各检测一次
+        """
+        frame_shape = tuple(frame_shape[:2])
+        if len(dets) == 0 or not plan.tiles:
+            return Detections.empty(dets.names, frame_shape)
+
+        boxes = dets.boxes
+        cx = (boxes[:, 0] + boxes[:, 2]) / 2
+        cy = (boxes[:, 1] + boxes[:, 3]) / 2
+
+        parts = []
+        for name, (x1, y1, x2, y2), (tx, ty) in plan.tiles:
+            cw, ch = x2 - x1, y2 - y1
+            mask = (cx >= tx) & (cx < tx + cw) & (cy >= ty) & (cy < ty + ch)
+            if not mask.any():
+                continue
+
+            b = boxes[mask].copy()
+            xs, ys = b[:, 0::2], b[:, 1::2]  # (x1, x2) / (y1, y2) 两列的视图
+            xs += x1 - tx
+            ys += y1 - ty
+            # 区块边缘的框可能伸进间隔, 裁回区块范围
+            np.clip(xs, x1, x2, out=xs)
+            np.clip(ys, y1, y2, out=ys)
+
+            owner = assign_regions(b, plan.regions)
+            keep = owner == REGION_NAMES.index(name)
+            parts.append(Detections(b[keep], dets.cls[mask][keep], dets.names, frame_shape))
+
+        return Detections.concat(parts, dets.names, frame_shape)
@@ -0,0 +1,81 @@
+from config.settings import HAS_STARTED, STARTED_RECORD_CARD
+import config.settings as settings
+
+
+class AdaptiveScheduler:
+    """
+    自适应检测间隔
+
+    固定间隔要么在对局中不够快, 要么在大厅/空闲时白白占用 CPU。每识别完一帧根据记牌器状态决定下一次间隔:
+    - 对局中(HAS_STARTED / STARTED_RECORD_CARD)且有区域还没稳定(牌在变化): 用最短间隔, 尽快凑满连续 N 帧
+    - 有目标但画面稳定: 逐步回到基础间隔(用户设置的检测间隔)
+    - 没有地主牌(大厅/空闲): 间隔按倍数指数退避, 直到最长间隔
+    最后再受 CPU 预算限制: 识别耗时 / 间隔 <= cpu_budget (例如 0.5 表示最多占一个核的一半)
+
+    interval 是两次识别开始之间的间隔; 串行模式下识别结束后应等待 delay(work_sec)。
+    """
+
+    def __init__(self, base_interval: float, min_interval: float = 0.08, max_interval: float = 2.0,
+                 cpu_budget: float = 0.5, backoff: float = 2.0):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.cpu_budget = cpu_budget
+        self.backoff = backoff
+        self.interval = base_interval
+        self.work_ema = None  # 识别耗时的指数滑动平均(秒)
+
+    def reset(self):
+        self.interval = self.base_interval
+        self.work_ema = None
+
+    def update(self, tracker, work_sec: float) -> float:
+        """
+        识别完一帧后调用, 返回下一次的间隔(秒)
+        tracker: CardTracker
+        work_sec: 这一帧识别 + 记牌的耗时
+        """
+        self.work_ema = work_sec if self.work_ema is None else 0.8 * self.work_ema + 0.2 * work_sec
+
+        base = max(self.min_interval, min(self.base_interval, self.max_interval))
+        if not tracker.has_target:
+            # 没有地主牌: 指数退避
+            self.interval = min(self.max_interval, max(base, self.interval * self.backoff))
+        elif tracker.state in (HAS_STARTED, STARTED_RECORD_CARD) and self._cards_changing(tracker):
+            self.interval = self.min_interval
+        elif self.interval > base:
+            # 刚从空闲回到对局, 直接回到基础间隔
+            self.interval = base
+        else:
+            # 从最短间隔逐步放慢到基础间隔
+            self.interval = min(base, self.interval * 1.25)
+
+        interval = self.interval
+        if self.cpu_budget > 0:
+            interval = max(interval, self.work_ema / self.cpu_budget)
+        return interval
+
+    def delay(self, tracker, work_sec: float) -> float:
+        """
+        串行模式: 识别结束后到下一次识别开始要等多久
+        """
+        return max(0.0, self.update(tracker, work_sec) - work_sec)
+
+    @staticmethod
+    def _cards_changing(tracker) -> bool:
+        # 有区域还没连续 N 帧相同, 说明牌在变化(或刚变化完还没确认)
+        return any(history.stable_count < settings.FRAME_LENGTH for history in tracker.histories)
+
+
+def create_scheduler():
+    """
+    按配置创建调度器, adaptive_interval 关闭时返回 None(使用固定间隔)
+    """
+    if not settings.ADAPTIVE_INTERVAL:
+        return None
+    return AdaptiveScheduler(
+        settings.DETECT_INTERVAL_SEC,
+        min_interval=settings.MIN_DETECT_INTERVAL_SEC,
+        max_interval=settings.MAX_DETECT_INTERVAL_SEC,
+        cpu_budget=settings.CPU_BUDGET,
+    )
@@ -1,9 +1,151 @@
-import win32gui
-import win32ui
-import win32con
+try:
+    import win32gui
+    import win32ui
+    import win32con
+except ImportError:  # 非 Windows 环境: 只能使用注入的 win32 接口(回放/测试)
+    win32gui = win32ui = win32con = None
 from PIL import Image
+import numpy as np
 import ctypes
 
+
+class GdiCaptureSession:
+    """
+    常驻的 GDI 截图会话
+
+    capture_window 每次都要 FindWindow、GetWindowDC、CreateCompatibleDC、CreateBitmap,
+    截完再全部释放, 最后还要经过 GetBitmapBits -> bytes -> PIL 复制两次。
+    这里把这些资源缓存下来:
+    - 缓存 hwnd, 只有窗口失效(IsWindow 为假)时才重新 FindWindow
+    - 内存 DC 和位图一直保留, 只有窗口尺寸变化时才重建
+    - 位图像素直接拷进预分配的 numpy 缓冲区(BGRX), 再拷进预分配的 BGR 输出缓冲区
+
+    注意: grab() 返回的数组会在下一帧被覆盖, 需要长期保存请自行 copy()。
+
+    win32gui / win32ui / win32con / gdi32 可以注入假的实现, 用于在非 Windows 环境测试
+    缓存与重建逻辑。
+    """
+
+    def __init__(self, window_title: str, win32gui_api=None, win32ui_api=None, win32con_api=None, gdi32_api=None):
+        self.window_title = window_title
+        self.win32gui = win32gui_api if win32gui_api is not None else win32gui
+        self.win32ui = win32ui_api if win32ui_api is not None else win32ui
+        self.win32con = win32con_api if win32con_api is not None else win32con
+        if gdi32_api is None:
+            from ctypes import wintypes
+            gdi32_api = ctypes.windll.gdi32
+            # 声明参数类型: 否则缓冲区地址按 int 传入, 64 位下会被截断成 32 位
+            gdi32_api.GetBitmapBits.argtypes = (wintypes.HBITMAP, wintypes.LONG, ctypes.c_void_p)
+            gdi32_api.GetBitmapBits.restype = wintypes.LONG
+        self.gdi32 = gdi32_api
+        if self.win32gui is None or self.win32ui is None or self.win32con is None:
+            raise RuntimeError("GdiCaptureSession 需要 pywin32 (仅支持 Windows)")
+
+        self.hwnd = None
+        self.size = None          # (w, h), 当前位图尺寸
+        self.hdesktop = None
+        self.desktop_dc = None
+        self.img_dc = None
+        self.mem_dc = None
+        self.bmp = None
+        self.raw_buffer = None    # (h, w, 4) BGRX, GetBitmapBits 的目标
+        self.frame_buffer = None  # (h, w, 3) BGR, grab() 的返回值
+
+    # ================= 窗口句柄 =================
+    def _find_window(self):
+        if self.hwnd and self.win32gui.IsWindow(self.hwnd):
+            return self.hwnd
+        self.hwnd = self.win32gui.FindWindow(None, self.window_title) or None
+        return self.hwnd
+
+    # ================= DC / 位图 =================
+    def _ensure_resources(self, w, h):
+        if self.mem_dc is not None and self.size == (w, h):
+            return
+
+        # 第一次截图或窗口尺寸变了: 释放旧资源后按新尺寸重建
+        self.release()
+
+        self.hdesktop = self.win32gui.GetDesktopWindow()
+        self.desktop_dc = self.win32gui.GetWindowDC(self.hdesktop)
+        self.img_dc = self.win32ui.CreateDCFromHandle(self.desktop_dc)
+        self.mem_dc = self.img_dc.CreateCompatibleDC()
+
+        self.bmp = self.win32ui.CreateBitmap()
+        self.bmp.CreateCompatibleBitmap(self.img_dc, w, h)
+        self.mem_dc.SelectObject(self.bmp)
+
+        self.raw_buffer = np.empty((h, w, 4), dtype=np.uint8)
+        self.frame_buffer = np.empty((h, w, 3), dtype=np.uint8)
+        self.size = (w, h)
+
+    def release(self):
+        """
+        释放 DC 和位图 (窗口尺寸变化 / 关闭时调用)
+        """
+        if self.mem_dc is not None:
+            self.mem_dc.DeleteDC()  # 删除内存设备上下文
+        if self.img_dc is not None:
+            self.img_dc.DeleteDC()  # 删除图像设备上下文
+        if self.desktop_dc is not None:
+            self.win32gui.ReleaseDC(self.hdesktop, self.desktop_dc)  # 释放桌面设备上下文
+        if self.bmp is not None:
+            self.win32gui.DeleteObject(self.bmp.GetHandle())  # 删除位图对象
+
+        self.hdesktop = None
+        self.desktop_dc = None
+        self.img_dc = None
+        self.mem_dc = None
+        self.bmp = None
+        self.size = None
+
+    def close(self):
+        self.release()
+        self.hwnd = None
+
+    # ================= 截图 =================
+    def grab(self):
+        """
+        截取一帧, 返回 BGR ndarray (h, w, 3); 窗口不存在时返回 None
+        """
+        hwnd = self._find_window()
+        if not hwnd:
+            print(f"没找到窗口: {self.window_title}")
+            return None
+
+        try:
+            left, top, right, bot = self.win32gui.GetWindowRect(hwnd)
+        except Exception:
+            # 窗口在 IsWindow 之后被关闭, 下次重新查找
+            self.hwnd = None
+            return None
+
+        w = right - left
+        h = bot - top
+        if w <= 0 or h <= 0:  # 最小化
+            return None
+
+        self._ensure_resources(w, h)
+
+        self.mem_dc.BitBlt(
+            (0, 0), (w, h),
+            self.img_dc, (left, top),
+            self.win32con.SRCCOPY
+        )
+
+        # 直接拷进预分配缓冲区, 不产生新的 bytes 对象
+        copied = self.gdi32.GetBitmapBits(self.bmp.GetHandle(), self.raw_buffer.nbytes,
+                                          ctypes.c_void_p(self.raw_buffer.ctypes.data))
+        if not copied:
+            # 位图失效(比如显示设置变化), 下一帧重建
+            self.release()
+            return None
+
+        # BGRX -> BGR: 丢掉第 4 个通道即可, 不需要颜色转换
+        np.copyto(self.frame_buffer, self.raw_buffer[:, :, :3])
+        return self.frame_buffer
+
+
 class ScreenCapture:
     """
     窗口截图类, 截取图片
@@ -12,6 +154,7 @@ class ScreenCapture:
     def __init__(self, window_title: str = None):
         ctypes.windll.user32.SetProcessDPIAware() # 这一行代码是用来确保你的应用程序在高DPI（每英寸点数）显示器上正确显示的
         self.window_title = window_title
+        self.session = None  # 常驻截图会话, 第一次 capture_window_array 时创建
 
     def capture_window(self):      # 截图
         hwnd = win32gui.FindWindow(None, self.window_title)
@@ -54,6 +197,16 @@ class ScreenCapture:
 
         return img
 
+    def capture_window_array(self):  # 截图, 返回 BGR ndarray (供 YOLO 直接使用, 下一帧会被覆盖)
+        if self.session is None:
+            self.session = GdiCaptureSession(self.window_title)
+        return self.session.grab()
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
 #
 #
 #
@@ -0,0 +1,232 @@
+"""
+对局录制 / 回放
+
+录制时把每一帧的时间戳、识别结果(牌编码)和压缩后的截图写进一个会话目录:
+
+    sessions/20260101_203000/
+        meta.json        布局、frame_length / reset_time 等影响记牌结果的配置
+        session.jsonl    每帧一行: {"i": 序号, "t": 时间戳, "frame": 图片文件名或 null, "detections": [[...] x 5]}
+        frames/000000.jpg
+
+- 画面和上一张保存的图片完全相同时不再重复保存, 该帧引用上一张图片
+- session.jsonl 边录边追加, 程序崩溃也只丢最后几帧
+
+回放时用记录的时间戳驱动 CardTracker 的时钟, 按录制时的识别结果(或对录制的画面重新识别)
+全速喂给 CardTracker.run, 同一个会话每次回放的结果都完全一样, 不需要游戏窗口, Linux 下也能跑。
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+import config.settings as settings
+from core.frame_source import FrameSource
+
+META_FILE = "meta.json"
+ENTRIES_FILE = "session.jsonl"
+FRAMES_DIR = "frames"
+FORMAT_VERSION = 1
+
+
+class SessionRecorder:
+    """
+    录制会话 (线程安全, 截图/识别可以在任意线程调用 record)
+    frame_format: "jpg"(体积小) / "png"(无损, 回放重新识别时与录制完全一致) / None(不保存画面)
+    """
+
+    def __init__(self, session_dir: str, meta: Optional[Dict] = None, frame_format: Optional[str] = "jpg",
+                 jpeg_quality: int = 90, clock=time.time):
+        import cv2
+        self._cv2 = cv2
+        self.session_dir = session_dir
+        self.frame_format = frame_format
+        self.jpeg_quality = jpeg_quality
+        self.clock = clock
+        self.index = 0
+        self._lock = threading.Lock()
+        self._last_frame: Optional[np.ndarray] = None
+        self._last_frame_name: Optional[str] = None
+
+        os.makedirs(os.path.join(session_dir, FRAMES_DIR), exist_ok=True)
+        meta = dict(meta or {})
+        meta.setdefault("version", FORMAT_VERSION)
+        meta.setdefault("created", time.strftime("%Y-%m-%d %H:%M:%S"))
+        meta.setdefault("frame_format", frame_format)
+        with open(os.path.join(session_dir, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        self._entries = open(os.path.join(session_dir, ENTRIES_FILE), "a", encoding="utf-8")
+
+    def _save_frame(self, frame: np.ndarray) -> Optional[str]:
+        if self._last_frame is not None and self._last_frame.shape == frame.shape \
+                and np.array_equal(self._last_frame, frame):
+            return self._last_frame_name
+
+        name = f"{FRAMES_DIR}/{self.index:06d}.{self.frame_format}"
+        params = [self._cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality] if self.frame_format == "jpg" else []
+        ok, data = self._cv2.imencode("." + self.frame_format, frame, params)
+        if not ok:
+            return None
+        data.tofile(os.path.join(self.session_dir, name))
+
+        # 截图会话的缓冲区会被下一帧覆盖, 保存一份用来比较
+        if self._last_frame is None or self._last_frame.shape != frame.shape:
+            self._last_frame = frame.copy()
+        else:
+            np.copyto(self._last_frame, frame)
+        self._last_frame_name = name
+        return name
+
+    def record(self, frame: Optional[np.ndarray], detections: Sequence[Sequence[int]], t: Optional[float] = None):
+        """
+        frame: 这一帧的截图(BGR), 没找到窗口时为 None
+        detections: 五个区域的牌编码
+        """
+        t = self.clock() if t is None else t
+        with self._lock:
+            if self._entries is None:
+                return
+            frame_name = None
+            if frame is not None and self.frame_format:
+                frame_name = self._save_frame(frame)
+            entry = {
+                "i": self.index,
+                "t": t,
+                "frame": frame_name,
+                "detections": [list(cards) for cards in detections],
+            }
+            self._entries.write(json.dumps(entry) + "\n")
+            self._entries.flush()
+            self.index += 1
+
+    def close(self):
+        with self._lock:
+            if self._entries is not None:
+                self._entries.close()
+                self._entries = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SessionArchive:
+    """
+    读取录制的会话
+    """
+
+    def __init__(self, session_dir: str):
+        if not os.path.isfile(os.path.join(session_dir, ENTRIES_FILE)):
+            raise ValueError(f"不是录制的会话目录: {session_dir}")
+        self.session_dir = session_dir
+        meta_path = os.path.join(session_dir, META_FILE)
+        self.meta: Dict = {}
+        if os.path.isfile(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                self.meta = json.load(f)
+
+        self.entries: List[Dict] = []
+        with open(os.path.join(session_dir, ENTRIES_FILE), "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    self.entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break  # 录制时崩溃, 最后一行可能不完整
+
+    def __len__(self):
+        return len(self.entries)
+
+    def detections(self, entry: Dict):
+        return tuple(tuple(cards) for cards in entry["detections"])
+
+    def load_frame(self, entry: Dict) -> Optional[np.ndarray]:
+        if not entry.get("frame"):
+            return None
+        import cv2
+        data = np.fromfile(os.path.join(self.session_dir, entry["frame"]), dtype=np.uint8)
+        return cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.entries)
+
+
+class ArchiveFrameSource(FrameSource):
+    """
+    按录制顺序读取会话里的画面(用来对录制的画面重新识别)
+    同一张图片被连续引用时只解码一次
+    """
+
+    def __init__(self, archive: SessionArchive):
+        super().__init__()
+        self.archive = archive
+        self.index = 0
+        self._cached_name = None
+        self._cached_frame = None
+
+    @property
+    def current_entry(self) -> Optional[Dict]:
+        """
+        最近一次 read() 对应的记录
+        """
+        return self.archive.entries[self.index - 1] if self.index > 0 else None
+
+    def read(self) -> Optional[np.ndarray]:
+        if self.index >= len(self.archive.entries):
+            self.exhausted = True
+            return None
+        entry = self.archive.entries[self.index]
+        self.index += 1
+        name = entry.get("frame")
+        if name != self._cached_name:
+            self._cached_frame = self.archive.load_frame(entry)
+            self._cached_name = name
+        return self._cached_frame
+
+
+class ReplayClock:
+    """
+    回放用的时钟: 返回当前回放到的那一帧的录制时间
+    """
+
+    def __init__(self, t: float = 0.0):
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
+
+
+def start_recording(detector, session_dir: Optional[str] = None, frame_format: Optional[str] = "jpg") -> SessionRecorder:
+    """
+    开始录制 detector 的每一帧; session_dir 为 None 时在 sessions/ 下按时间新建目录
+    """
+    if session_dir is None:
+        session_dir = base = os.path.join(settings.SESSION_DIR, time.strftime("%Y%m%d_%H%M%S"))
+        n = 1
+        while os.path.exists(session_dir):  # 同一秒内切换布局会再开一个会话
+            session_dir = f"{base}_{n}"
+            n += 1
+    meta = {
+        "layout_name": detector.layout_name,
+        "frame_length": settings.FRAME_LENGTH,
+        "reset_time": settings.RESET_TIME,
+        "device_choice": settings.DEVICE_CHOICE,
+    }
+    recorder = SessionRecorder(session_dir, meta=meta, frame_format=frame_format)
+    detector.recorder = recorder
+    print(f"[录制] 会话保存到: {session_dir}")
+    return recorder
+
+
+def stop_recording(detector):
+    recorder = detector.recorder
+    detector.recorder = None
+    if recorder is not None:
+        recorder.close()
@@ -0,0 +1,113 @@
+"""
+各阶段耗时统计
+
+    from core.stage_timer import STAGE_TIMER
+    with STAGE_TIMER.span("inference"):
+        ...
+
+每个阶段保留最近 window 次的耗时(环形缓冲区), 随时可以取 p50 / p95 / 最大值和分桶直方图。
+记录一次只是两次 perf_counter_ns 加一次加锁写数组, 默认常开。
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import numpy as np
+
+# 阶段显示顺序(没出现过的阶段不显示)
+STAGE_ORDER = ("capture", "frame_diff", "region_cache", "inference", "parse", "detect", "track", "ui_update")
+
+# 直方图分桶上界(ms), 最后一个桶是 > 500ms
+HIST_EDGES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class RollingHistogram:
+    """
+    最近 window 次耗时的环形缓冲区
+    """
+
+    def __init__(self, window: int = 256):
+        self.samples = np.zeros(window, dtype=np.float64)
+        self.pos = 0
+        self.size = 0
+        self.total = 0  # 累计记录次数
+
+    def add(self, ms: float):
+        self.samples[self.pos] = ms
+        self.pos = (self.pos + 1) % len(self.samples)
+        if self.size < len(self.samples):
+            self.size += 1
+        self.total += 1
+
+    def summary(self) -> Dict:
+        data = self.samples[:self.size]
+        p50, p95 = np.percentile(data, (50, 95))
+        hist = np.bincount(np.searchsorted(HIST_EDGES_MS, data), minlength=len(HIST_EDGES_MS) + 1)
+        return {
+            "count": self.total,
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "mean_ms": round(float(data.mean()), 3),
+            "max_ms": round(float(data.max()), 3),
+            "hist": hist.tolist(),
+        }
+
+
+class StageTimer:
+    def __init__(self, window: int = 256):
+        self.window = window
+        self._stages: Dict[str, RollingHistogram] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage: str):
+        t0 = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter_ns() - t0) / 1e6)
+
+    def record(self, stage: str, ms: float):
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = RollingHistogram(self.window)
+            hist.add(ms)
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            names = sorted(self._stages, key=lambda n: (STAGE_ORDER.index(n) if n in STAGE_ORDER else len(STAGE_ORDER), n))
+            return {name: self._stages[name].summary() for name in names}
+
+    def format_line(self, snapshot: Optional[Dict[str, Dict]] = None) -> str:
+        """
+        一行摘要: 阶段 p50/p95ms
+        """
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        if not snapshot:
+            return "暂无耗时数据"
+        return " | ".join(f"{name} {s['p50_ms']:.1f}/{s['p95_ms']:.1f}ms" for name, s in snapshot.items())
+
+    def dump_json(self, path: str):
+        data = {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "hist_edges_ms": list(HIST_EDGES_MS),
+            "stages": self.snapshot(),
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+
+# 进程内共用一个
+STAGE_TIMER = StageTimer()
@@ -0,0 +1,28 @@
+"""
+不依赖 Qt 的记牌引擎
+
+    from ddz_tracker import TrackerEngine
+    with TrackerEngine("recordings/game1.mp4", layout_name="JJ斗地主(含控件)") as engine:
+        for state in engine:
+            print(state["remain"])
+
+命令行: python -m ddz_tracker run --source <目录|视频> --layout <布局名>
+"""
+
+from core.card_codes import CARD_NAMES, codes_to_names
+from core.card_detector import CardDetector
+from core.card_tracker import CardTracker
+from core.frame_source import FrameSource, create_frame_source
+from ddz_tracker.engine import STATE_NAMES, MultiTrackerEngine, TrackerEngine
+
+__all__ = [
+    "CARD_NAMES",
+    "CardDetector",
+    "CardTracker",
+    "FrameSource",
+    "MultiTrackerEngine",
+    "STATE_NAMES",
+    "TrackerEngine",
+    "codes_to_names",
+    "create_frame_source",
+]
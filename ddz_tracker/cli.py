@@ -0,0 +1,233 @@
+"""
+命令行入口
+
+    python -m ddz_tracker run --source <图片目录|视频> --layout <布局名>
+    python -m ddz_tracker replay <会话目录>
+    python -m ddz_tracker multi --session <布局名>[:<图片目录|视频>] --session ...
+
+每处理一帧向标准输出写一行 JSON (JSON Lines); 模型加载等日志输出到标准错误,
+所以可以直接重定向: python -m ddz_tracker run ... > game1.jsonl
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+import time
+from typing import List, Optional
+
+import config.settings as settings
+from core.session_archive import start_recording, stop_recording
+from core.stage_timer import STAGE_TIMER
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m ddz_tracker", description="不带界面的斗地主记牌器")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="处理截图目录/录屏视频, 输出 JSON Lines")
+    run.add_argument("--source", default=None,
+                     help="图片目录或视频文件; 不指定时截取游戏窗口")
+    run.add_argument("--layout", default=settings.CURRENT_LAYOUT,
+                     help=f"布局配置名 (默认: {settings.CURRENT_LAYOUT})")
+    run.add_argument("--device", default=settings.DEVICE_CHOICE,
+                     choices=["cpu", "cuda", "onnx", "openvino"],
+                     help=f"推理设备 (默认: {settings.DEVICE_CHOICE})")
+    run.add_argument("--workers", type=int, default=settings.INFERENCE_WORKERS,
+                     help=f"CPU 多进程推理的进程数 (默认: {settings.INFERENCE_WORKERS}), 0/1 表示单进程; 处理录像时多帧同时推理")
+    run.add_argument("--frame-step", type=int, default=1,
+                     help="视频每次前进的帧数 (默认: 1)")
+    run.add_argument("--max-frames", type=int, default=0,
+                     help="最多处理多少帧, 0 表示不限")
+    run.add_argument("--changes-only", action="store_true",
+                     help="只在记牌状态变化时输出")
+    run.add_argument("--no-detections", action="store_true",
+                     help="不输出每帧各区域的识别结果")
+    run.add_argument("--output", default=None,
+                     help="写入文件而不是标准输出")
+    run.add_argument("--timing", action="store_true",
+                     help="结束时在标准错误打印各阶段耗时")
+    run.add_argument("--record", default=None, metavar="DIR",
+                     help="把每一帧的画面和识别结果录制到会话目录")
+
+    multi = sub.add_parser("multi", help="同时记多桌(推理合并成批量推理), 每行 JSON 带 session 字段")
+    multi.add_argument("--session", action="append", default=None, metavar="LAYOUT[:SOURCE]",
+                       help="一桌: 布局名, 可以在冒号后指定图片目录或视频; 可重复。"
+                            "不指定时使用 config.yaml 的 multi_sessions(截取游戏窗口)")
+    multi.add_argument("--device", default=settings.DEVICE_CHOICE,
+                       choices=["cpu", "cuda", "onnx", "openvino"],
+                       help=f"推理设备 (默认: {settings.DEVICE_CHOICE})")
+    multi.add_argument("--workers", type=int, default=settings.INFERENCE_WORKERS,
+                       help=f"CPU 多进程推理的进程数 (默认: {settings.INFERENCE_WORKERS}), 0/1 表示单进程; 各桌同时推理")
+    multi.add_argument("--frame-step", type=int, default=1,
+                       help="视频每次前进的帧数 (默认: 1)")
+    multi.add_argument("--max-frames", type=int, default=0,
+                       help="每桌最多处理多少帧, 0 表示不限")
+    multi.add_argument("--changes-only", action="store_true",
+                       help="只在某桌的记牌状态变化时输出")
+    multi.add_argument("--no-detections", action="store_true",
+                       help="不输出每帧各区域的识别结果")
+    multi.add_argument("--output", default=None,
+                       help="写入文件而不是标准输出")
+    multi.add_argument("--timing", action="store_true",
+                       help="结束时在标准错误打印各阶段耗时")
+
+    replay = sub.add_parser("replay", help="全速回放录制的会话, 输出 JSON Lines")
+    replay.add_argument("session", help="录制的会话目录 (sessions/<时间>)")
+    replay.add_argument("--layout", default=None, help="布局配置名 (默认使用录制时的布局)")
+    replay.add_argument("--redetect", action="store_true",
+                        help="对录制的画面重新识别 (默认直接使用录制的识别结果)")
+    replay.add_argument("--device", default=settings.DEVICE_CHOICE,
+                        choices=["cpu", "cuda", "onnx", "openvino"],
+                        help="--redetect 时的推理设备")
+    replay.add_argument("--workers", type=int, default=settings.INFERENCE_WORKERS,
+                        help=f"CPU 多进程推理的进程数 (默认: {settings.INFERENCE_WORKERS}), 0/1 表示单进程; --redetect 时多帧同时推理")
+    replay.add_argument("--changes-only", action="store_true",
+                        help="只在记牌状态变化时输出")
+    replay.add_argument("--no-detections", action="store_true",
+                        help="不输出每帧各区域的识别结果")
+    replay.add_argument("--output", default=None,
+                        help="写入文件而不是标准输出")
+    replay.add_argument("--timing", action="store_true",
+                        help="结束时在标准错误打印回放速度和各阶段耗时")
+    return parser
+
+
+def _inflight(workers: int) -> int:
+    # 每个推理进程两帧: 一帧在推理, 一帧在排队
+    return workers * 2 if workers > 1 else 1
+
+
+def _emit_states(engine, args, out, max_frames: int = 0):
+    """
+    逐帧输出记牌状态, 返回处理的帧数
+    多桌引擎每轮产出各桌状态的列表, 逐桌输出
+    """
+    last_keys = {}  # 多桌时每桌分别比较
+    for item in engine:
+        for state in (item if isinstance(item, list) else (item,)):
+            if args.changes_only:
+                session = state.get("session")
+                key = (state["state"], state["left"], state["right"], state["self"])
+                if key == last_keys.get(session):
+                    continue
+                last_keys[session] = key
+            if args.no_detections:
+                state.pop("detections", None)
+            out.write(json.dumps(state, ensure_ascii=False) + "\n")
+        out.flush()
+        if max_frames and engine.frame_index >= max_frames:
+            break
+    return engine.frame_index
+
+
+def _run(args) -> int:
+    from ddz_tracker.engine import TrackerEngine
+
+    if args.layout not in settings.WINDOW_LAYOUTS:
+        print(f"未知的布局配置: {args.layout}", file=sys.stderr)
+        print("可用配置: " + ", ".join(settings.WINDOW_LAYOUTS.keys()), file=sys.stderr)
+        return 2
+    settings.DEVICE_CHOICE = args.device
+    settings.INFERENCE_WORKERS = args.workers
+    settings.DEBUG_MODE = False  # 调试打印会混进 JSON 输出
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        # 引擎内部的 print 全部转到标准错误, 标准输出只有 JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            # 处理录像/截图目录时预先读取后面的帧, 让每个推理进程都有活干; 截取窗口时逐帧处理
+            inflight = _inflight(args.workers) if args.source else 1
+            with TrackerEngine(args.source, layout_name=args.layout, frame_step=args.frame_step,
+                               inflight=inflight) as engine:
+                if args.record:
+                    start_recording(engine.detector, args.record)
+                try:
+                    _emit_states(engine, args, out, args.max_frames)
+                finally:
+                    stop_recording(engine.detector)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if args.timing:
+            print(f"[耗时] {STAGE_TIMER.format_line()}", file=sys.stderr)
+    return 0
+
+
+def _multi(args) -> int:
+    from ddz_tracker.engine import MultiTrackerEngine
+
+    if args.session:
+        entries, sources = [], []
+        for spec in args.session:
+            layout, _, source = spec.partition(":")
+            entries.append({"layout": layout, "name": f"{len(entries) + 1}:{layout}"})
+            sources.append(source or None)
+    else:
+        entries, sources = settings.MULTI_SESSIONS, None
+    if not entries:
+        print("没有指定任何一桌: 使用 --session, 或在 config.yaml 中配置 multi_sessions", file=sys.stderr)
+        return 2
+    unknown = [entry.get("layout") for entry in entries if entry.get("layout") not in settings.WINDOW_LAYOUTS]
+    if unknown:
+        print(f"未知的布局配置: {', '.join(map(str, unknown))}", file=sys.stderr)
+        print("可用配置: " + ", ".join(settings.WINDOW_LAYOUTS.keys()), file=sys.stderr)
+        return 2
+    settings.DEVICE_CHOICE = args.device
+    settings.INFERENCE_WORKERS = args.workers
+    settings.DEBUG_MODE = False
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            with MultiTrackerEngine(entries, sources=sources, frame_step=args.frame_step) as engine:
+                _emit_states(engine, args, out, args.max_frames)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if args.timing:
+            print(f"[耗时] {STAGE_TIMER.format_line()}", file=sys.stderr)
+    return 0
+
+
+def _replay(args) -> int:
+    from ddz_tracker.engine import ReplayEngine
+
+    settings.DEVICE_CHOICE = args.device
+    settings.INFERENCE_WORKERS = args.workers
+    settings.DEBUG_MODE = False
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            with ReplayEngine(args.session, layout_name=args.layout, redetect=args.redetect,
+                              inflight=_inflight(args.workers)) as engine:
+                t0 = time.perf_counter()
+                frames = _emit_states(engine, args, out)
+                elapsed = time.perf_counter() - t0
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if args.timing:
+        fps = frames / elapsed if elapsed > 0 else float("inf")
+        print(f"[回放] {frames} 帧, {elapsed:.3f}s, {fps:.0f} 帧/秒", file=sys.stderr)
+        print(f"[耗时] {STAGE_TIMER.format_line()}", file=sys.stderr)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    if args.command == "run":
+        return _run(args)
+    if args.command == "multi":
+        return _multi(args)
+    if args.command == "replay":
+        return _replay(args)
+    return 1
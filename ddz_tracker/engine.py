@@ -0,0 +1,247 @@
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import config.settings as settings
+from core.card_codes import CARD_NAMES, codes_to_names
+from core.card_tracker import CardTracker
+from core.detections import REGION_NAMES
+from core.frame_source import FrameSource, create_frame_source
+from core.multi_session import MultiSessionTracker
+from core.process_pool import OrderedDetections
+from core.session_archive import ArchiveFrameSource, ReplayClock, SessionArchive
+from core.stage_timer import STAGE_TIMER
+
+STATE_NAMES = {
+    settings.WAIT_BEGIN: "wait_begin",
+    settings.HAS_STARTED: "has_started",
+    settings.STARTED_RECORD_CARD: "recording",
+}
+
+
+class TrackerEngine:
+    """
+    不依赖 Qt 的记牌引擎: 帧来源 -> CardDetector -> CardTracker
+
+    每调用一次 step() 处理一帧, 返回当前记牌状态(可直接 json 序列化的 dict);
+    帧来源读完(图片目录/视频播放结束)时返回 None。
+    窗口没找到时不算结束, 返回的状态里 detections 全为空。
+
+    inflight > 1 时预先读取后面的帧, 最多 inflight 帧同时推理(配合多进程推理 inference_workers),
+    结果仍按帧的顺序交给记牌器(见 core/process_pool.py 的 OrderedDetections)。
+    """
+
+    def __init__(self, source: Optional[str] = None, layout_name: Optional[str] = None,
+                 frame_source: Optional[FrameSource] = None, loop: bool = False, frame_step: int = 1,
+                 clock=time.time, tracker: Optional[CardTracker] = None, inflight: int = 1):
+        """
+        source: 图片目录 / 视频文件; None 时截取游戏窗口
+        frame_source: 直接传入帧来源(优先于 source)
+        clock: 记牌器的时钟(自动重置计时用)
+        tracker: 直接使用已经创建好的记牌器(多桌模式), 此时忽略前面的参数
+        inflight: 同时推理的帧数, 1 表示逐帧处理
+        """
+        if tracker is None:
+            if frame_source is None and source is not None:
+                frame_source = create_frame_source(source, loop=loop, frame_step=frame_step)
+            tracker = CardTracker(layout_name, frame_source=frame_source, clock=clock)
+        self.tracker = tracker
+        self.detector = self.tracker.card_detector
+        self.frame_source = self.detector.frame_source
+        self.frame_index = 0
+        self.stream = OrderedDetections(self.detector, inflight) if inflight > 1 else None
+        self._source_done = False
+
+    def step(self) -> Optional[Dict]:
+        detector = self.detector
+        if not detector.model_ready:
+            detector.load_model()
+        if self.stream is not None:
+            return self._step_ordered()
+
+        with STAGE_TIMER.span("capture"):
+            frame = self.frame_source.read()
+        if frame is None and self.frame_source.exhausted:
+            return None
+
+        return self.feed(detector.detect_frame(frame))
+
+    def _step_ordered(self) -> Optional[Dict]:
+        """
+        先把在途的帧补满 inflight, 再取出最早的一帧交给记牌器
+        """
+        stream = self.stream
+        while not stream.full and not self._source_done:
+            tag = self._next_tag()
+            with STAGE_TIMER.span("capture"):
+                frame = self.frame_source.read()
+            if frame is None and self.frame_source.exhausted:
+                self._source_done = True
+                break
+            stream.submit(frame, tag)
+        if not len(stream):
+            return None
+        tag, detections = stream.next()
+        self._apply_tag(tag)
+        return self.feed(detections)
+
+    def _next_tag(self):
+        # 预先读取时随帧保存的信息, 交给记牌器前由 _apply_tag 还原(回放时是录制的时间戳)
+        return None
+
+    def _apply_tag(self, tag):
+        pass
+
+    def feed(self, detections) -> Dict:
+        """
+        直接喂一帧识别结果(五个区域的牌编码)给记牌器, 返回记牌状态
+        """
+        self.tracker.run(detections)
+        state = self.snapshot(detections)
+        self.frame_index += 1
+        return state
+
+    def __iter__(self) -> Iterator[Dict]:
+        while True:
+            state = self.step()
+            if state is None:
+                return
+            yield state
+
+    def snapshot(self, detections=None) -> Dict:
+        """
+        当前记牌状态, 牌都转换成牌名
+        """
+        tracker = self.tracker
+        state = {
+            "frame": self.frame_index,
+            "state": STATE_NAMES.get(tracker.state, tracker.state),
+            "remain": dict(zip(CARD_NAMES, tracker.remain_cards)),
+            "left": [codes_to_names(cards) for cards in tracker.show_left_cards],
+            "right": [codes_to_names(cards) for cards in tracker.show_right_cards],
+            "self": [codes_to_names(cards) for cards in tracker.show_self_cards],
+        }
+        if detections is not None:
+            state["detections"] = {name: codes_to_names(cards) for name, cards in zip(REGION_NAMES, detections)}
+        return state
+
+    def reset(self):
+        self.tracker.reset()
+
+    def close(self):
+        # 同时释放共享模型的引用
+        self.detector.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class MultiTrackerEngine:
+    """
+    多桌记牌引擎 (见 core/multi_session.py): 每调用一次 step() 每桌处理一帧, 所有桌的推理合并成一次批量推理
+
+    step() 返回各桌的记牌状态列表(格式同 TrackerEngine, 多一个 "session" 字段是桌的显示名);
+    所有桌的帧来源都读完时返回 None。迭代时每轮产出这个列表。
+    """
+
+    def __init__(self, entries: Sequence[Dict], sources: Optional[Sequence[Optional[str]]] = None,
+                 loop: bool = False, frame_step: int = 1, clock=time.time):
+        """
+        entries: settings.MULTI_SESSIONS 格式, 每项 {"layout": 布局名, "window_title": ..., "name": ...}
+        sources: 与 entries 一一对应的图片目录 / 视频文件; 为 None 的桌截取游戏窗口
+        """
+        frame_sources = None
+        if sources is not None:
+            frame_sources = [create_frame_source(source, loop=loop, frame_step=frame_step) if source else None
+                             for source in sources]
+        self.tables = MultiSessionTracker.from_config(entries, frame_sources=frame_sources, clock=clock)
+        self.engines = [TrackerEngine(tracker=tracker) for tracker in self.tables.trackers]
+        self.frame_index = 0
+
+    def step(self) -> Optional[List[Dict]]:
+        tables = self.tables
+        frames = tables.read_frames()
+        if all(frame is None and engine.frame_source.exhausted for frame, engine in zip(frames, self.engines)):
+            return None
+
+        tables.run(frames)
+        states = []
+        for name, engine, detections in zip(tables.names, self.engines, tables.last_detections):
+            # 记牌器已经在 tables.run 里跑过了, 这里只取状态
+            state = engine.snapshot(detections)
+            engine.frame_index += 1
+            state["session"] = name
+            states.append(state)
+        self.frame_index += 1
+        return states
+
+    def __iter__(self) -> Iterator[List[Dict]]:
+        while True:
+            states = self.step()
+            if states is None:
+                return
+            yield states
+
+    def reset(self):
+        self.tables.reset()
+
+    def close(self):
+        self.tables.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ReplayEngine(TrackerEngine):
+    """
+    回放录制的会话 (见 core/session_archive.py)
+
+    - 记牌器的时钟按录制的时间戳走, 自动重置和录制时完全一致, 可以全速回放
+    - 默认直接使用录制的识别结果(不需要模型); redetect=True 时对录制的画面重新识别
+    - apply_meta=True 时使用录制时的 frame_length / reset_time (会修改 config.settings 中的值)
+    """
+
+    def __init__(self, session_dir: str, layout_name: Optional[str] = None, redetect: bool = False,
+                 apply_meta: bool = True, inflight: int = 1):
+        self.archive = SessionArchive(session_dir)
+        meta = self.archive.meta
+        if apply_meta:
+            settings.FRAME_LENGTH = meta.get("frame_length", settings.FRAME_LENGTH)
+            settings.RESET_TIME = meta.get("reset_time", settings.RESET_TIME)
+        self.redetect = redetect
+        self.clock = ReplayClock(self.archive.entries[0]["t"] if self.archive.entries else 0.0)
+        super().__init__(layout_name=layout_name or meta.get("layout_name"),
+                         frame_source=ArchiveFrameSource(self.archive), clock=self.clock,
+                         inflight=inflight if redetect else 1)
+
+    def step(self) -> Optional[Dict]:
+        if self.stream is not None:
+            # 重新识别 + 多帧同时推理: 时间戳随帧保存, 见 _next_tag / _apply_tag
+            return super().step()
+
+        source = self.frame_source
+        if source.index >= len(self.archive):
+            return None
+        entry = self.archive.entries[source.index]
+        self.clock.t = entry["t"]
+
+        if self.redetect:
+            if not self.detector.model_ready:
+                self.detector.load_model()
+            detections = self.detector.detect_frame(source.read())
+        else:
+            source.index += 1
+            detections = self.archive.detections(entry)
+        return self.feed(detections)
+
+    def _next_tag(self):
+        source = self.frame_source
+        return self.archive.entries[source.index]["t"] if source.index < len(self.archive) else None
+
+    def _apply_tag(self, tag):
+        self.clock.t = tag
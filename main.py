@@ -3,6 +3,8 @@ from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QFont
 from PySide6.QtCore import qInstallMessageHandler
 from ui.main_window import CardUI
+from ui.multi_window import MultiCardUI
+import config.settings as settings
 from ui.styles import load_qss
 from config.settings import BASE_DIR
 
@@ -45,7 +47,8 @@ def main():
     # 读取并应用 QSS（如果存在）
     load_qss(app, dir_path)
 
-    w = CardUI()
+    # config.yaml 里配置了 multi_sessions 时一个窗口同时记多桌
+    w = MultiCardUI() if settings.MULTI_SESSIONS else CardUI()
     w.show()
     sys.exit(app.exec())
 
@@ -0,0 +1,30 @@
+import pytest
+
+import config.settings as settings
+
+# 测试用布局: 手牌区占画面上方大半, 其余四个区域排在下面一行, 互不重叠
+TEST_LAYOUT_NAME = "测试布局"
+TEST_LAYOUT = {
+    "window_title": "测试窗口",
+    "layout": {
+        "player_hand": (0.0, 0.0, 1.0, 0.8),
+        "player_played": (0.0, 0.8, 0.2, 0.9),
+        "opponent_left": (0.2, 0.8, 0.4, 0.9),
+        "opponent_right": (0.4, 0.8, 0.6, 0.9),
+        "landlord_cards": (0.6, 0.8, 0.8, 0.9),
+    },
+}
+
+
+@pytest.fixture
+def test_layout(monkeypatch):
+    """
+    注册测试布局, 并把影响识别流程的配置固定下来(只改内存中的值, 不写 config.yaml)
+    """
+    layouts = dict(settings.WINDOW_LAYOUTS)
+    layouts[TEST_LAYOUT_NAME] = TEST_LAYOUT
+    monkeypatch.setattr(settings, "WINDOW_LAYOUTS", layouts)
+    monkeypatch.setattr(settings, "ROI_MODE", False)
+    monkeypatch.setattr(settings, "FRAME_DIFF_THRESHOLD", 1.0)
+    monkeypatch.setattr(settings, "REGION_CACHE_SIZE", 64)
+    return TEST_LAYOUT_NAME
@@ -0,0 +1,70 @@
+"""
+测试用的推理后端: 不需要模型权重, 走 InferenceBackend 真实的 letterbox / 后处理
+
+画面中某个颜色通道接近 255 的像素当作一张牌: 通道 c(B/G/R) 对应类别 c,
+每个类别输出一个框(该通道所有高亮像素的外接矩形)
+"""
+
+import random
+import threading
+import time
+
+import numpy as np
+
+from core.inference_backend import InferenceBackend
+
+NAMES = {0: "three", 1: "four", 2: "five", 3: "JOKER"}
+
+
+class StubBackend(InferenceBackend):
+
+    def __init__(self, device: str = "cpu", delay: float = 0.0):
+        super().__init__()
+        self.delay = delay  # 每次推理随机等待 0~delay 秒, 让多进程的结果乱序返回
+        self.names = dict(NAMES)
+        self.device = device
+        self.base_imgsz = 640
+        self.forward_calls = 0
+        self.batch_sizes = []
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def _forward(self, buffer):
+        blob = buffer.blob
+        if self.delay:
+            time.sleep(random.random() * self.delay)
+        with self._lock:
+            self.forward_calls += 1
+            self.batch_sizes.append(blob.shape[0])
+        out = np.zeros((blob.shape[0], 4 + len(self.names), len(self.names)), dtype=np.float32)
+        for i in range(blob.shape[0]):
+            for c in range(3):
+                ys, xs = np.nonzero(blob[i, 2 - c] > 0.9)  # blob 是 RGB, 类别按 BGR 通道编号
+                if len(xs):
+                    x1, x2, y1, y2 = xs.min(), xs.max() + 1, ys.min(), ys.max() + 1
+                    out[i, :4, c] = [(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1]
+                    out[i, 4 + c, c] = 0.95
+        return out
+
+    def to_device(self, device_choice: str) -> bool:
+        self.device = device_choice
+        return True
+
+    def close(self):
+        self.closed = True
+
+
+def load_stub(device: str = "cpu", delay: float = 0.0, **_):
+    """
+    模块级的加载函数(可以 pickle), 给多进程后端用
+    """
+    return StubBackend(device, delay)
+
+
+def blank_frame(h: int = 720, w: int = 1280) -> np.ndarray:
+    return np.full((h, w, 3), 50, dtype=np.uint8)
+
+
+def draw_card(frame: np.ndarray, cls: int, x1: int, y1: int, x2: int, y2: int) -> np.ndarray:
+    frame[y1:y2, x1:x2, cls] = 255
+    return frame
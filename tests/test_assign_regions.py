@@ -0,0 +1,108 @@
+"""
+assign_regions 与原来 parse_result 里逐个框、逐个区域判断的循环(reference_assign)结果必须完全一致
+"""
+
+import numpy as np
+import pytest
+
+from core.detections import REGION_NAMES, assign_regions, layout_to_pixel_regions
+
+
+def reference_regions(layout, img_w, img_h):
+    """
+    原来 parse_result 里的 norm_to_pixel
+    """
+    def norm_to_pixel(box):
+        x1, y1, x2, y2 = box
+        return (
+            int(x1 * img_w),
+            int(y1 * img_h),
+            int(x2 * img_w),
+            int(y2 * img_h)
+        )
+    return {name: norm_to_pixel(layout[name]) for name in REGION_NAMES}
+
+
+def reference_assign(boxes, regions):
+    """
+    原来 parse_result 里的循环, 只把结果从各区域的列表改成每个框的区域下标
+    """
+    def in_region(cx, cy, region):
+        rx1, ry1, rx2, ry2 = region
+        return rx1 <= cx <= rx2 and ry1 <= cy <= ry2
+
+    result = []
+    for box in boxes:
+        x1, y1, x2, y2 = box
+        cx = (x1 + x2) / 2
+        cy = (y1 + y2) / 2
+        idx = -1
+        for i, name in enumerate(REGION_NAMES):
+            if in_region(cx, cy, regions[name]):
+                idx = i
+                break
+        result.append(idx)
+    return result
+
+
+def random_layout(rng):
+    """
+    随机布局: 区域之间经常重叠(框中心落在重叠处时由区域顺序决定), 有时两个区域完全相同
+    """
+    layout = {}
+    for name in REGION_NAMES:
+        x1, x2 = np.sort(rng.uniform(0, 1, size=2))
+        y1, y2 = np.sort(rng.uniform(0, 1, size=2))
+        layout[name] = (float(x1), float(y1), float(x2), float(y2))
+    if rng.random() < 0.2:
+        a, b = rng.choice(len(REGION_NAMES), size=2, replace=False)
+        layout[REGION_NAMES[b]] = layout[REGION_NAMES[a]]
+    return layout
+
+
+def random_boxes(rng, regions, dtype):
+    """
+    随机框, 其中一部分框的中心正好落在区域的边上或角上
+    """
+    n = int(rng.integers(0, 40))
+    cx = rng.uniform(-20, 1300, size=n)
+    cy = rng.uniform(-20, 740, size=n)
+    rects = np.array([regions[name] for name in REGION_NAMES], dtype=np.float64)
+    for k in range(n):
+        if rng.random() < 0.5:
+            rx1, ry1, rx2, ry2 = rects[rng.integers(0, len(rects))]
+            cx[k] = rng.choice([rx1, rx2, rx1 - 0.5, rx2 + 0.5, (rx1 + rx2) / 2])
+            cy[k] = rng.choice([ry1, ry2, ry1 - 0.5, ry2 + 0.5, (ry1 + ry2) / 2])
+    half_w = rng.choice([0.0, 0.5, 10.0, 20.0], size=n)
+    half_h = rng.choice([0.0, 0.5, 15.0, 30.0], size=n)
+    boxes = np.stack([cx - half_w, cy - half_h, cx + half_w, cy + half_h], axis=1)
+    return boxes.astype(dtype)
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_matches_reference_loop(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(20):
+        layout = random_layout(rng)
+        img_w, img_h = int(rng.integers(100, 1921)), int(rng.integers(100, 1081))
+        regions = layout_to_pixel_regions(layout, img_w, img_h)
+        assert regions == reference_regions(layout, img_w, img_h)
+        dtype = np.float32 if rng.random() < 0.5 else np.float64
+        boxes = random_boxes(rng, regions, dtype)
+        assert assign_regions(boxes, regions).tolist() == reference_assign(boxes, regions)
+
+
+def test_first_matching_region_wins():
+    # 五个区域完全相同: 都归到第一个区域; 边上的框也算在区域内
+    regions = {name: (100, 100, 200, 200) for name in REGION_NAMES}
+    boxes = np.array([
+        [90, 90, 110, 110],     # 中心 (100, 100): 左上角
+        [190, 190, 210, 210],   # 中心 (200, 200): 右下角
+        [200, 150, 202, 152],   # 中心 (201, 151): 区域外
+    ], dtype=np.float32)
+    assert assign_regions(boxes, regions).tolist() == [0, 0, -1] == reference_assign(boxes, regions)
+
+
+def test_empty():
+    regions = {name: (0, 0, 10, 10) for name in REGION_NAMES}
+    assert assign_regions(np.zeros((0, 4)), regions).tolist() == []
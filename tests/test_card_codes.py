@@ -0,0 +1,31 @@
+import numpy as np
+
+from core.card_codes import CARD_CODE, UNKNOWN_CODE, build_class_to_code
+from core.card_detector import CardDetector
+from core.frame_source import RingBufferSource
+
+from stub_backend import StubBackend, blank_frame, draw_card
+
+
+def test_lookup_table_maps_yolo_names_to_codes():
+    lut = build_class_to_code({0: "three", 1: "JOKER", 2: "A"})
+    assert lut.tolist() == [CARD_CODE["3"], CARD_CODE["JOK"], CARD_CODE["A"]]
+
+
+def test_unmapped_classes_get_sentinel_instead_of_failing():
+    lut = build_class_to_code({0: "three", 1: "card_back", 3: "four"})
+    assert lut.tolist() == [CARD_CODE["3"], UNKNOWN_CODE, UNKNOWN_CODE, CARD_CODE["4"]]
+
+
+def test_detections_of_unmapped_classes_are_ignored(test_layout):
+    backend = StubBackend()
+    backend.names[1] = "card_back"  # 模型多出来的类别
+    detector = CardDetector(test_layout, frame_source=RingBufferSource())
+    detector.use_backend(backend)
+
+    frame = blank_frame()
+    draw_card(frame, 0, 100, 100, 160, 180)   # three
+    draw_card(frame, 1, 200, 100, 260, 180)   # card_back
+    hand = detector.detect_frame(frame)[0]
+    assert hand == (CARD_CODE["3"],)
+    assert np.all(np.asarray(hand) >= 0)
@@ -0,0 +1,125 @@
+"""
+CardDetector: 帧差门控(只有部分区域变化时结果必须和整帧重新识别一致) / 运行中切换布局
+"""
+
+import threading
+
+import config.settings as settings
+from core.card_codes import CARD_CODE
+from core.card_detector import CardDetector
+from core.frame_source import RingBufferSource
+
+from stub_backend import StubBackend, blank_frame, draw_card
+
+
+def make_detector(layout_name):
+    detector = CardDetector(layout_name, frame_source=RingBufferSource())
+    backend = StubBackend()
+    detector.use_backend(backend)
+    return detector, backend
+
+
+def first_frame():
+    frame = blank_frame()
+    draw_card(frame, 0, 100, 100, 160, 180)   # 手牌区: three
+    draw_card(frame, 2, 300, 590, 340, 640)   # 上家: five
+    draw_card(frame, 1, 800, 590, 840, 640)   # 地主牌: four
+    return frame
+
+
+def test_unchanged_frame_skips_inference(test_layout):
+    detector, backend = make_detector(test_layout)
+    frame = first_frame()
+    first = detector.detect_frame(frame)
+    calls = backend.forward_calls
+    assert detector.detect_frame(frame.copy()) == first
+    assert backend.forward_calls == calls
+
+
+def test_partially_dirty_frame_matches_full_inference(test_layout, monkeypatch):
+    # 测试后端把同一类别的所有像素合成一个框, 所以整帧推理和只推理某个区域的裁剪图结果不同
+    # (相当于真实模型的框受周围画面影响): 门控后的结果必须仍然与整帧推理一致
+    def frame_with(landlord_cls):
+        frame = blank_frame()
+        draw_card(frame, 0, 100, 100, 160, 180)   # 手牌区: three
+        draw_card(frame, 1, 200, 100, 260, 180)   # 手牌区: four
+        draw_card(frame, landlord_cls, 800, 590, 840, 640)
+        return frame
+
+    gated, gated_backend = make_detector(test_layout)
+    gated.detect_frame(frame_with(2))
+
+    frame = frame_with(1)  # 只有地主牌区域变化
+    assert gated.change_detector.dirty_regions(frame) == ["landlord_cards"]
+    calls = gated_backend.forward_calls
+    result = gated.detect_frame(frame)
+    assert gated_backend.forward_calls == calls + 1
+
+    monkeypatch.setattr(settings, "FRAME_DIFF_THRESHOLD", 0.0)
+    monkeypatch.setattr(settings, "REGION_CACHE_SIZE", 0)
+    full, _ = make_detector(test_layout)
+    assert full.change_detector is None and full.region_cache is None
+    assert result == full.detect_frame(frame)
+
+
+def test_roi_mode_only_infers_dirty_regions(test_layout, monkeypatch):
+    monkeypatch.setattr(settings, "ROI_MODE", True)
+    detector, backend = make_detector(test_layout)
+    first = detector.detect_frame(first_frame())
+
+    frame = first_frame()
+    frame[590:640, 300:340] = 50  # 上家的牌没了
+    job = detector.begin_frame(frame)
+    assert job.dirty == ["opponent_left"]
+    assert job.plan is not None
+    result = detector.finish_frame(job, backend.predict(job.infer_img, 0.6, 0.45, imgsz=job.imgsz))
+    assert result[2] == ()
+    assert result[0] == first[0] and result[4] == first[4]
+
+
+def swapped_layout(monkeypatch, layout_name):
+    """
+    第二个布局: 手牌区和地主牌区对调, 同一帧在两个布局下的结果不同
+    """
+    base = settings.WINDOW_LAYOUTS[layout_name]["layout"]
+    layout = dict(base, player_hand=base["landlord_cards"], landlord_cards=base["player_hand"])
+    layouts = dict(settings.WINDOW_LAYOUTS)
+    name = layout_name + "(对调)"
+    layouts[name] = {"window_title": settings.WINDOW_LAYOUTS[layout_name]["window_title"], "layout": layout}
+    monkeypatch.setattr(settings, "WINDOW_LAYOUTS", layouts)
+    return name
+
+
+def test_layout_switch_from_another_thread_applies_on_next_frame(test_layout, monkeypatch):
+    other = swapped_layout(monkeypatch, test_layout)
+    detector, _ = make_detector(test_layout)
+    frame = first_frame()
+    before = detector.detect_frame(frame)
+    assert before[0] == (CARD_CODE["3"],) and before[4] == (CARD_CODE["4"],)
+
+    t = threading.Thread(target=detector.set_layout, args=(other,))
+    t.start()
+    t.join()
+    assert detector.layout_name == test_layout  # 请求只记下, 不在调用线程里切换
+
+    after = detector.detect_frame(frame)
+    assert detector.layout_name == other
+    assert after[0] == (CARD_CODE["4"],) and after[4] == (CARD_CODE["3"],)
+
+
+def test_layout_switch_between_begin_and_finish_discards_stale_frame(test_layout, monkeypatch):
+    other = swapped_layout(monkeypatch, test_layout)
+    detector, backend = make_detector(test_layout)
+    frame = first_frame()
+
+    # 多帧在途: 第一帧按旧布局开始, 切换后第二帧按新布局开始, 然后按顺序结束
+    job1 = detector.begin_frame(frame, pipelined=True)
+    dets1 = backend.predict(job1.infer_img, 0.6, 0.45, imgsz=job1.imgsz)
+    detector.set_layout(other)
+    job2 = detector.begin_frame(frame, pipelined=True)
+    dets2 = backend.predict(job2.infer_img, 0.6, 0.45, imgsz=job2.imgsz)
+
+    # 旧布局的帧不能按新布局的区域解析
+    assert detector.finish_frame(job1, dets1) == ((), (), (), (), ())
+    result = detector.finish_frame(job2, dets2)
+    assert result[0] == (CARD_CODE["4"],) and result[4] == (CARD_CODE["3"],)
@@ -0,0 +1,71 @@
+"""
+RegionChangeDetector: 区域内只变了一小块时也要判为脏区域
+"""
+
+import numpy as np
+
+from core.detections import REGION_NAMES
+from core.frame_diff import RegionChangeDetector
+
+# 一个区域占满大半个画面, 其余区域很小
+LAYOUT = {
+    "player_hand": (0.0, 0.0, 1.0, 0.8),
+    "player_played": (0.0, 0.8, 0.2, 0.9),
+    "opponent_left": (0.2, 0.8, 0.4, 0.9),
+    "opponent_right": (0.4, 0.8, 0.6, 0.9),
+    "landlord_cards": (0.6, 0.8, 0.8, 0.9),
+}
+
+
+def make_frame(h=720, w=1280):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8)
+
+
+def first_pass(detector, frame):
+    assert detector.dirty_regions(frame) == list(REGION_NAMES)
+    detector.commit()
+
+
+def test_unchanged_frame_has_no_dirty_regions():
+    detector = RegionChangeDetector(LAYOUT, threshold=1.0)
+    frame = make_frame()
+    first_pass(detector, frame)
+    assert detector.dirty_regions(frame.copy()) == []
+
+
+def test_small_patch_in_large_region_is_dirty():
+    detector = RegionChangeDetector(LAYOUT, threshold=1.0)
+    frame = make_frame()
+    first_pass(detector, frame)
+
+    # 约 40x60 像素(一张牌的大小)变成纯白: 整个区域的平均差远小于 1, 小块的平均差很大
+    changed = frame.copy()
+    changed[300:360, 600:640] = 255
+    thumb_diff = np.abs(changed[0:577:4, ::4].astype(np.int16) - frame[0:577:4, ::4]).mean()
+    assert thumb_diff < 1.0
+    assert detector.dirty_regions(changed) == ["player_hand"]
+
+
+def test_patch_on_image_edge_is_dirty():
+    detector = RegionChangeDetector(LAYOUT, threshold=1.0)
+    frame = make_frame(h=700, w=1270)  # 缩略图尺寸不是小块的整数倍
+    first_pass(detector, frame)
+
+    changed = frame.copy()
+    changed[540:560, 1250:1270] ^= 0xFF
+    assert detector.dirty_regions(changed) == ["player_hand"]
+
+
+def test_uncommitted_changes_stay_dirty():
+    detector = RegionChangeDetector(LAYOUT, threshold=1.0)
+    frame = make_frame()
+    first_pass(detector, frame)
+
+    changed = frame.copy()
+    changed[100:140, 100:160] = 0
+    assert detector.dirty_regions(changed) == ["player_hand"]
+    # 推理失败没有 commit: 下一帧仍然是脏的
+    assert detector.dirty_regions(changed) == ["player_hand"]
+    detector.commit()
+    assert detector.dirty_regions(changed) == []
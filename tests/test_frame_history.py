@@ -0,0 +1,54 @@
+from core.frame_history import FrameHistory
+
+
+def test_stable_after_frame_length_identical_frames():
+    history = FrameHistory()
+    for _ in range(2):
+        history.push((0, 1, 2))
+        assert not history.is_stable(3)
+    history.push((0, 1, 2))
+    assert history.is_stable(3)
+    assert history.stable_count == 3
+
+
+def test_change_restarts_count():
+    history = FrameHistory()
+    for cards in [(0, 1), (0, 1), (0, 2), (0, 2)]:
+        history.push(cards)
+    assert history.stable_count == 2
+    assert not history.is_stable(3)
+    history.push((0, 2))
+    assert history.is_stable(3)
+
+
+def test_equal_contents_in_new_tuple_count_as_same():
+    history = FrameHistory()
+    history.push(tuple([5, 6]))
+    history.push(tuple([5, 6]))
+    assert history.stable_count == 2
+
+
+def test_empty_frames_are_never_stable():
+    history = FrameHistory()
+    for _ in range(5):
+        history.push(())
+    assert history.stable_count == 5
+    assert not history.is_stable(3)
+
+
+def test_frame_length_can_change_without_rebuilding():
+    history = FrameHistory()
+    for _ in range(4):
+        history.push((7,))
+    assert history.is_stable(4)
+    assert not history.is_stable(5)
+
+
+def test_reset():
+    history = FrameHistory()
+    for _ in range(3):
+        history.push((1,))
+    history.reset()
+    assert history.stable_count == 0 and history.last == ()
+    history.push((1,))
+    assert history.stable_count == 1
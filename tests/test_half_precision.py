@@ -0,0 +1,54 @@
+"""
+半精度推理: GPU 上 fp16 与 fp32 识别出的牌必须逐帧一致
+
+需要 torch / ultralytics、CUDA 和 yolo/weights/best.pt, 缺少任何一个时跳过。
+截图默认取 images/ 目录, 可以用环境变量 DDZ_PRECISION_FRAMES 指定其他目录。
+"""
+
+import os
+
+import pytest
+
+import config.settings as settings
+from benchmarks.fixtures import load_recorded_frames
+from core.card_codes import codes_to_names
+from core.card_detector import CardDetector
+from core.detections import REGION_NAMES
+from core.frame_source import RingBufferSource
+
+FRAMES_DIR = os.environ.get("DDZ_PRECISION_FRAMES", os.path.join(settings.BASE_DIR, "images"))
+
+
+def _detect_all(backend, frames):
+    detector = CardDetector(settings.CURRENT_LAYOUT, frame_source=RingBufferSource(frames))
+    detector.use_backend(backend)
+    return [detector.detect_frame(frame) for frame in frames]
+
+
+def test_fp16_matches_fp32(monkeypatch):
+    if not os.path.exists(settings.YOLO_MODEL_PATH):
+        pytest.skip(f"没有模型权重: {settings.YOLO_MODEL_PATH}")
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("ultralytics")
+    if not torch.cuda.is_available():
+        pytest.skip("fp16 推理需要 CUDA")
+    frames = load_recorded_frames(FRAMES_DIR) if os.path.isdir(FRAMES_DIR) else []
+    if not frames:
+        pytest.skip(f"没有截图: {FRAMES_DIR}")
+
+    from core.inference_backend import UltralyticsBackend
+
+    # 逐帧比较整帧识别的结果, 不让帧差门控 / 结果缓存复用上一帧
+    monkeypatch.setattr(settings, "FRAME_DIFF_THRESHOLD", 0.0)
+    monkeypatch.setattr(settings, "REGION_CACHE_SIZE", 0)
+    imgsz = settings.INFER_IMGSZ
+    fp32 = UltralyticsBackend(settings.YOLO_MODEL_PATH, "cuda", half=False, imgsz=imgsz)
+    fp16 = UltralyticsBackend(settings.YOLO_MODEL_PATH, "cuda", half=True, imgsz=imgsz)
+    assert fp16.half and not fp32.half
+
+    mismatches = []
+    for i, (r32, r16) in enumerate(zip(_detect_all(fp32, frames), _detect_all(fp16, frames))):
+        for name, cards32, cards16 in zip(REGION_NAMES, r32, r16):
+            if cards32 != cards16:
+                mismatches.append(f"帧 {i} {name}: fp32={codes_to_names(cards32)} fp16={codes_to_names(cards16)}")
+    assert not mismatches, "\n".join(mismatches)
@@ -0,0 +1,163 @@
+"""
+ModelRegistry: 引用计数、空闲淘汰、原地换设备; load_backend 换成测试后端, 不加载真实模型
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import core.model_registry as model_registry
+from core.model_registry import ModelRegistry
+
+from stub_backend import StubBackend
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """
+    记录每次真正的加载: [(device_choice, backend), ...]
+    """
+    calls = []
+
+    def fake_load_backend(weight_path, onnx_path, device_choice, **kwargs):
+        if device_choice == "broken":
+            raise RuntimeError("加载失败")
+        backend = StubBackend(device_choice)
+        calls.append((device_choice, backend))
+        return backend
+
+    monkeypatch.setattr(model_registry, "load_backend", fake_load_backend)
+    return calls
+
+
+def acquire(registry, device="cpu", **kwargs):
+    return registry.acquire("best.pt", "best.onnx", device, **kwargs)
+
+
+def test_same_key_loads_once_and_counts_refs(loads):
+    registry = ModelRegistry()
+    a = acquire(registry)
+    b = acquire(registry)
+    assert len(loads) == 1
+    assert a.backend is b.backend
+    assert list(registry.stats()["active"].values()) == [2]
+
+    a.release()
+    a.release()  # 重复 release 不会多减引用
+    assert list(registry.stats()["active"].values()) == [1]
+    b.release()
+    assert registry.stats()["active"] == {}
+    assert len(registry.stats()["idle"]) == 1
+    assert not loads[0][1].closed
+
+
+def test_reacquire_from_idle_does_not_reload(loads):
+    registry = ModelRegistry()
+    acquire(registry).release()
+    handle = acquire(registry)
+    assert len(loads) == 1
+    assert handle.backend is loads[0][1]
+    assert registry.stats()["idle"] == []
+
+
+def test_different_options_are_different_models(loads):
+    registry = ModelRegistry()
+    a = acquire(registry, half=False)
+    b = acquire(registry, half=True)
+    assert len(loads) == 2 and a.backend is not b.backend
+
+
+def test_oldest_idle_model_is_evicted_and_closed(loads):
+    registry = ModelRegistry(max_idle=1)
+    acquire(registry, "cpu").release()
+    acquire(registry, "cuda").release()
+    (_, cpu_backend), (_, cuda_backend) = loads
+    assert cpu_backend.closed and not cuda_backend.closed
+    assert [key[1] for key in registry.stats()["idle"]] == ["cuda"]
+
+    registry.clear_idle()
+    assert cuda_backend.closed
+    assert registry.stats()["idle"] == []
+
+
+def test_no_idle_list_closes_on_last_release(loads):
+    registry = ModelRegistry(max_idle=0)
+    a = acquire(registry)
+    b = acquire(registry)
+    a.release()
+    assert not loads[0][1].closed
+    b.release()
+    assert loads[0][1].closed
+
+
+def test_failed_load_holds_no_reference(loads):
+    registry = ModelRegistry()
+    with pytest.raises(RuntimeError):
+        acquire(registry, "broken")
+    assert registry.stats() == {"active": {}, "idle": []}
+
+
+def test_concurrent_acquire_loads_once(monkeypatch):
+    started = []
+
+    def slow_load_backend(weight_path, onnx_path, device_choice, **kwargs):
+        started.append(device_choice)
+        time.sleep(0.1)
+        return StubBackend(device_choice)
+
+    monkeypatch.setattr(model_registry, "load_backend", slow_load_backend)
+    registry = ModelRegistry()
+    handles = []
+    threads = [threading.Thread(target=lambda: handles.append(acquire(registry))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(started) == 1
+    assert len({id(h.backend) for h in handles}) == 1
+    assert list(registry.stats()["active"].values()) == [4]
+
+
+def test_move_rekeys_sole_user(loads):
+    registry = ModelRegistry()
+    handle = acquire(registry, "cpu")
+    assert handle.to_device("cuda")
+    assert handle.device == "cuda"
+    assert [key[1] for key in registry.stats()["active"]] == ["cuda"]
+
+    # 搬过去以后按新设备获取到的是同一份
+    other = acquire(registry, "cuda")
+    assert other.backend is handle.backend and len(loads) == 1
+
+
+def test_move_refused_when_shared_or_target_exists(loads):
+    registry = ModelRegistry()
+    a = acquire(registry, "cpu")
+    b = acquire(registry, "cpu")
+    assert not a.to_device("cuda")  # 别人也在用
+    b.release()
+
+    acquire(registry, "cuda").release()  # 目标设备上已经有一份(空闲)
+    assert not a.to_device("cuda")
+    assert a.device == "cpu"
+
+
+def test_move_keeps_key_when_backend_cannot_switch(loads, monkeypatch):
+    registry = ModelRegistry()
+    handle = acquire(registry, "cpu")
+    # 例如选了 cuda 但 CUDA 不可用: 后端仍在 CPU 上, 注册表里的键不能变成 cuda
+    monkeypatch.setattr(handle.backend, "to_device", lambda device_choice: False)
+    assert not handle.to_device("cuda")
+    assert [key[1] for key in registry.stats()["active"]] == ["cpu"]
+
+
+def test_handle_predicts_through_backend(loads):
+    registry = ModelRegistry()
+    handle = acquire(registry)
+    img = np.full((90, 160, 3), 50, dtype=np.uint8)
+    img[10:40, 20:60, 0] = 255
+    dets = handle.predict(img, 0.5, 0.45)
+    assert dets.cls.tolist() == [0]
+    assert loads[0][1].forward_calls == 1
@@ -0,0 +1,68 @@
+"""
+detect_batch: 共用一个后端的桌合成一次批量推理, 结果交回各自的 CardDetector
+"""
+
+from core.card_codes import CARD_CODE
+from core.card_detector import CardDetector
+from core.frame_source import RingBufferSource
+from core.multi_session import detect_batch
+
+from stub_backend import StubBackend, blank_frame, draw_card
+
+
+def table_frame(cls, x):
+    frame = blank_frame()
+    draw_card(frame, cls, x, 100, x + 60, 180)  # 手牌区一张牌
+    return frame
+
+
+def make_detector(layout_name, backend):
+    detector = CardDetector(layout_name, frame_source=RingBufferSource())
+    detector.use_backend(backend)
+    return detector
+
+
+def test_groups_by_backend_and_routes_results(test_layout):
+    shared, own = StubBackend(), StubBackend()
+    detectors = [make_detector(test_layout, shared), make_detector(test_layout, own),
+                 make_detector(test_layout, shared)]
+    frames = [table_frame(0, 100), table_frame(1, 300), table_frame(2, 500)]
+
+    results = detect_batch(detectors, frames)
+
+    assert [r[0] for r in results] == [(CARD_CODE["3"],), (CARD_CODE["4"],), (CARD_CODE["5"],)]
+    assert shared.batch_sizes == [2]  # 第 0、2 桌一次前向
+    assert own.batch_sizes == [1]
+
+
+def test_tables_without_changes_skip_inference(test_layout):
+    backend = StubBackend()
+    detectors = [make_detector(test_layout, backend) for _ in range(3)]
+    frames = [table_frame(0, 100), table_frame(1, 300), table_frame(2, 500)]
+    first = detect_batch(detectors, frames)
+
+    # 只有第 1 桌画面变了: 只推理这一桌, 其余桌沿用上一轮的结果
+    frames[1] = table_frame(0, 700)
+    second = detect_batch(detectors, frames)
+    assert backend.batch_sizes == [3, 1]
+    assert second[0] == first[0] and second[2] == first[2]
+    assert second[1][0] == (CARD_CODE["3"],)
+
+
+def test_matches_per_table_detection(test_layout):
+    frames = [table_frame(0, 100), table_frame(1, 300), None, table_frame(2, 500)]  # 第 2 桌没找到窗口
+    backend = StubBackend()
+    batched = detect_batch([make_detector(test_layout, backend) for _ in frames], frames)
+    single = [make_detector(test_layout, StubBackend()).detect_frame(frame) for frame in frames]
+    assert batched == single
+    assert batched[2] == ((), (), (), (), ())
+    assert backend.batch_sizes == [3]
+
+
+def test_different_thresholds_are_not_merged(test_layout):
+    backend = StubBackend()
+    detectors = [make_detector(test_layout, backend) for _ in range(2)]
+    detectors[1].yolo_conf = 0.99  # 测试后端的置信度是 0.95: 这一桌什么都识别不到
+    results = detect_batch(detectors, [table_frame(0, 100), table_frame(0, 100)])
+    assert backend.batch_sizes == [1, 1]
+    assert results[0][0] == (CARD_CODE["3"],) and results[1][0] == ()
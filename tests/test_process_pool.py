@@ -0,0 +1,88 @@
+"""
+ProcessPoolBackend / OrderedDetections: 2 个工作进程跑测试后端
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+import config.settings as settings
+from core.card_detector import CardDetector
+from core.frame_source import RingBufferSource
+from core.process_pool import OrderedDetections, ProcessPoolBackend
+
+from stub_backend import StubBackend, blank_frame, draw_card, load_stub
+
+
+def make_frames(n):
+    frames = []
+    for k in range(n):
+        frame = blank_frame()
+        draw_card(frame, k % 3, 100 + 20 * k, 100, 160 + 20 * k, 180)              # 手牌区, 每帧位置不同
+        draw_card(frame, (k + 1) % 3, 800, 590, 820 + 10 * (k % 3), 640)         # 地主牌
+        frames.append(frame)
+    return frames
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ProcessPoolBackend(load_stub, {"delay": 0.03}, workers=2)
+    yield pool
+    pool.close()
+
+
+def test_submit_results_match_single_process(pool):
+    reference = StubBackend()
+    frames = make_frames(12)
+    futures = [pool.submit(frame, 0.5, 0.45) for frame in frames]
+    for frame, future in zip(frames, futures):
+        expected = reference.predict(frame, 0.5, 0.45)
+        got = future.result(timeout=30)
+        assert np.allclose(got.boxes, expected.boxes)
+        assert got.cls.tolist() == expected.cls.tolist()
+        assert got.orig_shape == expected.orig_shape
+
+
+def test_ordered_detections_returns_submission_order(pool, test_layout, monkeypatch):
+    # 每帧都推理, 结果只取决于这一帧
+    monkeypatch.setattr(settings, "FRAME_DIFF_THRESHOLD", 0.0)
+    monkeypatch.setattr(settings, "REGION_CACHE_SIZE", 0)
+    frames = make_frames(16)
+
+    sequential = CardDetector(test_layout, frame_source=RingBufferSource())
+    sequential.use_backend(StubBackend())
+    expected = [sequential.detect_frame(frame) for frame in frames]
+
+    detector = CardDetector(test_layout, frame_source=RingBufferSource())
+    detector.use_backend(pool)
+    stream = OrderedDetections(detector, depth=6)
+    got = []
+    for i, frame in enumerate(frames):
+        if stream.full:
+            got.append(stream.next())
+        stream.submit(frame, i)
+    while len(stream):
+        got.append(stream.next())
+
+    assert [tag for tag, _ in got] == list(range(len(frames)))
+    assert [result for _, result in got] == expected
+
+
+def test_close_releases_shared_memory():
+    pool = ProcessPoolBackend(load_stub, {}, workers=2, max_inflight=2)
+    # 先用小帧, 再用大帧: 共享内存块换成更大的
+    pool.predict_batch([blank_frame(90, 160)] * 2, 0.5, 0.45)
+    old_names = [slot.shm.name for slot in pool._all_slots if slot.shm is not None]
+    pool.predict_batch([blank_frame()] * 2, 0.5, 0.45)
+    names = [slot.shm.name for slot in pool._all_slots if slot.shm is not None]
+    assert names and set(old_names).isdisjoint(names)
+
+    pool.close()
+    assert all(slot.shm is None for slot in pool._all_slots)
+    assert not any(p.is_alive() for p in pool._processes)
+    for name in old_names + names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+    with pytest.raises(RuntimeError):
+        pool.submit(blank_frame(), 0.5, 0.45)
@@ -0,0 +1,80 @@
+"""
+RegionResultCache: 量化哈希 + LRU
+"""
+
+import numpy as np
+
+from core.region_cache import RegionResultCache
+
+# 手牌区占画面上方大半, 其余四个区域排在下面一行
+LAYOUT = {
+    "player_hand": (0.0, 0.0, 1.0, 0.8),
+    "player_played": (0.0, 0.8, 0.2, 0.9),
+    "opponent_left": (0.2, 0.8, 0.4, 0.9),
+    "opponent_right": (0.4, 0.8, 0.6, 0.9),
+    "landlord_cards": (0.6, 0.8, 0.8, 0.9),
+}
+
+
+def quantized_frame(seed=0, h=360, w=640):
+    # 像素值都是 4 的倍数, 即 >>2 量化后每一档的下沿
+    rng = np.random.default_rng(seed)
+    return (rng.integers(0, 64, size=(h, w, 3)) * 4).astype(np.uint8)
+
+
+def make_cache(capacity=64):
+    return RegionResultCache(LAYOUT, capacity=capacity)
+
+
+def test_noise_below_quantisation_step_hits():
+    cache = make_cache()
+    frame = quantized_frame()
+    key = cache.region_key(frame, "player_hand")
+    cache.put(key, (1, 2, 3))
+
+    # 每个像素加 0~3 的抖动, 仍在同一档
+    rng = np.random.default_rng(1)
+    noisy = frame + rng.integers(0, 4, size=frame.shape).astype(np.uint8)
+    assert not np.array_equal(noisy, frame)
+    assert cache.region_key(noisy, "player_hand") == key
+    assert cache.get(cache.region_key(noisy, "player_hand")) == (1, 2, 3)
+    assert cache.hits == 1
+
+
+def test_real_change_misses():
+    cache = make_cache()
+    frame = quantized_frame()
+    cache.put(cache.region_key(frame, "player_hand"), (1, 2, 3))
+
+    changed = frame.copy()
+    changed[100:160, 200:240] = 255  # 多了一张牌
+    assert cache.get(cache.region_key(changed, "player_hand")) is None
+    assert cache.misses == 1
+    # 其他区域不受影响
+    assert cache.region_key(changed, "landlord_cards") == cache.region_key(frame, "landlord_cards")
+
+
+def test_same_pixels_in_different_regions_are_different_keys():
+    cache = make_cache()
+    frame = np.zeros((360, 640, 3), dtype=np.uint8)
+    assert cache.region_key(frame, "opponent_left") != cache.region_key(frame, "opponent_right")
+
+
+def test_oldest_entry_is_evicted_at_capacity():
+    cache = make_cache(capacity=3)
+    keys = [cache.region_key(quantized_frame(seed), "player_hand") for seed in range(4)]
+    for i, key in enumerate(keys[:3]):
+        cache.put(key, (i,))
+    assert cache.get(keys[0]) == (0,)  # 用过一次: 变成最新的
+
+    cache.put(keys[3], (3,))
+    assert cache.get(keys[1]) is None  # 最久没用的被淘汰
+    assert [cache.get(k) for k in (keys[0], keys[2], keys[3])] == [(0,), (2,), (3,)]
+
+
+def test_resize_clears_entries():
+    cache = make_cache()
+    key = cache.region_key(quantized_frame(), "player_hand")
+    cache.put(key, (1,))
+    cache.region_key(quantized_frame(h=720, w=1280), "player_hand")
+    assert cache.get(key) is None
@@ -0,0 +1,90 @@
+"""
+AdaptiveScheduler: 用 ReplayClock 驱动真实的 CardTracker, 按返回的间隔推进时间
+"""
+
+import pytest
+
+import config.settings as settings
+from config.settings import HAS_STARTED, STARTED_RECORD_CARD
+from core.card_tracker import CardTracker
+from core.frame_source import RingBufferSource
+from core.scheduler import AdaptiveScheduler
+from core.session_archive import ReplayClock
+
+LANDLORD = (0, 1, 2)
+
+
+def detections(hand=(), landlord=LANDLORD):
+    # 顺序: player_hand, player_played, opponent_left, opponent_right, landlord_cards
+    return hand, (), (), (), landlord
+
+
+@pytest.fixture
+def tracker(test_layout, monkeypatch):
+    monkeypatch.setattr(settings, "FRAME_LENGTH", 3)
+    monkeypatch.setattr(settings, "RESET_TIME", 3.0)
+    monkeypatch.setattr(settings, "DEBUG_MODE", False)
+    return CardTracker(test_layout, frame_source=RingBufferSource(), clock=ReplayClock())
+
+
+def step(tracker, scheduler, dets, work_sec=0.01):
+    tracker.run(dets)
+    interval = scheduler.update(tracker, work_sec)
+    tracker.clock.t += interval
+    return interval
+
+
+def make_scheduler(**kwargs):
+    kwargs.setdefault("min_interval", 0.08)
+    kwargs.setdefault("max_interval", 2.0)
+    kwargs.setdefault("cpu_budget", 0.5)
+    return AdaptiveScheduler(0.2, **kwargs)
+
+
+def test_changing_cards_use_min_interval_then_ease_back(tracker):
+    scheduler = make_scheduler()
+    # 地主牌凑满 3 帧开局; 手牌每帧都在变
+    intervals = [step(tracker, scheduler, detections(hand=(3, k))) for k in range(4)]
+    assert tracker.state == HAS_STARTED
+    assert intervals[:2] == [0.2, 0.2]  # 还没开局: 保持基础间隔
+    assert intervals[2:] == [0.08, 0.08]
+
+    # 手牌不变了: 凑满 3 帧后开始记牌, 间隔逐步(x1.25)放慢回基础间隔
+    intervals = [step(tracker, scheduler, detections(hand=(3, 9))) for _ in range(8)]
+    assert tracker.state == STARTED_RECORD_CARD
+    assert intervals[:2] == [0.08, 0.08]
+    assert intervals[2:5] == pytest.approx([0.1, 0.125, 0.15625])
+    assert intervals[-1] == 0.2
+    assert all(a <= b for a, b in zip(intervals, intervals[1:]))
+
+
+def test_idle_backs_off_exponentially_and_returns_to_base(tracker):
+    scheduler = make_scheduler()
+    intervals = [step(tracker, scheduler, detections(landlord=())) for _ in range(6)]
+    assert intervals == pytest.approx([0.4, 0.8, 1.6, 2.0, 2.0, 2.0])
+    # 按这些间隔推进时钟, 空闲已超过 reset_time
+    assert tracker.clock.t > settings.RESET_TIME
+    assert not tracker.has_target
+
+    # 进入对局: 直接回到基础间隔, 不从最长间隔慢慢降
+    assert step(tracker, scheduler, detections()) == 0.2
+
+
+def test_cpu_budget_clamps_interval(tracker):
+    scheduler = make_scheduler(cpu_budget=0.5)
+    # 识别一帧 0.3 秒: 间隔至少 0.3 / 0.5 = 0.6 秒(只占半个核)
+    assert step(tracker, scheduler, detections(landlord=()), work_sec=0.3) == pytest.approx(0.6)
+    # 内部的间隔照常退避, 不受预算影响
+    assert scheduler.interval == pytest.approx(0.4)
+    # 耗时按滑动平均: 0.8 * 0.3 + 0.2 * 0.05 = 0.25
+    assert step(tracker, scheduler, detections(landlord=()), work_sec=0.05) == pytest.approx(0.8)
+    assert scheduler.work_ema == pytest.approx(0.25)
+
+    scheduler.reset()
+    tracker.run(detections())
+    assert scheduler.delay(tracker, 0.3) == pytest.approx(0.6 - 0.3)  # 串行模式: 扣掉识别耗时
+
+
+def test_no_budget_means_no_clamp(tracker):
+    scheduler = make_scheduler(cpu_budget=0)
+    assert step(tracker, scheduler, detections(landlord=()), work_sec=5.0) == pytest.approx(0.4)
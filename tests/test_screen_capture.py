@@ -0,0 +1,173 @@
+"""
+GdiCaptureSession 的缓存 / 重建逻辑, win32 接口用假的实现代替
+"""
+
+import ctypes
+
+import numpy as np
+
+from core.screen_capture import GdiCaptureSession
+
+
+class FakeBitmap:
+    def __init__(self, log):
+        self.log = log
+        self.size = None
+
+    def CreateCompatibleBitmap(self, dc, w, h):
+        self.size = (w, h)
+        self.log.append(("bitmap", w, h))
+
+    def GetHandle(self):
+        return id(self)
+
+
+class FakeDC:
+    def __init__(self, log, name):
+        self.log = log
+        self.name = name
+
+    def CreateCompatibleDC(self):
+        self.log.append(("create_dc", "mem"))
+        return FakeDC(self.log, "mem")
+
+    def SelectObject(self, obj):
+        pass
+
+    def BitBlt(self, dst, size, src, src_pos, rop):
+        pass
+
+    def DeleteDC(self):
+        self.log.append(("delete_dc", self.name))
+
+
+class FakeWin32Gui:
+    def __init__(self, log):
+        self.log = log
+        self.rect = (0, 0, 8, 6)
+        self.alive = True
+        self.find_calls = 0
+
+    def IsWindow(self, hwnd):
+        return self.alive
+
+    def FindWindow(self, cls, title):
+        self.find_calls += 1
+        self.alive = True
+        return 100 + self.find_calls
+
+    def GetWindowRect(self, hwnd):
+        return self.rect
+
+    def GetDesktopWindow(self):
+        return 1
+
+    def GetWindowDC(self, hwnd):
+        return 2
+
+    def ReleaseDC(self, hwnd, dc):
+        self.log.append(("release_dc",))
+
+    def DeleteObject(self, handle):
+        self.log.append(("delete_bitmap",))
+
+
+class FakeWin32Ui:
+    def __init__(self, log):
+        self.log = log
+
+    def CreateDCFromHandle(self, handle):
+        return FakeDC(self.log, "img")
+
+    def CreateBitmap(self):
+        return FakeBitmap(self.log)
+
+
+class FakeWin32Con:
+    SRCCOPY = 0x00CC0020
+
+
+class FakeGdi32:
+    """
+    按真实 GetBitmapBits 的方式写入: 第三个参数是缓冲区地址
+    """
+
+    def __init__(self):
+        self.value = 7
+        self.fail = False
+
+    def GetBitmapBits(self, handle, nbytes, buffer):
+        if self.fail:
+            return 0
+        assert isinstance(buffer, ctypes.c_void_p)
+        ctypes.memset(buffer, self.value, nbytes)
+        return nbytes
+
+
+def make_session():
+    log = []
+    gui = FakeWin32Gui(log)
+    gdi32 = FakeGdi32()
+    session = GdiCaptureSession("斗地主", win32gui_api=gui, win32ui_api=FakeWin32Ui(log),
+                                win32con_api=FakeWin32Con(), gdi32_api=gdi32)
+    return session, gui, gdi32, log
+
+
+def count(log, kind):
+    return sum(1 for entry in log if entry[0] == kind)
+
+
+def test_grab_copies_pixels_into_preallocated_buffer():
+    session, gui, gdi32, log = make_session()
+    frame = session.grab()
+    assert frame.shape == (6, 8, 3)
+    assert np.all(frame == 7)
+
+    gdi32.value = 9
+    again = session.grab()
+    assert again is frame  # 复用同一块输出缓冲区
+    assert np.all(again == 9)
+
+
+def test_same_size_reuses_resources():
+    session, gui, gdi32, log = make_session()
+    for _ in range(3):
+        session.grab()
+    assert count(log, "bitmap") == 1
+    assert count(log, "delete_dc") == 0
+    assert gui.find_calls == 1
+
+
+def test_resize_rebuilds_resources():
+    session, gui, gdi32, log = make_session()
+    session.grab()
+    gui.rect = (10, 10, 30, 25)
+    frame = session.grab()
+    assert frame.shape == (15, 20, 3)
+    assert session.size == (20, 15)
+    assert count(log, "bitmap") == 2
+    # 旧的两个 DC、桌面 DC 和位图都已释放
+    assert count(log, "delete_dc") == 2
+    assert count(log, "release_dc") == 1
+    assert count(log, "delete_bitmap") == 1
+
+
+def test_failed_copy_invalidates_and_rebuilds_next_frame():
+    session, gui, gdi32, log = make_session()
+    session.grab()
+    gdi32.fail = True
+    assert session.grab() is None
+    assert session.size is None and session.bmp is None
+
+    gdi32.fail = False
+    assert session.grab() is not None
+    assert count(log, "bitmap") == 2
+
+
+def test_window_lost_is_found_again():
+    session, gui, gdi32, log = make_session()
+    session.grab()
+    gui.alive = False
+    assert session.grab() is not None
+    assert gui.find_calls == 2
+    assert count(log, "bitmap") == 1  # 尺寸没变, 不重建
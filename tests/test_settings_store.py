@@ -0,0 +1,98 @@
+"""
+SettingsStore: 延迟写回、原子替换、退出时 flush, 写回后保持原文件的换行符
+"""
+
+import os
+import time
+
+import config.settings_store as settings_store
+from config.settings_store import SettingsStore
+
+SCHEMA = {
+    "frame_length": (int, 3),
+    "debug_mode": (bool, True),
+    "reset_time": (float, 3.5),
+}
+
+
+def write_config(path, text, newline):
+    path.write_bytes(text.replace("\n", newline).encode("utf-8"))
+
+
+def test_set_flush_and_reload_keeps_crlf(tmp_path):
+    path = tmp_path / "config.yaml"
+    write_config(path, "custom_key: 自定义\nframe_length: 3\nreset_time: 3.0\n", "\r\n")
+
+    store = SettingsStore(str(path), SCHEMA, debounce=60)
+    store.set("frame_length", 5)
+    store.set("debug_mode", False)
+    store.set("reset_time", 9.0, persist=False)  # 只在本次运行中生效
+    store.flush()
+
+    raw = path.read_bytes()
+    assert b"\r\n" in raw and b"\n" not in raw.replace(b"\r\n", b"")
+    assert not os.path.exists(str(path) + ".tmp")
+
+    reloaded = SettingsStore(str(path), SCHEMA)
+    assert reloaded.get("frame_length") == 5
+    assert reloaded.get("debug_mode") is False
+    assert reloaded.get("reset_time") == 3.0
+    assert "自定义" in raw.decode("utf-8")  # 不在 schema 里的键原样保留
+
+
+def test_lf_file_stays_lf(tmp_path):
+    path = tmp_path / "config.yaml"
+    write_config(path, "frame_length: 3\n", "\n")
+    store = SettingsStore(str(path), SCHEMA, debounce=60)
+    store.set("frame_length", 4)
+    store.flush()
+    assert b"\r\n" not in path.read_bytes()
+    assert SettingsStore(str(path), SCHEMA).get("frame_length") == 4
+
+
+def test_writes_are_debounced(tmp_path):
+    path = tmp_path / "config.yaml"
+    write_config(path, "frame_length: 3\n", "\r\n")
+    before = path.read_bytes()
+
+    store = SettingsStore(str(path), SCHEMA, debounce=0.2)
+    for value in (4, 5, 6):
+        store.set("frame_length", value)
+    assert path.read_bytes() == before  # 还没到时间, 不碰文件
+
+    deadline = time.time() + 5
+    while path.read_bytes() == before and time.time() < deadline:
+        time.sleep(0.05)
+    assert SettingsStore(str(path), SCHEMA).get("frame_length") == 6
+
+
+def test_unchanged_value_does_not_write(tmp_path):
+    path = tmp_path / "config.yaml"
+    write_config(path, "frame_length: 3\n", "\r\n")
+    mtime = path.stat().st_mtime_ns
+    store = SettingsStore(str(path), SCHEMA, debounce=60)
+    store.set("frame_length", 3)
+    store.flush()
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_pending_write_is_flushed_at_exit(tmp_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr(settings_store.atexit, "register", registered.append)
+    path = tmp_path / "config.yaml"
+    write_config(path, "frame_length: 3\n", "\r\n")
+
+    store = SettingsStore(str(path), SCHEMA, debounce=60)
+    assert registered == [store.flush]
+    store.set("frame_length", 7)
+    registered[0]()  # 相当于解释器退出
+    assert SettingsStore(str(path), SCHEMA).get("frame_length") == 7
+
+
+def test_missing_file_uses_defaults_and_is_created(tmp_path):
+    path = tmp_path / "config.yaml"
+    store = SettingsStore(str(path), SCHEMA, debounce=60)
+    assert store.get("frame_length") == 3
+    store.set("frame_length", 8)
+    store.flush()
+    assert SettingsStore(str(path), SCHEMA).get("frame_length") == 8
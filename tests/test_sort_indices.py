@@ -0,0 +1,118 @@
+"""
+sort_indices_topright_rowwise 与原来逐行扫描的实现(reference_sort)在随机框上的排序结果必须完全一致
+"""
+
+import numpy as np
+import pytest
+
+from core.card_detector import sort_indices_topright_rowwise
+
+
+def reference_sort(boxes, max_rows=3):
+    """
+    线性扫描之前的 sort_cards_by_topright_rowwise, 只把返回值从 dets 改成下标
+    """
+    if len(boxes) == 0:
+        return []
+
+    feats = []  # (top_y, right_x, idx)
+    heights = []
+    for i, (x1, y1, x2, y2) in enumerate(boxes):
+        feats.append((float(y1), float(x2), i))
+        heights.append(max(1, (y2 - y1)))
+
+    heights_sorted = sorted(heights)
+    mid = len(heights_sorted) // 2
+    median_h = heights_sorted[mid] if len(heights_sorted) % 2 == 1 else (heights_sorted[mid - 1] + heights_sorted[
+        mid]) / 2.0
+    tol = median_h * 0.55
+
+    feats.sort(key=lambda t: t[0])
+
+    rows = []
+    for top_y, right_x, idx in feats:
+        placed = False
+        for row in rows:
+            if abs(top_y - row["anchor_y"]) <= tol:
+                row["items"].append((top_y, right_x, idx))
+                n = len(row["items"])
+                row["anchor_y"] = (row["anchor_y"] * (n - 1) + top_y) / n
+                placed = True
+                break
+        if not placed:
+            rows.append({"anchor_y": top_y, "items": [(top_y, right_x, idx)]})
+
+    rows.sort(key=lambda r: r["anchor_y"])
+
+    if max_rows is not None and len(rows) > max_rows:
+        kept = rows[:max_rows]
+        extra = rows[max_rows:]
+        for er in extra:
+            target = min(kept, key=lambda r: abs(er["anchor_y"] - r["anchor_y"]))
+            target["items"].extend(er["items"])
+            ys = [it[0] for it in target["items"]]
+            target["anchor_y"] = sum(ys) / len(ys)
+        rows = kept
+        rows.sort(key=lambda r: r["anchor_y"])
+
+    sorted_indices = []
+    for row in rows:
+        row["items"].sort(key=lambda t: t[1])
+        sorted_indices.extend([idx for _, _, idx in row["items"]])
+    return sorted_indices
+
+
+def random_boxes(rng):
+    """
+    随机生成几行牌: 行内 y1 有抖动, 一部分框正好落在行容差的边界上(|dy| == tol 或刚超过),
+    right_x / top_y 有大量重复值(并列), 坐标有时取整
+    """
+    n = int(rng.integers(0, 25))
+    if n == 0:
+        return np.zeros((0, 4))
+    height_choices = [20.0, 20.0, 30.0, 7.5, 0.4] if rng.random() < 0.8 else [float(rng.uniform(0.2, 60))]
+    heights = rng.choice(height_choices, size=n)
+    median_h = float(np.median(np.maximum(1, heights)))
+    tol = median_h * 0.55
+
+    n_rows = int(rng.integers(1, 6))
+    row_gap = rng.choice([tol, tol * 1.5, tol * 2.0 + 1e-9, median_h * 3])
+    row_y = 100.0 + np.arange(n_rows) * row_gap
+    offsets = [0.0, 0.0, tol, -tol, tol + 1e-9, -tol - 1e-9, tol / 2, -tol / 2]
+
+    y1 = row_y[rng.integers(0, n_rows, size=n)] + rng.choice(offsets, size=n)
+    if rng.random() < 0.5:
+        y1 += rng.uniform(-tol, tol, size=n)
+    x2 = rng.choice(np.arange(200.0, 200.0 + 40.0 * max(1, n // 3), 40.0), size=n)
+    if rng.random() < 0.3:
+        x2 += rng.uniform(0, 5, size=n)
+    if rng.random() < 0.3:
+        y1 = np.round(y1)
+        heights = np.round(heights)
+    x1 = x2 - 30.0
+    return np.stack([x1, y1, x2, y1 + heights], axis=1)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_reference_on_random_boxes(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(25):
+        boxes = random_boxes(rng)
+        for max_rows in (None, 1, 2, 3, 5):
+            expected = reference_sort(boxes.tolist(), max_rows=max_rows)
+            got = sort_indices_topright_rowwise(boxes, max_rows=max_rows).tolist()
+            assert got == expected, (boxes.tolist(), max_rows)
+
+
+def test_boxes_exactly_on_row_boundary():
+    # 高度都是 20: tol = 11, 第二个框正好在第一行的容差边界上;
+    # 第三个框离第一个框超过 tol, 但离并入第二个框后的行锚点(平均值)不到 tol
+    tol = 20 * 0.55
+    boxes = np.array([
+        [0, 100.0, 50, 120.0],
+        [0, 100.0 + tol, 40, 120.0 + tol],
+        [0, 100.0 + tol + 0.01, 30, 120.0 + tol + 0.01],
+    ])
+    for max_rows in (None, 1, 3):
+        assert sort_indices_topright_rowwise(boxes, max_rows=max_rows).tolist() == reference_sort(
+            boxes.tolist(), max_rows=max_rows)
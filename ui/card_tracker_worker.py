@@ -0,0 +1,166 @@
+import time
+import traceback
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+from core.card_tracker import CardTracker
+from core.multi_session import MultiSessionTracker
+from core.pipeline import TrackerPipeline
+
+
+class CardTrackerWorker(QObject):
+    """
+    Worker 是一个 QObject，放到 QThread 里运行。
+    它暴露一个槽函数 do_run_once()，用于执行 tracker.run()。
+
+    执行成功/失败都通过信号发回主线程。
+    """
+
+    # 成功信号：把 tracker.run() 的 4 个返回值发回去
+    # (剩余牌计数向量, 上家/下家/本家出牌记录; 牌都是整数编码)
+    result_ready = Signal(list, list, list, list)
+
+    # 失败信号：把错误文本发回去
+    error = Signal(str)
+
+    # “本次任务结束”信号：用于主线程解除“忙碌状态”
+    finished = Signal()
+
+    # 模型加载完成信号：把实际使用的设备发回去
+    model_ready = Signal(str)
+
+    # 模型加载失败信号：把错误文本发回去
+    model_error = Signal(str)
+
+    # 自适应间隔：本轮结束后距离下一轮还要等多少秒（只在传入 scheduler 时发送）
+    next_delay = Signal(float)
+
+    def __init__(self, card_tracker: CardTracker, scheduler=None):
+        super().__init__()
+        self.card_tracker = card_tracker
+        self.scheduler = scheduler
+
+    @Slot()
+    def load_model(self):
+        """
+        在后台线程加载模型(连接到 QThread.started)。
+        加载期间投递过来的 do_run_once 会排在后面, 等加载完成后才执行。
+        """
+        try:
+            self.card_tracker.card_detector.load_model()
+            self.model_ready.emit(str(self.card_tracker.card_detector.device))
+        except Exception:
+            self.model_error.emit(traceback.format_exc())
+
+    @Slot()
+    def reset(self):
+        self.card_tracker.reset()
+
+    @Slot()
+    def do_run_once(self):
+        """
+        在后台线程执行一次 tracker.run()。
+        注意：这里不要直接操作 UI，只发信号。
+        """
+        t0 = time.perf_counter()
+        try:
+            remain_cards, show_left, show_right, show_self = self.card_tracker.run()
+            # 复制一份再发: 这些列表之后还会在后台线程里被修改
+            self.result_ready.emit(list(remain_cards), list(show_left), list(show_right), list(show_self))
+        except Exception:
+            err_text = traceback.format_exc()
+            self.error.emit(err_text)
+        finally:
+            if self.scheduler is not None:
+                self.next_delay.emit(self.scheduler.delay(self.card_tracker, time.perf_counter() - t0))
+            self.finished.emit()
+
+
+class CardTrackerPipelineWorker(QObject):
+    """
+    流水线模式下的 worker：截图、识别、记牌分别在三个后台线程里运行（见 core/pipeline.py）。
+    信号与 CardTrackerWorker 相同，主窗口的连接代码不用改；
+    流水线自己按检测间隔截图，不需要主窗口的定时器触发。
+    """
+
+    result_ready = Signal(list, list, list, list)
+    error = Signal(str)
+    finished = Signal()
+    model_ready = Signal(str)
+    model_error = Signal(str)
+
+    def __init__(self, card_tracker: CardTracker, scheduler=None):
+        super().__init__()
+        self.card_tracker = card_tracker
+        # 回调在后台线程中调用, emit 会自动排队到主线程
+        self.pipeline = TrackerPipeline(
+            card_tracker,
+            on_result=self.result_ready.emit,
+            on_error=self.error.emit,
+            on_model_ready=self.model_ready.emit,
+            on_model_error=self.model_error.emit,
+            scheduler=scheduler,
+        )
+
+    def start(self):
+        self.pipeline.start()
+
+    def stop(self):
+        self.pipeline.stop()
+
+    def pause(self):
+        self.pipeline.pause()
+
+    def resume(self):
+        self.pipeline.resume()
+
+    @Slot()
+    def reset(self):
+        self.pipeline.request_reset()
+
+
+class MultiSessionWorker(QObject):
+    """
+    多桌模式的 worker（见 core/multi_session.py）：放到 QThread 里运行，
+    每轮截取所有桌的画面、合并成一次批量推理，再把每桌的结果分别发回主线程（带桌号）。
+    """
+
+    # 桌号 + 与 CardTrackerWorker.result_ready 相同的 4 个值
+    result_ready = Signal(int, list, list, list, list)
+    error = Signal(str)
+    finished = Signal()
+    model_ready = Signal(str)
+    model_error = Signal(str)
+
+    def __init__(self, tables: MultiSessionTracker):
+        super().__init__()
+        self.tables = tables
+        # 主线程请求重置的桌号(-1 表示所有桌), 在下一轮开始前由 worker 线程执行
+        self._reset_requests = []
+
+    @Slot()
+    def load_model(self):
+        try:
+            self.model_ready.emit(str(self.tables.load_model()))
+        except Exception:
+            self.model_error.emit(traceback.format_exc())
+
+    def request_reset(self, index: int = -1):
+        """
+        可以在主线程调用; 记牌状态在 worker 线程里重置, 不会和正在进行的一轮冲突
+        """
+        self._reset_requests.append(index)
+
+    @Slot()
+    def do_run_once(self):
+        try:
+            while self._reset_requests:
+                index = self._reset_requests.pop(0)
+                self.tables.reset(None if index < 0 else index)
+            results = self.tables.run()
+            for i, (remain_cards, show_left, show_right, show_self) in enumerate(results):
+                self.result_ready.emit(i, list(remain_cards), list(show_left), list(show_right), list(show_self))
+        except Exception:
+            self.error.emit(traceback.format_exc())
+        finally:
+            self.finished.emit()
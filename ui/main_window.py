@@ -9,8 +9,13 @@ from PySide6.QtCore import Qt, QThread, QTimer, Slot
 from PySide6.QtWidgets import (
     QWidget, QLabel, QVBoxLayout, QGridLayout, QPushButton, QHBoxLayout, QMainWindow, QSizePolicy
 )
-from core.card_tracker import CardTracker, CardTrackerWorker
+from core.card_tracker import CardTracker
+from ui.card_tracker_worker import CardTrackerWorker, CardTrackerPipelineWorker
 from config.settings import TOTAL_CARDS
+from core.card_codes import CARD_CODE
+from core.stage_timer import STAGE_TIMER
+from core.scheduler import create_scheduler
+from core.session_archive import start_recording, stop_recording
 from utils.trans_yolo_names_to_string import trans_yolo_names_to_string
 from ui.settings_dialog import SettingsDialog
 import config.settings as settings
@@ -41,17 +46,15 @@ class CardUI(QMainWindow):
         self.resize(550, 100) # 设置初始窗口大小
 
         # 应用是否显示在最上层设置
-        from config.settings import ALWAYS_ON_TOP
         # 使用 setWindowFlag 以避免重建窗口导致子控件丢失
         try:
-            self.setWindowFlag(Qt.WindowStaysOnTopHint, ALWAYS_ON_TOP)
+            self.setWindowFlag(Qt.WindowStaysOnTopHint, settings.ALWAYS_ON_TOP)
         except Exception:
             # 兜底：无论如何不要使窗口重建后丢失 central widget
             pass
 
         # 应用是否显示玩家所出的牌设置
-        from config.settings import SHOW_PLAYED_CARDS
-        self._show_played_cards = SHOW_PLAYED_CARDS
+        self._show_played_cards = settings.SHOW_PLAYED_CARDS
 
         # 创建中央部件
         self.central_widget = QWidget()
@@ -61,14 +64,13 @@ class CardUI(QMainWindow):
         self.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
 
         # 自动选择字典中第一个可用的配置
-        from config.settings import WINDOW_LAYOUTS, CURRENT_LAYOUT
-        available_layouts = list(WINDOW_LAYOUTS.keys())
+        available_layouts = list(settings.WINDOW_LAYOUTS.keys())
         if not available_layouts:
             raise ValueError("WINDOW_LAYOUTS 字典为空，没有可用的配置")
 
         # 优先使用配置文件中保存的 CURRENT_LAYOUT，如果不存在则使用第一个
-        if CURRENT_LAYOUT and CURRENT_LAYOUT in available_layouts:
-            self.layout_name = CURRENT_LAYOUT
+        if settings.CURRENT_LAYOUT and settings.CURRENT_LAYOUT in available_layouts:
+            self.layout_name = settings.CURRENT_LAYOUT
         else:
             self.layout_name = available_layouts[0]
             # 如果配置中没有CURRENT_LAYOUT，可以将默认值写回内存（无需立刻写文件）
@@ -87,6 +89,8 @@ class CardUI(QMainWindow):
         # -------------------------
         self.card_order = list(TOTAL_CARDS.keys())
         self.card_order.reverse()
+        # 每张牌在剩余计数向量中的下标（牌的整数编码）
+        self.card_codes = [CARD_CODE[card] for card in self.card_order]
 
         # -------------------------
         # UI 结构：根布局 + 网格布局（两行）
@@ -159,10 +163,23 @@ class CardUI(QMainWindow):
 
         # 保存标签列表，用于后续控制
         self.played_cards_labels = [self.left_played_cards_label, self.self_played_cards_label, self.right_played_cards_label]
+        self.played_labels_by_side = {
+            "left": self.left_played_cards_label,
+            "right": self.right_played_cards_label,
+            "self": self.self_played_cards_label,
+        }
+        self.played_prefix = {"left": "   上家     ", "right": "   下家     ", "self": "   本家     "}
 
         # 根据设置决定是否显示玩家所出的牌
         self._update_played_cards_visibility()
 
+        # 各阶段耗时（可选，放在最下面）
+        self.latency_label = QLabel("")
+        self.latency_label.setObjectName("LatencyLabel")
+        self.latency_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+        self.latency_label.setVisible(settings.LATENCY_OVERLAY)
+        self.root_layout.addWidget(self.latency_label)
+
         # -------------------------
         # 保存 label 引用：后续更新用（保持你原逻辑）
         # name_labels：牌名 QLabel
@@ -199,10 +216,15 @@ class CardUI(QMainWindow):
             # 数量 label 同样设置 objectName，QSS 中用 #CardCountLabel
             cnt.setObjectName("CardCountLabel")
             cnt.setProperty("depleted", False)
+            cnt.setProperty("count", str(TOTAL_CARDS.get(card, 0)))
 
             self.grid.addWidget(cnt, 1, col)
             self.count_labels[card] = cnt
 
+        # 上一次显示的内容（增量刷新用）：数量 / 出牌记录(None 表示还没显示过)
+        self._rendered_counts = {card: TOTAL_CARDS.get(card, 0) for card in self.card_order}
+        self._rendered_played = {"left": None, "right": None, "self": None}
+
         # 加载布局配置选项（现在在设置对话框中加载）
         # self._load_layout_options()
 
@@ -211,30 +233,29 @@ class CardUI(QMainWindow):
         # -------------------------
         self.card_tracker = CardTracker(self.layout_name)
 
-        # QThread：worker 的执行线程
-        self.worker_thread = QThread(self)
-
-        # 你的 worker：执行一次识别，然后 emit result_ready / finished
-        self.worker = CardTrackerWorker(self.card_tracker)
-
-        # 把 worker 移动到线程中（关键：让耗时任务不在主线程跑）
-        self.worker.moveToThread(self.worker_thread)
-
-        # 信号连接（保持你原逻辑）
-        self.worker.result_ready.connect(self.on_result_ready)
-        self.worker.error.connect(self.on_worker_error)
-        self.worker.finished.connect(self.on_worker_finished)
-
-        # 启动线程
-        self.worker_thread.start()
+        # 流水线模式：截图/识别/记牌在各自线程里连续运行，不需要定时器触发
+        self.pipeline_mode = settings.PIPELINE_MODE
+        # 自适应检测间隔（adaptive_interval 关闭时为 None，按固定间隔检测）
+        self.scheduler = create_scheduler()
+        self.worker_thread = None
+        self._start_worker()
 
         # 初始化定时器（在构造函数中创建，确保timer属性始终存在）
         self._busy = False  # busy 防抖：上一轮没结束，不触发新一轮
         self.timer = QTimer(self)
         self.timer.setInterval(int(self.detect_interval_sec * 1000))  # 将秒转换为毫秒
+        # 自适应间隔：每轮结束后由 worker 给出下一次的等待时间，定时器只触发一次
+        self.timer.setSingleShot(self.scheduler is not None and not self.pipeline_mode)
         self.timer.timeout.connect(self.request_one_update) # 定义的 request_one_update 方法绑定。
         self.timer.start() # 启动
 
+        # 耗时统计：每秒刷新耗时显示，调试模式下每 5 秒打印一次并写入 JSON
+        self._stats_ticks = 0
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(1000)
+        self.stats_timer.timeout.connect(self.on_stats_timer)
+        self.stats_timer.start()
+
     def on_settings_clicked(self):
         """
         点击设置按钮时打开设置对话框
@@ -250,7 +271,8 @@ class CardUI(QMainWindow):
             on_frame_length_change_callback=self.on_frame_length_changed,
             on_always_on_top_change_callback=None,
             on_show_played_cards_change_callback=self.on_show_played_cards_changed,
-            on_debug_mode_change_callback=self.on_debug_mode_changed
+            on_debug_mode_change_callback=self.on_debug_mode_changed,
+            on_inference_option_change_callback=self.on_inference_option_changed
         )
 
         # 设置当前值
@@ -258,28 +280,26 @@ class CardUI(QMainWindow):
         dialog.set_current_layout(self.layout_name)
 
         # 设置当前设备选择
-        from config.settings import DEVICE_CHOICE
-        dialog.set_current_device(DEVICE_CHOICE)
+        dialog.set_current_device(settings.DEVICE_CHOICE)
 
         # 设置当前重置时间
-        from config.settings import RESET_TIME
-        dialog.set_current_reset_time(RESET_TIME)
+        dialog.set_current_reset_time(settings.RESET_TIME)
 
         # 设置当前帧长度
-        from config.settings import FRAME_LENGTH
-        dialog.set_current_frame_length(FRAME_LENGTH)
+        dialog.set_current_frame_length(settings.FRAME_LENGTH)
 
         # 设置当前是否显示在最上层
-        from config.settings import ALWAYS_ON_TOP
-        dialog.set_current_always_on_top(ALWAYS_ON_TOP)
+        dialog.set_current_always_on_top(settings.ALWAYS_ON_TOP)
 
         # 设置当前是否显示玩家所出的牌
-        from config.settings import SHOW_PLAYED_CARDS
-        dialog.set_current_show_played_cards(SHOW_PLAYED_CARDS)
+        dialog.set_current_show_played_cards(settings.SHOW_PLAYED_CARDS)
 
         # 设置当前调试模式
-        from config.settings import DEBUG_MODE
-        dialog.set_current_debug_mode(DEBUG_MODE)
+        dialog.set_current_debug_mode(settings.DEBUG_MODE)
+
+        # 设置当前推理选项
+        dialog.set_current_inference_options(settings.HALF_PRECISION, settings.FUSE_MODEL, settings.WARMUP,
+                                             settings.INFER_IMGSZ)
 
         dialog.exec()
         # 对于 "显示在最上层" 我们在对话框关闭后统一应用，避免在 modal dialog 打开时改变 window flags
@@ -298,6 +318,8 @@ class CardUI(QMainWindow):
         if self.is_paused:
             # 恢复检测
             self.timer.start()
+            if self.pipeline_mode:
+                self.worker.resume()
             self.btn_pause.setText("暂停")
             self.is_paused = False
 
@@ -310,6 +332,8 @@ class CardUI(QMainWindow):
         else:
             # 暂停检测
             self.timer.stop()
+            if self.pipeline_mode:
+                self.worker.pause()
             self.btn_pause.setText("恢复")
             self.is_paused = True
             print("检测已暂停")
@@ -329,7 +353,7 @@ class CardUI(QMainWindow):
           把调用投递到事件队列，让它在 worker 所在线程执行 do_run_once
         - 暂停状态下不触发检测
         """
-        if self._busy or self.is_paused:
+        if self._busy or self.is_paused or self.pipeline_mode:
             return
         self._busy = True
 
@@ -337,49 +361,67 @@ class CardUI(QMainWindow):
         # 意图：让函数在事件循环中异步触发（不堵 UI）
         QTimer.singleShot(0, self.worker.do_run_once)
 
-    @Slot(dict, list, list, list)
-    def on_result_ready(self, remain_cards: dict, show_left: list, show_right: list, show_self: list):
+    @Slot(list, list, list, list)
+    def on_result_ready(self, remain_cards: list, show_left: list, show_right: list, show_self: list):
         """
-        收到 worker 的识别结果（保持你原逻辑）：
-        - 只更新"剩余牌数量"
-        - v <= 0 时样式变灰
-        - v > 0 时样式恢复正常
-
-        注意：
-        - 你原代码是在这里直接 setStyleSheet 覆盖样式
-        - 现在改为设置 dynamicProperty(depleted) 并强制刷新样式
-          这样 QSS 仍然可以做到同样效果，但样式集中在 style.qss
+        收到 worker 的识别结果，刷新界面（计入 ui_update 耗时）
         """
-        for card in self.card_order:
-            v = remain_cards.get(card, 0)
-
-            # 1) 更新数量文字
-            self.count_labels[card].setText(str(v)) # .setText(...)：修改标签内容
-
+        with STAGE_TIMER.span("ui_update"):
+            self._update_cards(remain_cards, show_left, show_right, show_self)
 
+    def _update_cards(self, remain_cards: list, show_left: list, show_right: list, show_self: list):
+        """
+        增量刷新（保持你原来的显示效果）：
+        - remain_cards 是 15 格计数向量，下标为牌的编码（见 core/card_codes.py）
+        - 缓存上一次显示的数量和出牌记录，只有变化的控件才 setText / setProperty
+        - depleted（v <= 0 变灰）和 count（等于 4 时变红）用 dynamicProperty 交给 QSS，
+          属性变了才 unpolish/polish（重新 polish 很贵，稳态下一次都不做）
+        - 有变化时用 setUpdatesEnabled 把多次修改合并成一次重绘
+        """
+        changed_cards = [(card, remain_cards[code]) for card, code in zip(self.card_order, self.card_codes)
+                         if remain_cards[code] != self._rendered_counts[card]]
+        changed_played = [(side, cards) for side, cards in (("left", show_left), ("right", show_right), ("self", show_self))
+                          if cards != self._rendered_played[side]]
+        if not changed_cards and not changed_played:
+            return
 
-            # 更新出牌
-            self.self_played_cards_label.setText("   本家     " + trans_yolo_names_to_string(show_self))
-            self.left_played_cards_label.setText("   上家     " + trans_yolo_names_to_string(show_left))
-            self.right_played_cards_label.setText("   下家     " + trans_yolo_names_to_string(show_right))
+        self.central_widget.setUpdatesEnabled(False)
+        try:
+            for card, v in changed_cards:
+                self._render_count(card, v)
 
+            for side, cards in changed_played:
+                self._rendered_played[side] = cards
+                self.played_labels_by_side[side].setText(self.played_prefix[side] + trans_yolo_names_to_string(cards))
+        finally:
+            self.central_widget.setUpdatesEnabled(True)
 
-            # 2) 设置 depleted 属性：True/False
-            depleted = (v <= 0)
-            self.name_labels[card].setProperty("depleted", depleted)
-            self.count_labels[card].setProperty("depleted", depleted)
+    def _render_count(self, card: str, v: int):
+        """
+        更新一张牌的数量显示（只在数量变化时调用）
+        """
+        old = self._rendered_counts[card]
+        self._rendered_counts[card] = v
 
-            # 3) 设置 count 属性，用于QSS样式控制（当数量等于4时显示红色）
-            self.count_labels[card].setProperty("count", str(v))
+        count_label = self.count_labels[card]
+        # 1) 更新数量文字
+        count_label.setText(str(v))
 
-            # 4) 强制刷新样式（Qt 对动态属性的 QSS，需要触发重新 polish）
-            #    不改变任何逻辑，只是让 QSS 能立即生效
-            self.name_labels[card].style().unpolish(self.name_labels[card])
-            self.name_labels[card].style().polish(self.name_labels[card])
+        # 2) 设置 count 属性，用于QSS样式控制（当数量等于4时显示红色）
+        count_label.setProperty("count", str(v))
 
-            self.count_labels[card].style().unpolish(self.count_labels[card])
-            self.count_labels[card].style().polish(self.count_labels[card])
+        # 3) depleted 属性：只有跨过 0 时才变化，牌名 label 也只有这时才需要重新 polish
+        depleted = (v <= 0)
+        if depleted != (old <= 0):
+            name_label = self.name_labels[card]
+            name_label.setProperty("depleted", depleted)
+            count_label.setProperty("depleted", depleted)
+            name_label.style().unpolish(name_label)
+            name_label.style().polish(name_label)
 
+        # 4) 刷新数量 label 的样式（Qt 对动态属性的 QSS，需要触发重新 polish）
+        count_label.style().unpolish(count_label)
+        count_label.style().polish(count_label)
 
     def _reset_ui_to_total(self):
         """
@@ -390,6 +432,7 @@ class CardUI(QMainWindow):
         """
         for card in self.card_order:
             v = TOTAL_CARDS.get(card, 0)
+            self._rendered_counts[card] = v
             self.count_labels[card].setText(str(v))
 
             self.name_labels[card].setProperty("depleted", False)
@@ -491,8 +534,11 @@ class CardUI(QMainWindow):
         # 3) 立刻重置 UI（用户马上看到）
         self._reset_ui_to_total()
 
-        # 4) 把 reset 投递到 worker 所在线程执行
-        QTimer.singleShot(0, self.worker.reset)
+        # 4) 把 reset 投递到 worker 所在线程执行（流水线模式下由记牌线程执行）
+        if self.pipeline_mode:
+            self.worker.reset()
+        else:
+            QTimer.singleShot(0, self.worker.reset)
 
         # 5) 重新启动定时器（只有在非暂停状态下才启动）
         if not self.is_paused:
@@ -508,8 +554,9 @@ class CardUI(QMainWindow):
         self.detect_interval_sec = interval_sec
 
         # 保存检测间隔到config.yaml文件
-        from config.settings import save_detect_interval
-        save_detect_interval(interval_sec)
+        settings.STORE.set('detect_interval_sec', interval_sec)
+        if self.scheduler is not None:
+            self.scheduler.base_interval = interval_sec
 
         # 停止并重新启动定时器，应用新的时间间隔（只有在非暂停状态下才启动）
         self.timer.stop()
@@ -524,50 +571,20 @@ class CardUI(QMainWindow):
         布局配置下拉框变化时调用
         """
         # 从设置对话框获取当前选择的布局配置
-        from config.settings import WINDOW_LAYOUTS
-        layout_names = list(WINDOW_LAYOUTS.keys())
+        layout_names = list(settings.WINDOW_LAYOUTS.keys())
         selected_layout = layout_names[index]
 
         # 更新当前布局名称
         self.layout_name = selected_layout
 
         # 持久化：保存到 config.yaml 并更新内存中的 CURRENT_LAYOUT
-        from config.settings import save_current_layout
-        save_current_layout(selected_layout)
-        settings.CURRENT_LAYOUT = selected_layout
-
-        # 停止定时器（如果存在）
-        if hasattr(self, 'timer'):
-            self.timer.stop()
-        self._busy = False
-
-        # 重置 UI
-        self._reset_ui_to_total()
-
-        # 重新创建 CardTracker 和 Worker
-        self.card_tracker = CardTracker(selected_layout)
-
-        # 终止旧线程
-        if hasattr(self, 'worker_thread'):
-            self.worker_thread.quit()
-            self.worker_thread.wait(1500)
+        settings.STORE.set('current_layout', selected_layout)
 
-        # 创建新线程和 worker
-        self.worker_thread = QThread(self)
-        self.worker = CardTrackerWorker(self.card_tracker)
-        self.worker.moveToThread(self.worker_thread)
+        # 在原来的识别线程里切换区域和窗口(下一帧生效), 不重建 CardTracker / 线程, 模型也不重新加载
+        self.card_tracker.set_layout(selected_layout)
 
-        # 重新连接信号
-        self.worker.result_ready.connect(self.on_result_ready)
-        self.worker.error.connect(self.on_worker_error)
-        self.worker.finished.connect(self.on_worker_finished)
-
-        # 启动新线程
-        self.worker_thread.start()
-
-        # 重启定时器（只有在非暂停状态下才启动）
-        if hasattr(self, 'timer') and not self.is_paused:
-            self.timer.start()
+        # 换了布局, 之前的记牌结果作废
+        self.on_reset_clicked()
 
         print(f"布局配置已更新为: {selected_layout}")
 
@@ -576,22 +593,24 @@ class CardUI(QMainWindow):
         设备选择改变时调用
         """
         # 从设置对话框获取当前选择的设备
-        device_map = ["cpu", "cuda"]
+        device_map = ["cpu", "cuda", "onnx", "openvino"]
         device_choice = device_map[index]
 
         print(f"[UI] 用户选择设备: {device_choice}")
 
-        # 保存设备选择到settings.py文件
-        from config.settings import save_device_choice
-        save_device_choice(device_choice)
+        # 保存设备选择到config.yaml文件
+        settings.STORE.set('device_choice', device_choice)
 
-        # 更新内存中的配置
-        import config.settings as settings
-        settings.DEVICE_CHOICE = device_choice
-        print(f"[UI] 内存中DEVICE_CHOICE已更新为: {settings.DEVICE_CHOICE}")
+        # 下一帧在识别线程中切换: cpu <-> cuda 只搬运权重, 换后端(PyTorch <-> ONNX)时重新加载模型
+        self.card_tracker.card_detector.set_device(device_choice)
+        print(f"[UI] 设备选择已更新为: {device_choice}，下一帧生效")
 
-        # 提示用户需要重启程序才能生效
-        print(f"[UI] 设备选择已更新为: {device_choice}，请重启程序以应用更改")
+    def on_inference_option_changed(self, key, value):
+        """
+        推理选项(半精度/层融合/预热/推理尺寸)改变时调用, 重启生效
+        """
+        print(f"[UI] 推理选项 {key} 已更新为: {value}，请重启程序以应用更改")
+        settings.STORE.set(key, value)
 
     def on_reset_time_changed(self, index):
         """
@@ -602,12 +621,7 @@ class CardUI(QMainWindow):
         reset_time = reset_time_list[index]
 
         # 保存重置时间到config.yaml文件
-        from config.settings import save_reset_time
-        save_reset_time(reset_time)
-
-        # 更新内存中的配置
-        import config.settings as settings
-        settings.RESET_TIME = reset_time
+        settings.STORE.set('reset_time', reset_time)
 
         print(f"[UI] 重置时间已更新为: {reset_time}秒")
 
@@ -620,12 +634,7 @@ class CardUI(QMainWindow):
         frame_length = frame_length_list[index]
 
         # 保存帧长度到config.yaml文件
-        from config.settings import save_frame_length
-        save_frame_length(frame_length)
-
-        # 更新内存中的配置
-        import config.settings as settings
-        settings.FRAME_LENGTH = frame_length
+        settings.STORE.set('frame_length', frame_length)
 
         print(f"[UI] 帧长度已更新为: {frame_length}")
 
@@ -638,12 +647,7 @@ class CardUI(QMainWindow):
         always_on_top = always_on_top_list[index]
 
         # 保存是否显示在最上层到config.yaml文件
-        from config.settings import save_always_on_top
-        save_always_on_top(always_on_top)
-
-        # 更新内存中的配置
-        import config.settings as settings
-        settings.ALWAYS_ON_TOP = always_on_top
+        settings.STORE.set('always_on_top', always_on_top)
 
         # 简化：直接切换 flag，然后确保 widgets 已连接并刷新界面
         try:
@@ -685,12 +689,7 @@ class CardUI(QMainWindow):
         show_played_cards = show_played_cards_list[index]
 
         # 保存是否显示玩家所出的牌到config.yaml文件
-        from config.settings import save_show_played_cards
-        save_show_played_cards(show_played_cards)
-
-        # 更新内存中的配置
-        import config.settings as settings
-        settings.SHOW_PLAYED_CARDS = show_played_cards
+        settings.STORE.set('show_played_cards', show_played_cards)
 
         # 更新内部状态
         self._show_played_cards = show_played_cards
@@ -708,12 +707,7 @@ class CardUI(QMainWindow):
         debug_mode = True if index == 1 else False
 
         # 保存调试模式到config.yaml文件
-        from config.settings import save_debug_mode
-        save_debug_mode(debug_mode)
-
-        # 更新内存中的配置
-        import config.settings as settings
-        settings.DEBUG_MODE = debug_mode
+        settings.STORE.set('debug_mode', debug_mode)
         print(f"[UI] 调试模式已更新为: {'是' if debug_mode else '否'}")
 
     def _update_played_cards_visibility(self):
@@ -767,6 +761,103 @@ class CardUI(QMainWindow):
 
 
 
+    @Slot()
+    def on_stats_timer(self):
+        """
+        刷新各阶段耗时：
+        - latency_overlay 打开时更新窗口底部的耗时显示
+        - 调试模式下每 5 秒打印一行并写入 logs/stage_timing.json
+        """
+        self._stats_ticks += 1
+        show_overlay = settings.LATENCY_OVERLAY
+        log_now = settings.DEBUG_MODE and self._stats_ticks % 5 == 0
+        if not (show_overlay or log_now):
+            return
+
+        snapshot = STAGE_TIMER.snapshot()
+        line = STAGE_TIMER.format_line(snapshot)
+        if show_overlay:
+            self.latency_label.setText(line)
+        if log_now:
+            print(f"[耗时] {line}")
+            try:
+                STAGE_TIMER.dump_json(settings.STAGE_TIMING_PATH)
+            except OSError as e:
+                print(f"[耗时] 写入 {settings.STAGE_TIMING_PATH} 失败: {e}")
+
+    def _start_worker(self):
+        """
+        创建 worker 并启动后台线程
+        - 普通模式：CardTrackerWorker 移动到 QThread，由定时器逐帧触发
+        - 流水线模式：CardTrackerPipelineWorker 自己管理截图/识别/记牌三个线程
+        """
+        if self.scheduler is not None:
+            self.scheduler.reset()
+        # 录制对局（record_session）；运行中切换布局时 CardDetector 会结束当前会话、另开一个
+        if settings.RECORD_SESSION:
+            start_recording(self.card_tracker.card_detector)
+        if self.pipeline_mode:
+            self.worker = CardTrackerPipelineWorker(self.card_tracker, scheduler=self.scheduler)
+        else:
+            # QThread：worker 的执行线程
+            self.worker_thread = QThread(self)
+            # 你的 worker：执行一次识别，然后 emit result_ready / finished
+            self.worker = CardTrackerWorker(self.card_tracker, scheduler=self.scheduler)
+            self.worker.next_delay.connect(self.on_next_delay)
+            # 把 worker 移动到线程中（关键：让耗时任务不在主线程跑）
+            self.worker.moveToThread(self.worker_thread)
+
+        # 信号连接（保持你原逻辑）
+        self.worker.result_ready.connect(self.on_result_ready)
+        self.worker.error.connect(self.on_worker_error)
+        self.worker.finished.connect(self.on_worker_finished)
+        self.worker.model_ready.connect(self.on_model_ready)
+        self.worker.model_error.connect(self.on_model_error)
+        self._set_model_loading()
+
+        if self.pipeline_mode:
+            # 识别线程启动后先加载模型，加载完成才开始识别
+            self.worker.start()
+            if self.is_paused:
+                self.worker.pause()
+        else:
+            # 线程启动后先在后台加载模型（导入 torch + 读取权重），窗口不必等待
+            self.worker_thread.started.connect(self.worker.load_model)
+            self.worker_thread.start()
+
+    def _stop_worker(self):
+        """
+        停止后台线程（最多等待 1500ms）
+        """
+        if self.pipeline_mode:
+            self.worker.stop()
+        elif self.worker_thread is not None:
+            self.worker_thread.quit()
+            self.worker_thread.wait(1500)
+        stop_recording(self.card_tracker.card_detector)
+
+    def _set_model_loading(self):
+        """
+        模型加载中：在标题栏提示（识别会在加载完成后自动开始）
+        """
+        self.setWindowTitle("Han记牌器 (模型加载中...)")
+
+    @Slot(str)
+    def on_model_ready(self, device: str):
+        """
+        模型加载完成：恢复标题
+        """
+        self.setWindowTitle("Han记牌器")
+        print(f"[UI] 模型加载完成: {device}")
+
+    @Slot(str)
+    def on_model_error(self, err_text: str):
+        """
+        模型加载失败：标题提示并打印错误
+        """
+        self.setWindowTitle("Han记牌器 (模型加载失败)")
+        print("Model load error:\n", err_text)
+
     @Slot(str)
     def on_worker_error(self, err_text: str):
         """
@@ -775,6 +866,15 @@ class CardUI(QMainWindow):
         """
         print("Worker error:\n", err_text)
 
+    @Slot(float)
+    def on_next_delay(self, delay_sec: float):
+        """
+        自适应间隔：worker 算出的下一轮等待时间，重新启动单次定时器
+        """
+        if self.is_paused:
+            return
+        self.timer.start(int(delay_sec * 1000))
+
     @Slot()
     def on_worker_finished(self):
         """
@@ -790,6 +890,8 @@ class CardUI(QMainWindow):
         - 退出线程并等待（最多 1500ms）
         """
         self.timer.stop()
-        self.worker_thread.quit()
-        self.worker_thread.wait(1500)
+        self.stats_timer.stop()
+        self._stop_worker()
+        # 还没写回 config.yaml 的设置立即写完
+        settings.STORE.flush()
         super().closeEvent(event)
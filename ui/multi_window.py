@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+"""
+多桌模式主窗口
+config.yaml 的 multi_sessions 不为空时使用: 每桌一个面板(剩余牌 + 出牌记录), 所有桌共用一个后台线程和一份模型
+"""
+
+from PySide6.QtCore import Qt, QThread, QTimer, Slot
+from PySide6.QtWidgets import (
+    QWidget, QLabel, QVBoxLayout, QGridLayout, QPushButton, QHBoxLayout, QMainWindow, QGroupBox
+)
+from config.settings import TOTAL_CARDS
+from core.card_codes import CARD_CODE
+from core.multi_session import MultiSessionTracker
+from core.stage_timer import STAGE_TIMER
+from ui.card_tracker_worker import MultiSessionWorker
+from utils.trans_yolo_names_to_string import trans_yolo_names_to_string
+import config.settings as settings
+
+
+class SessionPanel(QGroupBox):
+    """
+    一桌的显示面板: 牌名 / 剩余数量两行 + 上家、本家、下家出牌记录
+    控件的 objectName 与单桌窗口相同, 共用 ui.qss 的样式
+    """
+
+    played_prefix = {"left": "上家  ", "self": "本家  ", "right": "下家  "}
+
+    def __init__(self, title: str, on_reset):
+        super().__init__(title)
+        self.card_order = list(reversed(list(TOTAL_CARDS.keys())))
+        self.card_codes = [CARD_CODE[card] for card in self.card_order]
+
+        root = QVBoxLayout(self)
+        root.setContentsMargins(6, 6, 6, 6)
+        root.setSpacing(4)
+
+        top = QHBoxLayout()
+        root.addLayout(top)
+        grid = QGridLayout()
+        grid.setHorizontalSpacing(6)
+        grid.setVerticalSpacing(4)
+        top.addLayout(grid, 1)
+
+        btn_reset = QPushButton("重置")
+        btn_reset.setFixedWidth(50)
+        btn_reset.clicked.connect(on_reset)
+        top.addWidget(btn_reset)
+
+        self.name_labels = {}
+        self.count_labels = {}
+        for col, card in enumerate(self.card_order):
+            name = QLabel(str(card))
+            name.setAlignment(Qt.AlignCenter)
+            name.setObjectName("CardNameLabel")
+            name.setProperty("depleted", False)
+            grid.addWidget(name, 0, col)
+            self.name_labels[card] = name
+
+            cnt = QLabel()
+            cnt.setAlignment(Qt.AlignCenter)
+            cnt.setObjectName("CardCountLabel")
+            grid.addWidget(cnt, 1, col)
+            self.count_labels[card] = cnt
+
+        self.played_labels = {}
+        for side in ("left", "self", "right"):
+            lbl = QLabel(self.played_prefix[side])
+            lbl.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+            lbl.setObjectName("InfoLabel")
+            lbl.setVisible(settings.SHOW_PLAYED_CARDS)
+            root.addWidget(lbl)
+            self.played_labels[side] = lbl
+
+        self._rendered_counts = {}
+        self._rendered_played = {}
+        self.reset()
+
+    def reset(self):
+        for card in self.card_order:
+            self._render_count(card, TOTAL_CARDS.get(card, 0))
+        for side, lbl in self.played_labels.items():
+            lbl.setText(self.played_prefix[side])
+        self._rendered_played = {side: None for side in self.played_labels}
+
+    def update_cards(self, remain_cards: list, show_left: list, show_right: list, show_self: list):
+        """
+        增量刷新, 与单桌窗口的 _update_cards 相同: 只改变化了的控件
+        """
+        changed_cards = [(card, remain_cards[code]) for card, code in zip(self.card_order, self.card_codes)
+                         if remain_cards[code] != self._rendered_counts[card]]
+        changed_played = [(side, cards) for side, cards in (("left", show_left), ("right", show_right), ("self", show_self))
+                          if cards != self._rendered_played[side]]
+        if not changed_cards and not changed_played:
+            return
+
+        self.setUpdatesEnabled(False)
+        try:
+            for card, v in changed_cards:
+                self._render_count(card, v)
+            for side, cards in changed_played:
+                self._rendered_played[side] = cards
+                self.played_labels[side].setText(self.played_prefix[side] + trans_yolo_names_to_string(cards))
+        finally:
+            self.setUpdatesEnabled(True)
+
+    def _render_count(self, card: str, v: int):
+        self._rendered_counts[card] = v
+        count_label = self.count_labels[card]
+        count_label.setText(str(v))
+        count_label.setProperty("count", str(v))
+        depleted = (v <= 0)
+        for label in (self.name_labels[card], count_label):
+            label.setProperty("depleted", depleted)
+            label.style().unpolish(label)
+            label.style().polish(label)
+
+
+class MultiCardUI(QMainWindow):
+    """
+    多桌记牌器主窗口:
+    - 每桌一个 SessionPanel, 两列排列
+    - 一个后台线程(MultiSessionWorker)按检测间隔处理所有桌, 推理合并成一次批量推理
+    - busy 防抖: 上一轮没结束不触发下一轮
+    """
+
+    def __init__(self, entries=None):
+        super().__init__()
+        self.setWindowTitle("Han记牌器 (多桌)")
+        try:
+            self.setWindowFlag(Qt.WindowStaysOnTopHint, settings.ALWAYS_ON_TOP)
+        except Exception:
+            pass
+
+        self.tables = MultiSessionTracker.from_config(entries if entries is not None else settings.MULTI_SESSIONS)
+
+        self.central_widget = QWidget()
+        self.setCentralWidget(self.central_widget)
+        root = QVBoxLayout(self.central_widget)
+        root.setContentsMargins(8, 8, 8, 8)
+        root.setSpacing(6)
+
+        # 顶部: 暂停 / 全部重置
+        controls = QHBoxLayout()
+        root.addLayout(controls)
+        self.btn_pause = QPushButton("暂停")
+        self.btn_pause.setObjectName("BtnPause")
+        self.btn_pause.setFixedWidth(50)
+        self.btn_pause.clicked.connect(self.on_pause_clicked)
+        controls.addWidget(self.btn_pause)
+        btn_reset_all = QPushButton("全部重置")
+        btn_reset_all.clicked.connect(lambda: self.on_reset_clicked(-1))
+        controls.addWidget(btn_reset_all)
+        controls.addStretch(1)
+        self.is_paused = False
+
+        panels_layout = QGridLayout()
+        panels_layout.setSpacing(6)
+        root.addLayout(panels_layout)
+        self.panels = []
+        for i, name in enumerate(self.tables.names):
+            panel = SessionPanel(name, lambda _=False, index=i: self.on_reset_clicked(index))
+            panels_layout.addWidget(panel, i // 2, i % 2)
+            self.panels.append(panel)
+
+        self.latency_label = QLabel("")
+        self.latency_label.setObjectName("LatencyLabel")
+        self.latency_label.setVisible(settings.LATENCY_OVERLAY)
+        root.addWidget(self.latency_label)
+
+        # 后台线程: 先加载模型(所有桌共用一份), 再由定时器逐轮触发
+        self.worker_thread = QThread(self)
+        self.worker = MultiSessionWorker(self.tables)
+        self.worker.moveToThread(self.worker_thread)
+        self.worker.result_ready.connect(self.on_result_ready)
+        self.worker.error.connect(self.on_worker_error)
+        self.worker.finished.connect(self.on_worker_finished)
+        self.worker.model_ready.connect(self.on_model_ready)
+        self.worker.model_error.connect(self.on_model_error)
+        self.worker_thread.started.connect(self.worker.load_model)
+        self.setWindowTitle("Han记牌器 (多桌, 模型加载中...)")
+        self.worker_thread.start()
+
+        self._busy = False
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(settings.DETECT_INTERVAL_SEC * 1000))
+        self.timer.timeout.connect(self.request_one_update)
+        self.timer.start()
+
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(1000)
+        self.stats_timer.timeout.connect(self.on_stats_timer)
+        self.stats_timer.start()
+
+    @Slot()
+    def request_one_update(self):
+        if self._busy or self.is_paused:
+            return
+        self._busy = True
+        QTimer.singleShot(0, self.worker.do_run_once)
+
+    @Slot(int, list, list, list, list)
+    def on_result_ready(self, index: int, remain_cards: list, show_left: list, show_right: list, show_self: list):
+        with STAGE_TIMER.span("ui_update"):
+            self.panels[index].update_cards(remain_cards, show_left, show_right, show_self)
+
+    def on_reset_clicked(self, index: int):
+        """
+        重置一桌(index)或所有桌(-1): 界面立刻恢复, 记牌状态在 worker 线程下一轮开始前重置
+        """
+        for i, panel in enumerate(self.panels):
+            if index < 0 or i == index:
+                panel.reset()
+        self.worker.request_reset(index)
+
+    @Slot()
+    def on_pause_clicked(self):
+        self.is_paused = not self.is_paused
+        self.btn_pause.setText("继续" if self.is_paused else "暂停")
+
+    @Slot()
+    def on_stats_timer(self):
+        if settings.LATENCY_OVERLAY:
+            self.latency_label.setText(STAGE_TIMER.format_line())
+
+    @Slot(str)
+    def on_model_ready(self, device: str):
+        self.setWindowTitle("Han记牌器 (多桌)")
+        print(f"[UI] 模型加载完成: {device}, 共 {len(self.tables)} 桌")
+
+    @Slot(str)
+    def on_model_error(self, err_text: str):
+        self.setWindowTitle("Han记牌器 (多桌, 模型加载失败)")
+        print("Model load error:\n", err_text)
+
+    @Slot(str)
+    def on_worker_error(self, err_text: str):
+        print("Worker error:\n", err_text)
+
+    @Slot()
+    def on_worker_finished(self):
+        self._busy = False
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.stats_timer.stop()
+        self.worker_thread.quit()
+        self.worker_thread.wait(1500)
+        self.tables.close()
+        settings.STORE.flush()
+        super().closeEvent(event)
@@ -10,6 +10,8 @@ from PySide6.QtWidgets import (
     QLabel, QComboBox, QTabWidget
 )
 
+import config.settings as settings
+
 
 class SettingsDialog(QDialog):
     """
@@ -17,7 +19,7 @@ class SettingsDialog(QDialog):
     提供基本设置和高级设置两个标签页，用于配置应用程序的各种参数
     """
 
-    def __init__(self, parent=None, on_reset_callback=None, on_interval_change_callback=None, on_layout_change_callback=None, on_device_change_callback=None, on_reset_time_change_callback=None, on_frame_length_change_callback=None, on_always_on_top_change_callback=None, on_show_played_cards_change_callback=None, on_debug_mode_change_callback=None):
+    def __init__(self, parent=None, on_reset_callback=None, on_interval_change_callback=None, on_layout_change_callback=None, on_device_change_callback=None, on_reset_time_change_callback=None, on_frame_length_change_callback=None, on_always_on_top_change_callback=None, on_show_played_cards_change_callback=None, on_debug_mode_change_callback=None, on_inference_option_change_callback=None):
         """
         初始化设置对话框
 
@@ -32,6 +34,7 @@ class SettingsDialog(QDialog):
             on_always_on_top_change_callback: 是否显示在最上层改变回调函数
             on_show_played_cards_change_callback: 是否显示玩家所出的牌改变回调函数
             on_debug_mode_change_callback: 调试模式改变回调函数
+            on_inference_option_change_callback: 推理选项改变回调函数, 参数为 (配置键, 值)
         """
         super().__init__(parent)
         self.setWindowTitle("设置")
@@ -46,6 +49,7 @@ class SettingsDialog(QDialog):
         self.on_always_on_top_change_callback = on_always_on_top_change_callback
         self.on_show_played_cards_change_callback = on_show_played_cards_change_callback
         self.on_debug_mode_change_callback = on_debug_mode_change_callback
+        self.on_inference_option_change_callback = on_inference_option_change_callback
 
         # 创建标签页控件
         self.tab_widget = QTabWidget(self)
@@ -101,8 +105,7 @@ class SettingsDialog(QDialog):
         # 注意：在添加选项和设置初始索引前不要连接信号，
         # 否则构造对话框时会触发回调，导致主窗口的布局被重置
         # 加载布局配置选项
-        from config.settings import WINDOW_LAYOUTS
-        layout_names = list(WINDOW_LAYOUTS.keys())
+        layout_names = list(settings.WINDOW_LAYOUTS.keys())
         # 在填充和初始化索引时屏蔽信号，避免在构造时触发 on_layout_change 回调
         self.combo_layout.blockSignals(True)
         self.combo_layout.addItems(layout_names)
@@ -119,11 +122,11 @@ class SettingsDialog(QDialog):
 
         # 第三行：设备选择设置
         device_layout = QHBoxLayout()
-        device_label = QLabel("设备选择(重启生效)：")
+        device_label = QLabel("设备选择：")
         device_label.setMinimumWidth(80)
         self.combo_device = QComboBox()
         self.combo_device.setObjectName("DeviceCombo")
-        self.combo_device.addItems(["CPU", "GPU"])
+        self.combo_device.addItems(["CPU", "GPU", "ONNX(CPU)", "OpenVINO"])
         self.combo_device.currentIndexChanged.connect(self._on_device_changed)
         device_layout.addWidget(device_label)
         device_layout.addWidget(self.combo_device)
@@ -246,9 +249,42 @@ class SettingsDialog(QDialog):
         frame_length_desc_layout.addWidget(frame_length_desc_label)
         advanced_layout.addLayout(frame_length_desc_layout)
 
+        # 第四行：推理选项(重启生效)
+        inference_layout = QHBoxLayout()
+        inference_label = QLabel("推理优化：")
+        inference_label.setMinimumWidth(80)
+        inference_layout.addWidget(inference_label)
+        self.combo_half = self._add_inference_combo(inference_layout, "半精度", "HalfCombo", ["否", "是"], "half_precision")
+        self.combo_fuse = self._add_inference_combo(inference_layout, "层融合", "FuseCombo", ["否", "是"], "fuse_model")
+        self.combo_warmup = self._add_inference_combo(inference_layout, "预热", "WarmupCombo", ["否", "是"], "warmup")
+        self.combo_imgsz = self._add_inference_combo(inference_layout, "推理尺寸", "ImgszCombo",
+                                                     ["默认", "640", "960", "1280"], "infer_imgsz")
+        inference_layout.addStretch()
+        advanced_layout.addLayout(inference_layout)
+
+        # 推理选项说明
+        inference_desc_layout = QHBoxLayout()
+        inference_desc_label = QLabel("半精度只在GPU上生效；推理尺寸越小越快，但小牌面可能识别不准（重启生效）")
+        inference_desc_label.setStyleSheet("color: #666; font-size: 11px;")
+        inference_desc_layout.addSpacing(80)
+        inference_desc_layout.addWidget(inference_desc_label)
+        advanced_layout.addLayout(inference_desc_layout)
+
         # 添加弹性空间
         advanced_layout.addStretch()
 
+    def _add_inference_combo(self, layout, text, object_name, items, key):
+        """
+        在推理优化这一行添加一个 标签 + 下拉框
+        """
+        layout.addWidget(QLabel(text))
+        combo = QComboBox()
+        combo.setObjectName(object_name)
+        combo.addItems(items)
+        combo.currentIndexChanged.connect(lambda index, k=key, c=combo: self._on_inference_option_changed(k, c))
+        layout.addWidget(combo)
+        return combo
+
     def _on_reset_clicked(self):
         """
         重置按钮点击事件
@@ -286,6 +322,22 @@ class SettingsDialog(QDialog):
         if self.on_device_change_callback:
             self.on_device_change_callback(index)
 
+    def _on_inference_option_changed(self, key, combo):
+        """
+        推理选项改变事件
+
+        参数:
+            key: 配置键
+            combo: 发生改变的下拉框
+        """
+        text = combo.currentText()
+        if key == "infer_imgsz":
+            value = 0 if text == "默认" else int(text)
+        else:
+            value = text == "是"
+        if self.on_inference_option_change_callback:
+            self.on_inference_option_change_callback(key, value)
+
     def _on_reset_time_changed(self, index):
         """
         重置时间改变事件
@@ -367,9 +419,9 @@ class SettingsDialog(QDialog):
         设置当前设备选择
 
         参数:
-            device_choice: 设备选择（"cpu" 或 "cuda"）
+            device_choice: 设备选择（"cpu" / "cuda" / "onnx" / "openvino"）
         """
-        device_map = {"cpu": "CPU", "cuda": "GPU"}
+        device_map = {"cpu": "CPU", "cuda": "GPU", "onnx": "ONNX(CPU)", "openvino": "OpenVINO"}
         device_text = device_map.get(device_choice, "CPU")
         index = self.combo_device.findText(device_text)
         if index >= 0:
@@ -447,6 +499,29 @@ class SettingsDialog(QDialog):
             self.combo_debug_mode.setCurrentIndex(index)
             self.combo_debug_mode.blockSignals(False)
 
+    def set_current_inference_options(self, half_precision, fuse_model, warmup, infer_imgsz):
+        """
+        设置当前推理选项
+
+        参数:
+            half_precision: 是否使用半精度（True/False）
+            fuse_model: 是否融合层（True/False）
+            warmup: 是否启动预热（True/False）
+            infer_imgsz: 推理尺寸, 0 表示默认
+        """
+        values = (
+            (self.combo_half, "是" if half_precision else "否"),
+            (self.combo_fuse, "是" if fuse_model else "否"),
+            (self.combo_warmup, "是" if warmup else "否"),
+            (self.combo_imgsz, str(infer_imgsz) if infer_imgsz else "默认"),
+        )
+        for combo, text in values:
+            index = combo.findText(text)
+            if index >= 0:
+                combo.blockSignals(True)
+                combo.setCurrentIndex(index)
+                combo.blockSignals(False)
+
     def _setup_about_settings(self):
         """
         在关于标签页中添加控件
@@ -1,17 +1,21 @@
-from config.settings import LITTLE_JOKER_SHOWN, BIG_JOKER_SHOWN
+import config.settings as settings
+from core.card_codes import CARD_NAMES, CARD_CODE
 
+# 牌编码 -> 出牌记录中显示的字符
+_CODE_TO_SHOWN = list(CARD_NAMES)
 
-def tool_trans(lst : list):
-    string = ""
-    for item in lst:
-        if item == "jok":
-            string += LITTLE_JOKER_SHOWN
-            continue
-        if item == "JOK":
-            string += BIG_JOKER_SHOWN
-            continue
-        string = string + str(item)
-    return string
+
+def _update_joker_shown(key=None, value=None):
+    _CODE_TO_SHOWN[CARD_CODE["jok"]] = settings.LITTLE_JOKER_SHOWN
+    _CODE_TO_SHOWN[CARD_CODE["JOK"]] = settings.BIG_JOKER_SHOWN
+
+
+_update_joker_shown()
+settings.STORE.subscribe(_update_joker_shown, keys=("little_joker_shown", "big_joker_shown"))
+
+
+def tool_trans(lst):
+    return "".join(_CODE_TO_SHOWN[code] for code in lst)
 
 def trans_yolo_names_to_string(lst : list):
     string = ""